@@ -1,6 +1,38 @@
-from app.database import engine
-from app.models import Base
+"""
+Apply pending aerich migrations from migrations/models (the explicit migration
+step; the API and worker never touch the schema on startup). Safe to re-run.
+
+    python -m app.create_tables
+
+Databases created by the old startup `generate_schemas()` are upgraded in
+place: every migration uses IF [NOT] EXISTS, so the baseline migration is a
+no-op on them and later ones add only what is missing.
+"""
+import asyncio
+import logging
+from pathlib import Path
+
+from aerich import Command
+
+from app.database import close_db, tortoise_config
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+
+async def create_tables():
+    command = Command(tortoise_config=tortoise_config("worker"), app="models", location=str(MIGRATIONS_DIR))
+    try:
+        await command.init()
+        applied = await command.upgrade(run_in_transaction=True)
+    finally:
+        await close_db()
+    logger.info("Migrations applied", extra={"migrations": applied})
+
 
 if __name__ == "__main__":
-    Base.metadata.create_all(bind=engine)
-    print("✅ Tables created successfully")
+    from app.logging_config import setup_logging
+
+    setup_logging()
+    asyncio.run(create_tables())
@@ -1,44 +1,69 @@
 from typing import Optional
 from tortoise import Tortoise
+from tortoise.backends.base.client import BaseDBAsyncClient
 from dotenv import load_dotenv
+import copy
+import logging
 import os
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional read replica for list/GET routes (falls back to the primary when unset)
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+# "require" for hosted Postgres (e.g. Neon); "disable" for a local server
+DATABASE_SSL = os.getenv("DATABASE_SSL", "require")
+
+# Pool settings; API_DB_* / WORKER_DB_* override them per process role
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# Prepared statements cached per connection (0 disables, e.g. behind pgbouncer in transaction mode)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+# Seconds before a query is cancelled (0 = no limit)
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "60"))
+# Create missing tables on startup (local development only; use `python -m app.create_tables`)
+DB_GENERATE_SCHEMAS = os.getenv("DB_GENERATE_SCHEMAS", "false").lower() == "true"
+
+ROLES = ("api", "worker")
+
+if not DATABASE_URL:
+    raise RuntimeError("DATABASE_URL is not set; make sure .env exists in the project root")
+
+
+def _credentials(url: str) -> dict:
+    """asyncpg connection parameters from a postgresql:// URL"""
+    parsed = urlparse(url)
+    credentials = {
+        "host": parsed.hostname,
+        "port": parsed.port or 5432,
+        "user": parsed.username,
+        "password": parsed.password,
+        "database": parsed.path.lstrip('/'),
+    }
+    if DATABASE_SSL != "disable":
+        credentials["ssl"] = DATABASE_SSL
+    return credentials
+
+
+# Plain asyncpg credentials (dedicated connections: LISTEN, benchmarks)
+db_config = _credentials(DATABASE_URL)
 
-# Debug: Print the DATABASE_URL (with password hidden)
-if DATABASE_URL:
-    parsed_debug = urlparse(DATABASE_URL)
-    safe_url = f"{parsed_debug.scheme}://{parsed_debug.username}:****@{parsed_debug.hostname}:{parsed_debug.port or 5432}{parsed_debug.path}"
-    print(f"🔍 DATABASE_URL found: {safe_url}")
-else:
-    print("❌ DATABASE_URL not found in environment variables!")
-    print("💡 Make sure your .env file exists in the project root")
-    raise RuntimeError("DATABASE_URL is not set")
-
-# Parse the DATABASE_URL
-parsed = urlparse(DATABASE_URL)
-
-# Extract connection parameters
-db_config = {
-    "host": parsed.hostname,
-    "port": parsed.port or 5432,
-    "user": parsed.username,
-    "password": parsed.password,
-    "database": parsed.path.lstrip('/'),
-    "ssl": "require"  # Neon requires SSL
-}
 
-# Debug: Print extracted config (with password hidden)
-print(f"🔍 Extracted config:")
-print(f"   Host: {db_config['host']}")
-print(f"   Port: {db_config['port']}")
-print(f"   User: {db_config['user']}")
-print(f"   Database: {db_config['database']}")
-print(f"   SSL: {db_config['ssl']}")
+def pool_settings(role: str) -> dict:
+    """Pool and per-connection settings for a process role ("api" or "worker")"""
+    prefix = role.upper()
+    return {
+        "minsize": int(os.getenv(f"{prefix}_DB_POOL_MIN_SIZE", DB_POOL_MIN_SIZE)),
+        "maxsize": int(os.getenv(f"{prefix}_DB_POOL_MAX_SIZE", DB_POOL_MAX_SIZE)),
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "command_timeout": DB_COMMAND_TIMEOUT or None,
+        "application_name": f"reminder-{role}",
+    }
+
 
 TORTOISE_ORM = {
     "connections": {
@@ -58,23 +83,55 @@ TORTOISE_ORM = {
 }
 
 
-async def init_db():
-    """Initialize database connection"""
+def tortoise_config(role: str = "api") -> dict:
+    """TORTOISE_ORM with the role's pool settings, plus the replica connection if configured"""
+    if role not in ROLES:
+        raise ValueError(f"role must be one of {ROLES}")
+    config = copy.deepcopy(TORTOISE_ORM)
+    settings = pool_settings(role)
+    config["connections"]["default"]["credentials"].update(settings)
+    if DATABASE_REPLICA_URL:
+        config["connections"]["replica"] = {
+            "engine": "tortoise.backends.asyncpg",
+            "credentials": {**_credentials(DATABASE_REPLICA_URL), **settings},
+        }
+    return config
+
+
+def read_db() -> BaseDBAsyncClient:
+    """Connection for reads that tolerate replica lag (the primary without a replica)"""
+    return Tortoise.get_connection("replica" if DATABASE_REPLICA_URL else "default")
+
+
+async def init_db(role: str = "api", generate_schemas: Optional[bool] = None):
+    """
+    Initialize database connections for a process role.
+
+    Schemas are not created here unless DB_GENERATE_SCHEMAS (or `generate_schemas`)
+    is set; run `python -m app.create_tables` once per deployment instead.
+    """
     try:
-        print("🔄 Initializing database connection...")
-        await Tortoise.init(config=TORTOISE_ORM)
-        print("🔄 Generating database schemas...")
-        await Tortoise.generate_schemas()
-        print("✅ Database initialized successfully")
-    except Exception as e:
-        print(f"❌ Database initialization failed: {e}")
-        raise e
+        settings = pool_settings(role)
+        logger.info("Initializing database connection", extra={
+            "role": role,
+            "pool_min_size": settings["minsize"],
+            "pool_max_size": settings["maxsize"],
+            "replica": bool(DATABASE_REPLICA_URL),
+        })
+        await Tortoise.init(config=tortoise_config(role))
+        if DB_GENERATE_SCHEMAS if generate_schemas is None else generate_schemas:
+            logger.info("Generating database schemas")
+            await Tortoise.generate_schemas(safe=True)
+        logger.info("Database initialized")
+    except Exception:
+        logger.exception("Database initialization failed")
+        raise
 
 
 async def close_db():
     """Close database connection"""
     await Tortoise.close_connections()
-    print("✅ Database connections closed")
+    logger.info("Database connections closed")
 
 
 # Test connection
@@ -82,13 +139,15 @@ async def test_db_connection():
     """Test database connection"""
     try:
         await init_db()
-        print("✅ Database connection test successful")
+        logger.info("Database connection test successful")
         await close_db()
-    except Exception as e:
-        print(f"❌ Database connection test failed: {e}")
-        raise e
+    except Exception:
+        logger.exception("Database connection test failed")
+        raise
 
 
 if __name__ == "__main__":
     import asyncio
-    asyncio.run(test_db_connection())
\ No newline at end of file
+    from app.logging_config import setup_logging
+    setup_logging()
+    asyncio.run(test_db_connection())
@@ -1,14 +1,19 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.database import init_db, close_db
 from app.routes.reminders import router as reminder_router
+from app.routes.status_flags import router as status_flag_router
+from app import metrics
+from app.logging_config import setup_logging
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    await init_db()
+    setup_logging()
+    await init_db(role="api")
     yield
     # Shutdown
     await close_db()
@@ -28,9 +33,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Keyset pagination cursor
 )
 
 app.include_router(reminder_router, prefix="/reminders", tags=["Reminders"])
+app.include_router(status_flag_router, prefix="/status-flags", tags=["Status Flags"])
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template (e.g. /reminders/{reminder_id}) to keep cardinality bounded
+    route = request.scope.get("route")
+    metrics.REQUEST_SECONDS.labels(
+        request.method, route.path if route else "unmatched", response.status_code
+    ).observe(time.perf_counter() - started)
+    return response
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    return Response(metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
 
 
 @app.get("/")
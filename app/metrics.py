@@ -0,0 +1,232 @@
+"""
+Minimal in-process metrics registry with Prometheus text exposition.
+
+Recording is a dict lookup plus a few integer/float updates, so metrics can be
+recorded inside the scheduler's hot loop. Bind labelled series once with
+`.labels(...)` when the label values are known up front.
+"""
+import asyncio
+import logging
+import os
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds: from sub-millisecond DB calls up to multi-minute scheduling lag
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900,
+)
+
+REGISTRY: List["_Metric"] = []
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.append(self)
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Series for the given label values (created on first use)"""
+        key = tuple(str(v) for v in values)
+        series = self._series.get(key)
+        if series is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            series = self._series[key] = self._new_series()
+        return series
+
+    def _default(self):
+        return self.labels()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        for key, series in list(self._series.items()):
+            lines.extend(series.render(self.name, self.labelnames, key))
+        return lines
+
+
+class _CounterSeries:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def render(self, name, labelnames, key):
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(self.value)}"]
+
+
+class _GaugeSeries(_CounterSeries):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self.value = value
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+
+class _HistogramSeries:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labelnames, key):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+        labels = _format_labels(labelnames, key)
+        lines.append(f"{name}_sum{labels} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{labels} {self.count}")
+        return lines
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def _new_series(self):
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1):
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    TYPE = "gauge"
+
+    def _new_series(self):
+        return _GaugeSeries()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+
+def render_metrics() -> str:
+    """All registered metrics in Prometheus text format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Scheduler
+TICK_PHASE_SECONDS = Histogram(
+    "scheduler_tick_phase_seconds", "Time spent per tick phase", ("phase",)
+)
+DUE_BACKLOG = Gauge("scheduler_due_backlog", "Due reminders waiting at the start of a tick")
+WORKERS_ALIVE = Gauge("scheduler_workers_alive", "Registered workers with a recent heartbeat")
+LAG_SECONDS = Histogram(
+    "scheduler_lag_seconds", "Send time minus next_run_at",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+)
+
+# Notifications
+NOTIFICATIONS_TOTAL = Counter(
+    "notifications_total", "Notification attempts by channel and result", ("channel", "result")
+)
+NOTIFICATION_SECONDS = Histogram(
+    "notification_send_seconds", "Notification send latency", ("channel",)
+)
+DELIVERY_RETRIES_TOTAL = Counter(
+    "delivery_retries_total", "Retry attempts by channel and result", ("channel", "result")
+)
+DELIVERY_FINAL_FAILURES_TOTAL = Counter(
+    "delivery_final_failures_total", "Deliveries abandoned after the last attempt", ("channel",)
+)
+RETRY_QUEUE_DEPTH = Gauge("delivery_retry_queue_depth", "Failed sends waiting for a retry")
+
+# API
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency per route", ("method", "route", "status")
+)
+
+
+async def _handle_metrics_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        request_line = await reader.readline()
+        # Drain headers
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        if request_line.split(b" ")[1:2] == [b"/metrics"]:
+            body, status = render_metrics().encode(), "200 OK"
+        else:
+            body, status = b"Not Found\n", "404 Not Found"
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(port: int = None):
+    """Serve /metrics on a small HTTP port (METRICS_PORT, 0 disables)"""
+    if port is None:
+        port = int(os.getenv("METRICS_PORT", "9100"))
+    if not port:
+        return None
+    try:
+        server = await asyncio.start_server(_handle_metrics_request, "0.0.0.0", port)
+    except OSError as e:
+        # e.g. a second worker on the same host: keep running without the endpoint
+        logger.warning("Metrics port unavailable", extra={"port": port, "error": str(e)})
+        return None
+    logger.info("Metrics server listening", extra={"port": port})
+    return server
@@ -1,15 +1,49 @@
 from tortoise import fields
+from tortoise.indexes import Index
 from tortoise.models import Model
 from enum import Enum
 
 
+class ConditionalIndex(Index):
+    """Index with a raw WHERE predicate (Postgres partial index), optionally UNIQUE"""
+
+    def __init__(self, *, fields: tuple, name: str, where: str, unique: bool = False):
+        super().__init__(fields=fields, name=name)
+        self.INDEX_CREATE_TEMPLATE = (
+            "CREATE " + ("UNIQUE " if unique else "")
+            + "INDEX {exists}{index_name} ON {table_name} ({fields}){extra};"
+        )
+        self.extra = f" WHERE {where}"
+
+    # aerich diffs model snapshots by index equality; compare by definition so
+    # `aerich migrate` does not recreate unchanged indexes
+    def _key(self):
+        return (self.INDEX_CREATE_TEMPLATE, tuple(self.fields), self.name, self.extra)
+
+    def __eq__(self, other):
+        return isinstance(other, ConditionalIndex) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+
 class ReminderStatus(str, Enum):
     ACTIVE = "ACTIVE"
     PAUSED = "PAUSED"
     COMPLETED = "COMPLETED"
+    FAILED = "FAILED"  # One-time reminder whose delivery ran out of retries
+
+
+# Rows covered by the idempotency index (also the ON CONFLICT target predicate)
+ACTIVE_IDEMPOTENCY_PREDICATE = "status = 'ACTIVE' AND deleted_at IS NULL"
+
+
+# Live rows the scheduler scans; everything else is eventually archived
+LIVE_PREDICATE = ACTIVE_IDEMPOTENCY_PREDICATE
 
 
-class ReminderJob(Model):
+class ReminderFields(Model):
+    """Columns shared by reminder_jobs and its archive table"""
     id = fields.IntField(pk=True)
     
     # Entity metadata
@@ -21,13 +55,20 @@ class ReminderJob(Model):
     channel = fields.CharField(max_length=50)
     
     # Scheduling
-    schedule_type = fields.CharField(max_length=50)
+    schedule_type = fields.CharField(max_length=50)  # one_time | recurring | business_hours | cron
     interval_minutes = fields.IntField(null=True)
+    schedule_expression = fields.CharField(max_length=255, null=True)  # cron / business hours
+    timezone = fields.CharField(max_length=64, null=True)  # for schedule_expression, NULL = IST
     start_time = fields.DatetimeField(null=True)  # NEW: When to start sending
     
     next_run_at = fields.DatetimeField(null=True)
     last_run_at = fields.DatetimeField(null=True)
     
+    # Load spreading (NULL = scheduler default, see app.scheduler.schedule)
+    catch_up_policy = fields.CharField(max_length=20, null=True)  # coalesce | skip | spread
+    schedule_anchor = fields.CharField(max_length=20, null=True)  # now | grid
+    jitter_seconds = fields.IntField(null=True)
+    
     # Stop condition
     stop_condition_type = fields.CharField(max_length=100)
     stop_condition_value = fields.CharField(max_length=255)
@@ -35,21 +76,111 @@ class ReminderJob(Model):
     # Status
     status = fields.CharEnumField(ReminderStatus, default=ReminderStatus.ACTIVE)
     
+    # Worker lease (set while a worker process owns the row)
+    lease_owner = fields.CharField(max_length=255, null=True)
+    lease_expires_at = fields.DatetimeField(null=True)
+    
     # Timestamps
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
     deleted_at = fields.DatetimeField(null=True)
     
+    class Meta:
+        abstract = True
+
+
+class ReminderJob(ReminderFields):
     class Meta:
         table = "reminder_jobs"
         indexes = [
-            ("status", "next_run_at"),  # Composite index for scheduler
+            # Scheduler scan: covers only live rows, so it does not grow with history
+            ConditionalIndex(
+                fields=("next_run_at",),
+                name="idx_reminder_jobs_due",
+                where=LIVE_PREDICATE,
+            ),
+            # DB-enforced idempotency: one live ACTIVE reminder per entity/event
+            ConditionalIndex(
+                fields=("entity_type", "entity_id", "event_type"),
+                name="uniq_reminder_jobs_active_event",
+                where=ACTIVE_IDEMPOTENCY_PREDICATE,
+                unique=True,
+            ),
+            # Push-based completion: find active reminders waiting on a flag
+            ConditionalIndex(
+                fields=("stop_condition_value",),
+                name="idx_reminder_jobs_active_db_check",
+                where="status = 'ACTIVE' AND stop_condition_type = 'db_check'",
+            ),
         ]
 
     def __str__(self):
         return f"Reminder {self.id}: {self.entity_type}/{self.entity_id}"
 
 
+class ReminderJobArchive(ReminderFields):
+    """COMPLETED and soft-deleted reminders moved out of reminder_jobs (see app.scheduler.archiver)"""
+    archived_at = fields.DatetimeField(index=True)
+    
+    class Meta:
+        table = "reminder_jobs_archive"
+
+
+class DeliveryAttempt(Model):
+    """One send attempt (first send or retry), written in batches"""
+    id = fields.BigIntField(pk=True)
+    reminder_id = fields.IntField(index=True)
+    channel = fields.CharField(max_length=50)
+    attempt = fields.IntField()  # 1 = scheduled send, 2+ = retries
+    success = fields.BooleanField()
+    error = fields.TextField(null=True)
+    attempted_at = fields.DatetimeField()
+    
+    class Meta:
+        table = "delivery_attempts"
+
+
+class DeliveryRetry(Model):
+    """A failed send waiting for its next attempt (see app.scheduler.retries)"""
+    id = fields.IntField(pk=True)
+    reminder_id = fields.IntField(index=True)
+    channel = fields.CharField(max_length=50)
+    payload = fields.JSONField()  # Notification data, sent as-is on retry
+    attempts = fields.IntField()  # Attempts made so far
+    next_attempt_at = fields.DatetimeField(index=True)
+    last_error = fields.TextField(null=True)
+    lease_owner = fields.CharField(max_length=255, null=True)
+    lease_expires_at = fields.DatetimeField(null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    
+    class Meta:
+        table = "delivery_retries"
+
+
+class WorkerStatus(str, Enum):
+    RUNNING = "RUNNING"
+    DRAINING = "DRAINING"
+    STOPPED = "STOPPED"
+    DEAD = "DEAD"  # Missed its heartbeats; its leases were released
+
+
+class SchedulerWorker(Model):
+    """A scheduler worker process and its last heartbeat (see app.scheduler.heartbeat)"""
+    worker_id = fields.CharField(max_length=255, pk=True)
+    hostname = fields.CharField(max_length=255)
+    pid = fields.IntField()
+    status = fields.CharEnumField(WorkerStatus, default=WorkerStatus.RUNNING)
+    started_at = fields.DatetimeField()
+    heartbeat_at = fields.DatetimeField(index=True)
+    stopped_at = fields.DatetimeField(null=True)
+    
+    class Meta:
+        table = "scheduler_workers"
+    
+    def __str__(self):
+        return f"{self.worker_id}: {self.status}"
+
+
 class StatusFlag(Model):
     key = fields.CharField(max_length=255, pk=True)
     value = fields.BooleanField(default=False)
@@ -1,8 +1,12 @@
+import logging
+
 from app.notifications.email_adapter import send_email_notification
 
+logger = logging.getLogger(__name__)
+
 
 def dispatch_notification(reminder):
     if reminder.channel == "email":
         send_email_notification(reminder)
     else:
-        print(f"⚠️ No adapter for channel: {reminder.channel}")
+        logger.warning("No adapter for channel", extra={"channel": reminder.channel})
@@ -1,10 +1,17 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
 def send_email_notification(reminder):
     """
     Dummy email sender.
     Replace with real email provider later.
     """
-    print(
-        f"📧 [EMAIL SENT] "
-        f"Entity={reminder.entity_type}:{reminder.entity_id} | "
-        f"Event={reminder.event_type}"
+    logger.debug(
+        "[EMAIL SENT]",
+        extra={
+            "entity": f"{reminder.entity_type}:{reminder.entity_id}",
+            "event_type": reminder.event_type,
+        },
     )
@@ -0,0 +1,171 @@
+"""
+Notification templates, registered per (event_type, channel).
+
+Sources are str.format strings. Fields that only depend on the template
+({event_title}, {sender_name}) are substituted once when the template is
+compiled (HTML-escaped in the HTML part); rendering fills in just the per-recipient fields ({entity_type},
+{entity_id}, {recipient}, and {count}/{items_text}/{items_html} for digests).
+Compiled templates are kept in a bounded LRU (TEMPLATE_CACHE_SIZE).
+
+    register_template("payment_due", "email", subject="...", text="...", html="...")
+    render("payment_due", "email", {"entity_type": ..., "entity_id": ..., "recipient": ...})
+"""
+import html
+import os
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, NamedTuple, Optional, Tuple
+
+TEMPLATE_CACHE_SIZE = int(os.getenv("TEMPLATE_CACHE_SIZE", "512"))
+SENDER_NAME = os.getenv("SMTP_FROM_NAME", "Reminder System")
+
+# event_type of a channel's fallback template, and of its digest template
+DEFAULT = "*"
+DIGEST = "__digest__"
+
+
+class TemplateSource(NamedTuple):
+    subject: str
+    text: str
+    html: Optional[str] = None
+
+
+class Rendered(NamedTuple):
+    subject: str
+    text: str
+    html: Optional[str]
+
+
+TEMPLATES: Dict[Tuple[str, str], TemplateSource] = {}
+
+
+def register_template(event_type: str, channel: str, subject: str, text: str, html: Optional[str] = None):
+    """Register (or replace) the template for an event_type/channel pair"""
+    TEMPLATES[(event_type, channel)] = TemplateSource(subject, text, html)
+    get_template.cache_clear()
+
+
+def _bind(source: Optional[str], constants: dict) -> Optional[str]:
+    """Substitute template-level fields now, keeping per-recipient fields as {placeholders}"""
+    if source is None:
+        return None
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(source):
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if field in constants:
+            parts.append(str(constants[field]).replace("{", "{{").replace("}", "}}"))
+        else:
+            parts.append("{" + field + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "") + "}")
+    return "".join(parts)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def get_template(event_type: str, channel: str) -> TemplateSource:
+    """
+    Compiled template for an event_type/channel pair (the channel default if none is registered).
+
+    Raises:
+        LookupError: Neither the pair nor the channel has a template
+    """
+    source = TEMPLATES.get((event_type, channel)) or TEMPLATES.get((DEFAULT, channel))
+    if source is None:
+        raise LookupError(f"No template for channel {channel!r}")
+    constants = {
+        "event_title": event_type.replace("_", " ").title(),
+        "sender_name": SENDER_NAME,
+    }
+    # event_type comes from API callers: escaped in the HTML part like every other field
+    html_constants = {key: html.escape(value) for key, value in constants.items()}
+    return TemplateSource(
+        _bind(source.subject, constants),
+        _bind(source.text, constants),
+        _bind(source.html, html_constants),
+    )
+
+
+def render(event_type: str, channel: str, fields: dict) -> Rendered:
+    """Render a template with per-recipient fields (HTML-escaped in the HTML body)"""
+    template = get_template(event_type, channel)
+    html_body = None
+    if template.html is not None:
+        html_body = template.html.format_map(
+            {key: value if key == "items_html" else html.escape(str(value)) for key, value in fields.items()}
+        )
+    return Rendered(template.subject.format_map(fields), template.text.format_map(fields), html_body)
+
+
+register_template(
+    DEFAULT, "email",
+    subject="Reminder: {event_title}",
+    text="""
+Hello,
+
+This is a reminder regarding: {event_title}
+
+Entity Type: {entity_type}
+Entity ID: {entity_id}
+
+Please take the necessary action.
+
+Best regards,
+{sender_name}
+""",
+    html="""
+<html>
+  <body>
+    <p>Hello,</p>
+    <p>This is a reminder regarding: <strong>{event_title}</strong></p>
+    <ul>
+      <li><strong>Entity Type:</strong> {entity_type}</li>
+      <li><strong>Entity ID:</strong> {entity_id}</li>
+    </ul>
+    <p>Please take the necessary action.</p>
+    <p>Best regards,<br>{sender_name}</p>
+  </body>
+</html>
+""",
+)
+
+register_template(
+    DIGEST, "email",
+    subject="You have {count} pending reminders",
+    text="""
+Hello,
+
+You have {count} pending reminders:
+
+{items_text}
+
+Please take the necessary action.
+
+Best regards,
+{sender_name}
+""",
+    html="""
+<html>
+  <body>
+    <p>Hello,</p>
+    <p>You have {count} pending reminders:</p>
+    <ul>
+{items_html}
+    </ul>
+    <p>Please take the necessary action.</p>
+    <p>Best regards,<br>{sender_name}</p>
+  </body>
+</html>
+""",
+)
+
+for _channel in ("slack", "sms"):
+    register_template(
+        DEFAULT, _channel,
+        subject="Reminder: {event_title}",
+        text="Reminder: {event_title} for {entity_type} {entity_id}. Please take the necessary action.",
+    )
+    register_template(
+        DIGEST, _channel,
+        subject="{count} pending reminders",
+        text="You have {count} pending reminders:\n{items_text}",
+    )
@@ -1,97 +1,597 @@
+import base64
+import logging
+import os
 from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from tortoise import Tortoise
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
+import orjson
 from app import models, schemas
-from app.models import ReminderStatus
+from app.database import read_db
+from app.models import ACTIVE_IDEMPOTENCY_PREDICATE, ReminderStatus
+from app.scheduler import schedule
+from app.scheduler.forecast import MAX_HORIZON_HOURS, send_forecast
+from app.scheduler.cron import CALENDAR_SCHEDULE_TYPES, compile_schedule
+from app.scheduler.wakeup import notify_wakeup
 import pytz
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 IST = pytz.timezone('Asia/Kolkata')
+MAX_BULK_SIZE = 5000
+CREATE_ATTEMPTS = 3
+# Paused reminders loaded and resumed per statement by a bulk resume
+RESUME_CHUNK_SIZE = int(os.getenv("BULK_RESUME_CHUNK_SIZE", "5000"))
+
+
+def _resolve_start_time(reminder: schemas.ReminderCreate) -> Optional[datetime]:
+    """start_time in UTC (a start_time without tz is IST)"""
+    if reminder.start_time is None:
+        return None
+    if reminder.start_time.tzinfo is None:
+        # Assume IST if no timezone provided
+        return IST.localize(reminder.start_time).astimezone(timezone.utc)
+    return reminder.start_time.astimezone(timezone.utc)
+
+
+def _compute_next_run(reminder: schemas.ReminderCreate, now: datetime) -> datetime:
+    """First run time for a new reminder (start_time without tz is IST)"""
+    start_time = _resolve_start_time(reminder)
+    
+    # Don't allow scheduling in the past
+    if start_time is not None and start_time < now:
+        raise HTTPException(
+            status_code=400, 
+            detail="Start time cannot be in the past"
+        )
+    
+    if reminder.schedule_type in CALENDAR_SCHEDULE_TYPES:
+        try:
+            compiled = compile_schedule(
+                reminder.schedule_type, reminder.schedule_expression, reminder.timezone
+            )
+            if reminder.schedule_type == "cron":
+                # First fire at or after the start
+                return compiled.next_after((start_time or now) - timedelta(microseconds=1))
+            if not reminder.interval_minutes:
+                raise ValueError("business_hours schedules need interval_minutes")
+            return compiled.next_open(start_time or now + timedelta(minutes=reminder.interval_minutes))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    if start_time is not None:
+        return start_time
+    
+    # No start_time provided
+    if reminder.schedule_type == "recurring" and reminder.interval_minutes:
+        # Recurring without start_time: start after first interval
+        return now + timedelta(minutes=reminder.interval_minutes)
+    # One-time without start_time: send immediately
+    return now
+
+
+# Single statement for one or many new rows. The partial unique index on
+# (entity_type, entity_id, event_type) turns duplicates into no-ops, and
+# RETURNING tells us which rows were actually inserted.
+INSERT_REMINDERS_SQL = f"""
+INSERT INTO reminder_jobs (
+    entity_type, entity_id, event_type, channel, schedule_type, interval_minutes,
+    start_time, next_run_at, stop_condition_type, stop_condition_value,
+    catch_up_policy, schedule_anchor, jitter_seconds, schedule_expression, timezone,
+    status, created_at, updated_at
+)
+SELECT u.*, $16, $17, $17
+FROM unnest(
+    $1::varchar[], $2::varchar[], $3::varchar[], $4::varchar[], $5::varchar[],
+    $6::int[], $7::timestamptz[], $8::timestamptz[], $9::varchar[], $10::varchar[],
+    $11::varchar[], $12::varchar[], $13::int[], $14::varchar[], $15::varchar[]
+) AS u
+ON CONFLICT (entity_type, entity_id, event_type) WHERE {ACTIVE_IDEMPOTENCY_PREDICATE}
+DO NOTHING
+RETURNING id, entity_type, entity_id, event_type
+"""
+
+INSERT_COLUMNS = (
+    "entity_type", "entity_id", "event_type", "channel", "schedule_type", "interval_minutes",
+    "start_time", "next_run_at", "stop_condition_type", "stop_condition_value",
+    "catch_up_policy", "schedule_anchor", "jitter_seconds", "schedule_expression", "timezone",
+)
+
+# Live rows for a set of (entity_type, entity_id, event_type) keys, matched on
+# the whole key so a bulk request never reads rows outside the keys it sent
+ACTIVE_BY_KEY_SQL = f"""
+SELECT r.id
+FROM reminder_jobs r
+JOIN unnest($1::varchar[], $2::varchar[], $3::varchar[]) AS k(entity_type, entity_id, event_type)
+  ON r.entity_type = k.entity_type
+ AND r.entity_id = k.entity_id
+ AND r.event_type = k.event_type
+WHERE {ACTIVE_IDEMPOTENCY_PREDICATE}
+"""
+
+
+def _idempotency_key(item) -> tuple:
+    return (item.entity_type, item.entity_id, item.event_type)
+
+
+def _new_reminder_job(item: schemas.ReminderCreate, next_run: datetime, now: datetime) -> models.ReminderJob:
+    """Unsaved ReminderJob for a create payload"""
+    return models.ReminderJob(
+        entity_type=item.entity_type,
+        entity_id=item.entity_id,
+        event_type=item.event_type,
+        channel=item.channel,
+        schedule_type=item.schedule_type,
+        interval_minutes=item.interval_minutes,
+        stop_condition_type=item.stop_condition_type,
+        stop_condition_value=item.stop_condition_value,
+        next_run_at=next_run,
+        # Stored in UTC; anchors the schedule grid
+        start_time=_resolve_start_time(item),
+        catch_up_policy=item.catch_up_policy,
+        schedule_anchor=item.schedule_anchor,
+        jitter_seconds=item.jitter_seconds,
+        schedule_expression=item.schedule_expression,
+        timezone=item.timezone,
+        status=ReminderStatus.ACTIVE,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+async def _insert_reminders(rows: dict, now: datetime) -> set:
+    """
+    Insert new reminders keyed by idempotency key, skipping conflicts.
+    
+    Returns:
+        set: Keys that were inserted (their rows get their ids assigned)
+    """
+    jobs = list(rows.values())
+    conn = Tortoise.get_connection("default")
+    _, inserted = await conn.execute_query(
+        INSERT_REMINDERS_SQL,
+        [[getattr(job, column) for job in jobs] for column in INSERT_COLUMNS]
+        + [ReminderStatus.ACTIVE.value, now],
+    )
+    
+    inserted_keys = set()
+    for record in inserted:
+        key = (record["entity_type"], record["entity_id"], record["event_type"])
+        rows[key].id = record["id"]
+        inserted_keys.add(key)
+    return inserted_keys
+
+
+async def _active_reminders(keys) -> dict:
+    """Live ACTIVE reminders for the given idempotency keys, matched on the full key"""
+    keys = set(keys)
+    if not keys:
+        return {}
+    entity_types, entity_ids, event_types = (list(column) for column in zip(*keys))
+    conn = Tortoise.get_connection("default")
+    _, rows = await conn.execute_query(
+        ACTIVE_BY_KEY_SQL, [entity_types, entity_ids, event_types]
+    )
+    if not rows:
+        return {}
+    
+    matches = await models.ReminderJob.filter(id__in=[row["id"] for row in rows])
+    return {_idempotency_key(r): r for r in matches}
 
 
 @router.post("/", response_model=schemas.ReminderResponse)
 async def create_reminder(reminder: schemas.ReminderCreate):
-    """Create a new reminder"""
+    """Create a new reminder (idempotent on entity_type/entity_id/event_type)"""
+    key = _idempotency_key(reminder)
+    now = datetime.now(timezone.utc)
     
-    # Idempotency check
-    existing = await models.ReminderJob.filter(
-        entity_type=reminder.entity_type,
-        entity_id=reminder.entity_id,
-        event_type=reminder.event_type,
-        status=ReminderStatus.ACTIVE,
-        deleted_at__isnull=True
-    ).first()
+    try:
+        next_run = _compute_next_run(reminder, now)
+    except HTTPException:
+        # A retried request whose start_time has since passed still gets its reminder back
+        existing = (await _active_reminders([key])).get(key)
+        if existing:
+            return await schemas.ReminderResponse.from_tortoise_orm(existing)
+        raise
     
-    if existing:
-        return await schemas.ReminderResponse.from_tortoise_orm(existing)
+    db_reminder = _new_reminder_job(reminder, next_run, now)
+    for _ in range(CREATE_ATTEMPTS):
+        if await _insert_reminders({key: db_reminder}, now):
+            logger.debug("Reminder created", extra={"reminder_id": db_reminder.id, "entity": f"{key[0]}/{key[1]}"})
+            await notify_wakeup(db_reminder.next_run_at)
+            return await schemas.ReminderResponse.from_tortoise_orm(db_reminder)
+        
+        # Conflict: return the reminder that won. If it was completed or deleted in
+        # the meantime, the next INSERT goes through.
+        existing = (await _active_reminders([key])).get(key)
+        if existing:
+            return await schemas.ReminderResponse.from_tortoise_orm(existing)
     
-    # Compute next run
+    raise HTTPException(status_code=409, detail="Reminder is being modified concurrently, retry")
+
+
+@router.post("/bulk", response_model=list[schemas.ReminderBulkResult])
+async def create_reminders_bulk(items: list[schemas.ReminderCreate]):
+    """
+    Create many reminders at once.
+    
+    Idempotency is resolved for the whole batch with one query and new rows
+    are written with a single INSERT. Results come back in input order.
+    """
+    if len(items) > MAX_BULK_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_SIZE} items per request")
+    
+    # Validate everything before writing anything
     now = datetime.now(timezone.utc)
+    next_runs = []
+    for index, item in enumerate(items):
+        try:
+            next_runs.append(_compute_next_run(item, now))
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=f"Item {index}: {e.detail}")
+    
+    # Idempotency for the whole batch in one query
+    existing = await _active_reminders(_idempotency_key(item) for item in items)
+    
+    # New rows, collapsing duplicates inside the request itself
+    new_rows = {}
+    for item, next_run in zip(items, next_runs):
+        key = _idempotency_key(item)
+        if key not in existing and key not in new_rows:
+            new_rows[key] = _new_reminder_job(item, next_run, now)
     
-    if reminder.start_time:
-        # Use the provided start time (convert from IST to UTC if needed)
-        if reminder.start_time.tzinfo is None:
-            # Assume IST if no timezone provided
-            start_time_ist = IST.localize(reminder.start_time)
-            next_run = start_time_ist.astimezone(timezone.utc)
+    created = set()
+    if new_rows:
+        created = await _insert_reminders(new_rows, now)
+        # Rows that lost a race against a concurrent create
+        existing.update(await _active_reminders(new_rows.keys() - created))
+        if created:
+            await notify_wakeup(min(new_rows[key].next_run_at for key in created))
+    
+    logger.info("Bulk create", extra={
+        "items": len(items), "created": len(created), "existing": len(items) - len(created),
+    })
+    
+    results = []
+    reported = set()
+    for item in items:
+        key = _idempotency_key(item)
+        if key in created and key not in reported:
+            status, reminder = "created", new_rows[key]
+            reported.add(key)
+        elif key in created:
+            # Later duplicate of a row created by this request
+            status, reminder = "existing", new_rows[key]
+        elif key in existing:
+            status, reminder = "existing", existing[key]
         else:
-            next_run = reminder.start_time.astimezone(timezone.utc)
-        
-        # Don't allow scheduling in the past
-        if next_run < now:
-            raise HTTPException(
-                status_code=400, 
-                detail="Start time cannot be in the past"
-            )
+            raise HTTPException(status_code=409, detail="Reminder is being modified concurrently, retry")
+        results.append({
+            "status": status,
+            "reminder": await schemas.ReminderResponse.from_tortoise_orm(reminder),
+        })
+    
+    return results
+
+
+MAX_PAGE_SIZE = 1000
+EXPORT_CHUNK_SIZE = 1000
+SORT_KEYS = ("id", "next_run_at")
+
+# Read routes fetch plain column values and encode them with orjson instead of
+# building model instances and pydantic objects per row (same JSON either way)
+FAST_READ_PATH = os.getenv("API_FAST_READ_PATH", "true").lower() == "true"
+RESPONSE_FIELDS = tuple(schemas.ReminderResponse.model_fields)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded by orjson; UTC datetimes end in Z as pydantic writes them"""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def _encode_cursor(row, sort: str) -> str:
+    """Opaque keyset cursor pointing just past `row`"""
+    if sort == "next_run_at":
+        raw = f"{row['next_run_at'].isoformat()}|{row['id']}"
     else:
-        # No start_time provided
-        if reminder.schedule_type == "recurring" and reminder.interval_minutes:
-            # Recurring without start_time: start after first interval
-            next_run = now + timedelta(minutes=reminder.interval_minutes)
-        else:
-            # One-time without start_time: send immediately
-            next_run = now
-    
-    # Create reminder
-    db_reminder = await models.ReminderJob.create(
-        entity_type=reminder.entity_type,
-        entity_id=reminder.entity_id,
-        event_type=reminder.event_type,
-        channel=reminder.channel,
-        schedule_type=reminder.schedule_type,
-        interval_minutes=reminder.interval_minutes,
-        stop_condition_type=reminder.stop_condition_type,
-        stop_condition_value=reminder.stop_condition_value,
-        next_run_at=next_run,
-        start_time=reminder.start_time,
-    )
+        raw = str(row["id"])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _keyset_filter(cursor: str, sort: str) -> Q:
+    """Q filter selecting rows strictly after the cursor position"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        if sort == "next_run_at":
+            run_at, last_id = raw.rsplit("|", 1)
+            run_at = datetime.fromisoformat(run_at)
+            return Q(next_run_at__gt=run_at) | Q(next_run_at=run_at, id__gt=int(last_id))
+        return Q(id__gt=int(raw))
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _filtered_reminders(
+    sort: str,
+    entity_type: Optional[str] = None,
+    event_type: Optional[str] = None,
+    status: Optional[ReminderStatus] = None,
+    channel: Optional[str] = None,
+    archived: bool = False,
+):
+    """Base query for list endpoints (excluding soft-deleted), in keyset order, on the read replica"""
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORT_KEYS)}")
+    
+    filters = {"deleted_at__isnull": True}
+    if entity_type is not None:
+        filters["entity_type"] = entity_type
+    if event_type is not None:
+        filters["event_type"] = event_type
+    if status is not None:
+        filters["status"] = status
+    if channel is not None:
+        filters["channel"] = channel
+    if sort == "next_run_at":
+        filters["next_run_at__isnull"] = False
     
-    return await schemas.ReminderResponse.from_tortoise_orm(db_reminder)
+    # Archived (completed/deleted, moved out of the hot table) rows live in their own table
+    model = models.ReminderJobArchive if archived else models.ReminderJob
+    query = model.filter(**filters).using_db(read_db())
+    return query.order_by(*(("next_run_at", "id") if sort == "next_run_at" else ("id",)))
 
 
-@router.get("/", response_model=list[schemas.ReminderResponse])
-async def list_reminders():
-    """List all reminders (excluding soft-deleted)"""
-    reminders = await models.ReminderJob.filter(deleted_at__isnull=True).all()
+async def _page(query, response: Response, limit: int, cursor: Optional[str], sort: str):
+    """Fetch one keyset page; the next cursor goes into the X-Next-Cursor header"""
+    if cursor:
+        query = query.filter(_keyset_filter(cursor, sort))
+    
+    if FAST_READ_PATH:
+        rows = await query.limit(limit).values(*RESPONSE_FIELDS)
+        page = FastJSONResponse(rows)
+        if len(rows) == limit:
+            page.headers["X-Next-Cursor"] = _encode_cursor(rows[-1], sort)
+        return page
+    
+    reminders = await query.limit(limit)
+    if len(reminders) == limit:
+        last = reminders[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(
+            {"id": last.id, "next_run_at": last.next_run_at}, sort
+        )
     return [await schemas.ReminderResponse.from_tortoise_orm(r) for r in reminders]
 
 
+@router.get("/", response_model=list[schemas.ReminderResponse])
+async def list_reminders(
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    entity_type: Optional[str] = None,
+    event_type: Optional[str] = None,
+    status: Optional[ReminderStatus] = None,
+    channel: Optional[str] = None,
+    archived: bool = Query(False, description="List archived reminders instead of live ones"),
+):
+    """List reminders (excluding soft-deleted), one keyset page at a time"""
+    query = _filtered_reminders(sort, entity_type, event_type, status, channel, archived)
+    return await _page(query, response, limit, cursor, sort)
+
+
 @router.get("/active", response_model=list[schemas.ReminderResponse])
-async def list_active_reminders():
-    """List only active reminders"""
-    reminders = await models.ReminderJob.filter(
-        status=ReminderStatus.ACTIVE,
-        deleted_at__isnull=True
-    ).all()
-    return [await schemas.ReminderResponse.from_tortoise_orm(r) for r in reminders]
+async def list_active_reminders(
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    entity_type: Optional[str] = None,
+    event_type: Optional[str] = None,
+    channel: Optional[str] = None,
+):
+    """List only active reminders, one keyset page at a time"""
+    query = _filtered_reminders(sort, entity_type, event_type, ReminderStatus.ACTIVE, channel)
+    return await _page(query, response, limit, cursor, sort)
+
+
+@router.get("/export")
+async def export_reminders(
+    sort: str = "id",
+    entity_type: Optional[str] = None,
+    event_type: Optional[str] = None,
+    status: Optional[ReminderStatus] = None,
+    channel: Optional[str] = None,
+    archived: bool = Query(False, description="Export archived reminders instead of live ones"),
+):
+    """Stream matching reminders as NDJSON with constant memory"""
+    query = _filtered_reminders(sort, entity_type, event_type, status, channel, archived)
+    
+    async def rows():
+        # Walk the table in keyset chunks so only one chunk is held at a time
+        chunk_query = query
+        while True:
+            chunk = await chunk_query.limit(EXPORT_CHUNK_SIZE).values(*RESPONSE_FIELDS)
+            yield b"".join(orjson.dumps(row, option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE) for row in chunk)
+            if len(chunk) < EXPORT_CHUNK_SIZE:
+                break
+            chunk_query = query.filter(_keyset_filter(_encode_cursor(chunk[-1], sort), sort))
+    
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+# Fixed paths (/forecast, /bulk/...) are registered before the /{reminder_id} routes
+# so they are not taken for an id
+@router.get("/forecast", response_model=schemas.SendForecast)
+async def forecast_sends(
+    horizon_hours: int = Query(24, ge=1, le=MAX_HORIZON_HOURS),
+    bucket_minutes: int = Query(1, ge=1, le=1440),
+    channel: Optional[str] = Query(None, description="Only this channel"),
+):
+    """Projected sends per channel per bucket over the horizon (cached briefly)"""
+    forecast = await send_forecast(horizon_hours, bucket_minutes)
+    if channel is not None:
+        forecast = {**forecast, "channels": {
+            name: data for name, data in forecast["channels"].items() if name == channel
+        }}
+    return FastJSONResponse(forecast)
+
+
+# Pending delivery retries of reminders being resumed, in the resume's transaction:
+# the resume reschedules the send, so the retry loop must not deliver it as well.
+# Retries leased by the retry loop (mid-send) are kept, and their reminder stays paused.
+CLEAR_RETRIES_SQL = """
+DELETE FROM delivery_retries
+WHERE reminder_id = ANY($1::int[])
+  AND (lease_expires_at IS NULL OR lease_expires_at < $2)
+"""
+
+# Resume one batch of paused reminders, skipping any whose idempotency key already has
+# an active reminder (the partial unique index would reject the whole statement) and
+# any with a retry still in flight (run after CLEAR_RETRIES_SQL)
+RESUME_SQL = """
+WITH resumed AS (
+    UPDATE reminder_jobs r
+    SET status = 'ACTIVE', next_run_at = u.next_run_at, updated_at = $3
+    FROM unnest($1::int[], $2::timestamptz[]) AS u(id, next_run_at)
+    WHERE r.id = u.id
+      AND r.status = 'PAUSED' AND r.deleted_at IS NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM reminder_jobs a
+          WHERE a.entity_type = r.entity_type
+            AND a.entity_id = r.entity_id
+            AND a.event_type = r.event_type
+            AND a.status = 'ACTIVE' AND a.deleted_at IS NULL
+      )
+      AND NOT EXISTS (SELECT 1 FROM delivery_retries d WHERE d.reminder_id = r.id)
+    RETURNING r.next_run_at
+)
+SELECT count(*) AS resumed, min(next_run_at) AS next_run_at FROM resumed
+"""
+
+
+def _selected_reminders(selector: schemas.ReminderSelector, **filters):
+    """Live (not soft-deleted) reminders matching a bulk selector"""
+    filters["deleted_at__isnull"] = True
+    if selector.ids is not None:
+        filters["id__in"] = selector.ids
+    for field in ("entity_type", "entity_id", "event_type", "channel"):
+        value = getattr(selector, field)
+        if value is not None:
+            filters[field] = value
+    query = models.ReminderJob.filter(**filters)
+    if selector.status is not None:
+        query = query.filter(status=selector.status)
+    return query
+
+
+@router.post("/bulk/pause", response_model=schemas.ReminderBulkActionResult)
+async def pause_reminders_bulk(selector: schemas.ReminderSelector):
+    """Pause every matching active reminder in one UPDATE"""
+    paused = await _selected_reminders(selector, status=ReminderStatus.ACTIVE).update(
+        status=ReminderStatus.PAUSED, updated_at=datetime.now(timezone.utc)
+    )
+    logger.info("Bulk pause", extra={"paused": paused})
+    return {"affected": paused}
+
+
+@router.post("/bulk/resume", response_model=schemas.ReminderBulkActionResult)
+async def resume_reminders_bulk(selector: schemas.ReminderSelector):
+    """
+    Resume every matching paused reminder with a recomputed next_run_at.
+    
+    The selection is walked in id order, RESUME_CHUNK_SIZE reminders at a time,
+    with one UPDATE per chunk.
+    """
+    now = datetime.now(timezone.utc)
+    query = _selected_reminders(selector, status=ReminderStatus.PAUSED)
+    matched, resumed, next_run_at, last_id = 0, 0, None, 0
+    
+    try:
+        while True:
+            paused = await query.filter(id__gt=last_id).order_by("id").limit(RESUME_CHUNK_SIZE)
+            if not paused:
+                break
+            matched += len(paused)
+            last_id = paused[-1].id
+            
+            # Reminders that clash with one resumed by an earlier chunk are left
+            # paused by RESUME_SQL itself
+            ids, next_runs, keys = [], [], set()
+            for reminder in paused:
+                key = _idempotency_key(reminder)
+                if key in keys:
+                    # Only one reminder per entity and event may be active
+                    continue
+                try:
+                    next_run = schedule.next_run_after(reminder, now) if schedule.is_recurring(reminder) else now
+                except ValueError:
+                    continue
+                keys.add(key)
+                ids.append(reminder.id)
+                next_runs.append(next_run)
+            
+            if ids:
+                try:
+                    async with in_transaction() as conn:
+                        await conn.execute_query(CLEAR_RETRIES_SQL, [ids, now])
+                        _, rows = await conn.execute_query(RESUME_SQL, [ids, next_runs, now])
+                except IntegrityError:
+                    logger.info("Bulk resume conflicts with a concurrent change", extra={
+                        "reminders": len(ids), "resumed": resumed,
+                    })
+                    raise HTTPException(status_code=409, detail="Reminders are being modified concurrently, retry")
+                resumed += rows[0]["resumed"]
+                chunk_next_run = rows[0]["next_run_at"]
+                if chunk_next_run is not None and (next_run_at is None or chunk_next_run < next_run_at):
+                    next_run_at = chunk_next_run
+            
+            if len(paused) < RESUME_CHUNK_SIZE:
+                break
+    finally:
+        # Chunks already resumed stay resumed even if a later one fails
+        if next_run_at is not None:
+            await notify_wakeup(next_run_at)
+    
+    logger.info("Bulk resume", extra={"resumed": resumed, "skipped": matched - resumed})
+    return {"affected": resumed, "skipped": matched - resumed}
+
+
+@router.post("/bulk/delete", response_model=schemas.ReminderBulkActionResult)
+async def delete_reminders_bulk(selector: schemas.ReminderSelector):
+    """Soft delete every matching reminder in one UPDATE"""
+    now = datetime.now(timezone.utc)
+    deleted = await _selected_reminders(selector).update(
+        deleted_at=now, status=ReminderStatus.COMPLETED, updated_at=now
+    )
+    logger.info("Bulk delete", extra={"deleted": deleted})
+    return {"affected": deleted}
 
 
 @router.get("/{reminder_id}", response_model=schemas.ReminderResponse)
-async def get_reminder(reminder_id: int):
+async def get_reminder(
+    reminder_id: int,
+    include_archived: bool = Query(False, description="Also look in the archive"),
+):
     """Get a specific reminder"""
-    reminder = await models.ReminderJob.filter(id=reminder_id, deleted_at__isnull=True).first()
-    if not reminder:
-        raise HTTPException(status_code=404, detail="Reminder not found")
-    return await schemas.ReminderResponse.from_tortoise_orm(reminder)
+    db = read_db()
+    candidates = [models.ReminderJob] + ([models.ReminderJobArchive] if include_archived else [])
+    for model in candidates:
+        query = model.filter(id=reminder_id, deleted_at__isnull=True).using_db(db)
+        if FAST_READ_PATH:
+            row = await query.first().values(*RESPONSE_FIELDS)
+            if row:
+                return FastJSONResponse(row)
+        else:
+            reminder = await query.first()
+            if reminder:
+                return await schemas.ReminderResponse.from_tortoise_orm(reminder)
+    raise HTTPException(status_code=404, detail="Reminder not found")
 
 
 @router.delete("/{reminder_id}")
@@ -138,12 +638,31 @@ async def resume_reminder(reminder_id: int):
     
     # Reschedule based on type
     now = datetime.now(timezone.utc)
-    if reminder.schedule_type == "recurring" and reminder.interval_minutes:
-        reminder.next_run_at = now + timedelta(minutes=reminder.interval_minutes)
+    if schedule.is_recurring(reminder):
+        try:
+            reminder.next_run_at = schedule.next_run_after(reminder, now)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     else:
         # One-time reminder: schedule immediately
         reminder.next_run_at = now
     
-    await reminder.save()
+    async with in_transaction() as conn:
+        # The resume reschedules the send: a pending retry must not deliver it too
+        await conn.execute_query(CLEAR_RETRIES_SQL, [[reminder_id], now])
+        if await models.DeliveryRetry.filter(reminder_id=reminder_id).using_db(conn).exists():
+            raise HTTPException(
+                status_code=409,
+                detail="A delivery retry for this reminder is in progress, retry shortly"
+            )
+        try:
+            await reminder.save(using_db=conn)
+        except IntegrityError:
+            logger.info("Resume conflicts with an active reminder", extra={"reminder_id": reminder_id})
+            raise HTTPException(
+                status_code=409,
+                detail="Another active reminder exists for this entity and event"
+            )
+    await notify_wakeup(reminder.next_run_at)
     
     return {"message": "Reminder resumed successfully", "id": reminder_id}
\ No newline at end of file
@@ -0,0 +1,83 @@
+import logging
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException
+from tortoise.transactions import in_transaction
+
+from app import models, schemas
+from app.database import read_db
+from app.models import ReminderStatus
+from app.scheduler.wakeup import notify_flags_changed
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+MAX_BULK_SIZE = 5000
+
+UPSERT_FLAGS_SQL = """
+INSERT INTO status_flags (key, value, created_at, updated_at)
+SELECT u.key, u.value, $3, $3
+FROM unnest($1::varchar[], $2::bool[]) AS u(key, value)
+ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at
+"""
+
+
+async def _write_flags(values: dict) -> int:
+    """
+    Upsert flags and complete every reminder waiting on a flag that is now true.
+
+    Both statements run in one transaction. Returns the number of reminders completed.
+    """
+    now = datetime.now(timezone.utc)
+    true_keys = [key for key, value in values.items() if value]
+    
+    async with in_transaction() as conn:
+        await conn.execute_query(
+            UPSERT_FLAGS_SQL, [list(values), list(values.values()), now]
+        )
+        
+        completed = 0
+        if true_keys:
+            completed = await models.ReminderJob.filter(
+                status=ReminderStatus.ACTIVE,
+                deleted_at__isnull=True,
+                stop_condition_type="db_check",
+                stop_condition_value__in=true_keys,
+            ).using_db(conn).update(status=ReminderStatus.COMPLETED, updated_at=now)
+    
+    # Drop stale values from the workers' flag caches
+    await notify_flags_changed(list(values))
+    logger.info("Status flags written", extra={
+        "flags": len(values), "true_flags": len(true_keys), "completed_reminders": completed,
+    })
+    return completed
+
+
+@router.get("/{key}", response_model=schemas.StatusFlagItem)
+async def get_status_flag(key: str):
+    """Get a status flag"""
+    flag = await models.StatusFlag.filter(key=key).using_db(read_db()).first()
+    if not flag:
+        raise HTTPException(status_code=404, detail="Status flag not found")
+    return {"key": flag.key, "value": flag.value}
+
+
+@router.put("/{key}", response_model=schemas.StatusFlagWriteResult)
+async def set_status_flag(key: str, flag: schemas.StatusFlagSet):
+    """Set a status flag; setting it true completes every active reminder waiting on it"""
+    completed = await _write_flags({key: flag.value})
+    return {"flags": [{"key": key, "value": flag.value}], "completed_reminders": completed}
+
+
+@router.post("/bulk", response_model=schemas.StatusFlagWriteResult)
+async def set_status_flags_bulk(flags: list[schemas.StatusFlagItem]):
+    """Set many status flags at once (the last value wins for repeated keys)"""
+    if len(flags) > MAX_BULK_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_SIZE} items per request")
+    
+    values = {flag.key: flag.value for flag in flags}
+    completed = await _write_flags(values) if values else 0
+    return {
+        "flags": [{"key": key, "value": value} for key, value in values.items()],
+        "completed_reminders": completed,
+    }
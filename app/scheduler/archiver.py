@@ -0,0 +1,110 @@
+"""
+Moves terminal reminders (COMPLETED, FAILED or soft-deleted) from reminder_jobs into
+reminder_jobs_archive, so the hot table and its indexes only hold live rows.
+
+Runs as a background loop inside the scheduler worker, or once from the
+command line (e.g. from cron):
+
+    python -m app.scheduler.archiver
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from tortoise import Tortoise
+
+from app.models import ReminderJob
+
+logger = logging.getLogger(__name__)
+
+# Terminal rows older than this stay in reminder_jobs (recent history stays cheap to read)
+ARCHIVE_AFTER_HOURS = float(os.getenv("ARCHIVE_AFTER_HOURS", "168"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+# Seconds between archival runs in the worker (0 disables the loop)
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+COLUMNS = ", ".join(ReminderJob._meta.fields_db_projection.values())
+
+# Move one batch in a single statement. SKIP LOCKED keeps concurrent archivers
+# (one per worker) on disjoint rows.
+ARCHIVE_SQL = f"""
+WITH batch AS (
+    SELECT id FROM reminder_jobs
+    WHERE (status IN ('COMPLETED', 'FAILED') OR deleted_at IS NOT NULL)
+      AND COALESCE(deleted_at, updated_at) < $1
+    LIMIT $2
+    FOR UPDATE SKIP LOCKED
+),
+moved AS (
+    DELETE FROM reminder_jobs r
+    USING batch
+    WHERE r.id = batch.id
+    RETURNING r.*
+),
+archived AS (
+    INSERT INTO reminder_jobs_archive ({COLUMNS}, archived_at)
+    SELECT {COLUMNS}, $3 FROM moved
+    RETURNING 1
+)
+SELECT count(*) AS archived FROM archived
+"""
+
+
+async def archive_batch(cutoff: datetime, limit: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Archive up to `limit` terminal reminders last changed before `cutoff`"""
+    conn = Tortoise.get_connection("default")
+    _, rows = await conn.execute_query(
+        ARCHIVE_SQL, [cutoff, limit, datetime.now(timezone.utc)]
+    )
+    return rows[0]["archived"]
+
+
+async def archive_terminal_reminders(now: datetime = None) -> int:
+    """
+    Archive every eligible row, one batch (and transaction) at a time.
+
+    Returns:
+        int: Number of rows archived
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(hours=ARCHIVE_AFTER_HOURS)
+    total = 0
+    while True:
+        archived = await archive_batch(cutoff)
+        total += archived
+        if archived < ARCHIVE_BATCH_SIZE:
+            break
+        # Yield between batches so the worker's tick is not starved
+        await asyncio.sleep(0)
+    return total
+
+
+async def run_archiver(interval: float = ARCHIVE_INTERVAL_SECONDS):
+    """Archive terminal reminders every `interval` seconds until cancelled"""
+    while True:
+        try:
+            archived = await archive_terminal_reminders()
+            if archived:
+                logger.info("Archived reminders", extra={"archived": archived})
+        except Exception:
+            logger.exception("Archival failed")
+        await asyncio.sleep(interval)
+
+
+async def _main():
+    from app.database import close_db, init_db
+
+    await init_db(role="worker")
+    try:
+        archived = await archive_terminal_reminders()
+        logger.info("Archived reminders", extra={"archived": archived})
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    from app.logging_config import setup_logging
+
+    setup_logging()
+    asyncio.run(_main())
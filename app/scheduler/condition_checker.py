@@ -1,10 +1,118 @@
+import os
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
 from app.models import ReminderJob, StatusFlag
 
+FLAG_CACHE_TTL_SECONDS = float(os.getenv("FLAG_CACHE_TTL_SECONDS", "60"))
+FLAG_CACHE_MAX_ENTRIES = int(os.getenv("FLAG_CACHE_MAX_ENTRIES", "100000"))
+
+# A batch evaluator receives every due reminder sharing one stop_condition_type
+# and returns {reminder_id: stop_condition_met}
+BatchEvaluator = Callable[[List[ReminderJob]], Awaitable[Dict[int, bool]]]
+
+BATCH_EVALUATORS: Dict[str, BatchEvaluator] = {}
+
+
+def register_batch_evaluator(condition_type: str):
+    """Register a batch evaluator for a stop_condition_type"""
+    def decorator(func: BatchEvaluator) -> BatchEvaluator:
+        BATCH_EVALUATORS[condition_type] = func
+        return func
+    return decorator
+
+
+class FlagCache:
+    """
+    In-process cache of StatusFlag values for the worker.
+
+    Entries are dropped when the API announces a flag write (see
+    app.scheduler.wakeup) and expire after `ttl` seconds as a safety net for
+    flags changed directly in the database.
+    """
+
+    def __init__(self, ttl: float = FLAG_CACHE_TTL_SECONDS, max_entries: int = FLAG_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[bool, float]] = {}
+
+    def get_many(self, keys) -> Tuple[Dict[str, bool], Set[str]]:
+        """Cached values for keys, and the keys that must be fetched"""
+        now = time.monotonic()
+        hits, misses = {}, set()
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                hits[key] = entry[0]
+            else:
+                misses.add(key)
+        return hits, misses
+
+    def set_many(self, values: Dict[str, bool]):
+        now = time.monotonic()
+        if len(self._entries) + len(values) > self.max_entries:
+            # Drop expired entries first; start over if that is not enough
+            self._entries = {
+                key: entry for key, entry in self._entries.items() if now - entry[1] < self.ttl
+            }
+            if len(self._entries) + len(values) > self.max_entries:
+                self._entries.clear()
+        for key, value in values.items():
+            self._entries[key] = (value, now)
+
+    def invalidate(self, keys: Optional[Iterable[str]] = None):
+        """Drop the given keys, or everything when keys is None"""
+        if keys is None:
+            self._entries.clear()
+            return
+        for key in keys:
+            self._entries.pop(key, None)
+
+
+flag_cache = FlagCache()
+
+
+@register_batch_evaluator("db_check")
+async def evaluate_db_check(reminders: List[ReminderJob]) -> Dict[int, bool]:
+    """Resolve db_check keys from the flag cache, fetching misses with one key__in query"""
+    flags, misses = flag_cache.get_many({r.stop_condition_value for r in reminders})
+    if misses:
+        fetched = dict(
+            await StatusFlag.filter(key__in=misses).values_list("key", "value")
+        )
+        # Missing rows are cached as False too, so unknown keys are not re-queried every tick
+        fetched = {key: fetched.get(key) is True for key in misses}
+        flag_cache.set_many(fetched)
+        flags.update(fetched)
+    return {r.id: flags[r.stop_condition_value] for r in reminders}
+
+
+async def evaluate_stop_conditions(reminders: List[ReminderJob]) -> Dict[int, bool]:
+    """
+    Evaluate stop conditions for a whole batch of reminders.
+
+    Reminders are grouped by stop_condition_type and each group is handed to
+    its registered batch evaluator. Unknown condition types never stop.
+
+    Returns:
+        dict: reminder id -> True if the stop condition is met
+    """
+    groups: Dict[str, List[ReminderJob]] = defaultdict(list)
+    for reminder in reminders:
+        groups[reminder.stop_condition_type].append(reminder)
+
+    verdicts = {reminder.id: False for reminder in reminders}
+    for condition_type, group in groups.items():
+        evaluator = BATCH_EVALUATORS.get(condition_type)
+        if evaluator is None:
+            continue
+        verdicts.update(await evaluator(group))
+
+    return verdicts
+
 
 async def is_stop_condition_met(reminder: ReminderJob) -> bool:
     """Check if reminder's stop condition is met"""
-    if reminder.stop_condition_type == "db_check":
-        flag = await StatusFlag.filter(key=reminder.stop_condition_value).first()
-        return flag is not None and flag.value is True
-    
-    return False
\ No newline at end of file
+    verdicts = await evaluate_stop_conditions([reminder])
+    return verdicts[reminder.id]
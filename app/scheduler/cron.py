@@ -0,0 +1,201 @@
+"""
+Calendar schedules: cron expressions and business-hours windows.
+
+Expressions are parsed once by compile_schedule() and cached by
+(schedule_type, expression, timezone). Compiled schedules remember their last
+answer, so a batch of reminders sharing an expression costs one computation
+per tick.
+
+Expressions:
+    cron:           standard 5 fields, "minute hour day-of-month month day-of-week"
+                    (e.g. "0 9 * * mon-fri"); names, ranges, lists and steps work
+    business_hours: "<days> <HH:MM>-<HH:MM>" (e.g. "mon-fri 09:00-18:00"); runs
+                    every interval_minutes, moved to the next opening when outside
+"""
+import os
+from bisect import bisect_left
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+import pytz
+
+DEFAULT_TIMEZONE = os.getenv("SCHEDULE_TIMEZONE", "Asia/Kolkata")
+DEFAULT_BUSINESS_HOURS = os.getenv("BUSINESS_HOURS", "mon-fri 09:00-18:00")
+
+CALENDAR_SCHEDULE_TYPES = ("cron", "business_hours")
+
+MONTH_NAMES = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+# Cron numbering: 0 (and 7) = Sunday
+DAY_NAMES = ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
+
+# Give up on expressions that never fire (e.g. "0 0 30 2 *")
+MAX_SEARCH_DAYS = 366 * 5
+
+
+def _parse_field(field: str, low: int, high: int, names: Tuple[str, ...] = ()) -> List[int]:
+    """Allowed values of one cron field, sorted"""
+    def value(token: str) -> int:
+        token = token.lower()
+        if token in names:
+            return names.index(token) + low
+        number = int(token)
+        if not low <= number <= high:
+            raise ValueError(f"{token} is out of range {low}-{high}")
+        return number
+
+    values = set()
+    for part in field.split(","):
+        span, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if step < 1:
+            raise ValueError(f"Invalid step in {part!r}")
+        if span == "*":
+            start, end = low, high
+        elif "-" in span:
+            start, end = (value(t) for t in span.split("-", 1))
+        else:
+            start = value(span)
+            end = high if step > 1 else start
+        if start > end:
+            raise ValueError(f"Invalid range {span!r}")
+        values.update(range(start, end + 1, step))
+    return sorted(values)
+
+
+def _parse_days(field: str) -> frozenset:
+    """Python weekdays (0 = Monday) for a day-of-week field"""
+    return frozenset((day - 1) % 7 for day in _parse_field(field, 0, 7, DAY_NAMES))
+
+
+class CronSchedule:
+    """A compiled 5-field cron expression evaluated in a timezone"""
+
+    def __init__(self, expression: str, tz_name: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError("Cron expression needs 5 fields: minute hour day month weekday")
+        minute, hour, day, month, weekday = parts
+
+        self.tz = pytz.timezone(tz_name)
+        self.minutes = _parse_field(minute, 0, 59)
+        self.hours = _parse_field(hour, 0, 23)
+        self.days = frozenset(_parse_field(day, 1, 31))
+        self.months = frozenset(_parse_field(month, 1, 12, MONTH_NAMES))
+        self.weekdays = _parse_days(weekday)
+        # Cron semantics: when both day fields are restricted, either may match
+        self.day_or_weekday = day != "*" and weekday != "*"
+        self.any_day = day == "*" and weekday == "*"
+        self._last: Optional[Tuple[datetime, datetime]] = None
+
+    def _day_matches(self, local: datetime) -> bool:
+        if local.month not in self.months:
+            return False
+        if self.any_day:
+            return True
+        day_ok = local.day in self.days
+        weekday_ok = local.weekday() in self.weekdays
+        return day_ok or weekday_ok if self.day_or_weekday else day_ok and weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """First fire time strictly after `after` (aware), in UTC"""
+        if self._last is not None and self._last[0] == after:
+            return self._last[1]
+
+        local = after.astimezone(self.tz).replace(tzinfo=None, second=0, microsecond=0)
+        local += timedelta(minutes=1)
+        limit = local + timedelta(days=MAX_SEARCH_DAYS)
+
+        while local < limit:
+            if not self._day_matches(local):
+                local = datetime.combine(local.date() + timedelta(days=1), time())
+                continue
+            # First allowed hour:minute at or after the current time of day
+            index = bisect_left(self.hours, local.hour)
+            if index < len(self.hours) and self.hours[index] == local.hour:
+                minute_index = bisect_left(self.minutes, local.minute)
+                if minute_index < len(self.minutes):
+                    local = local.replace(minute=self.minutes[minute_index])
+                    break
+                index += 1
+            if index < len(self.hours):
+                local = local.replace(hour=self.hours[index], minute=self.minutes[0])
+                break
+            local = datetime.combine(local.date() + timedelta(days=1), time())
+        else:
+            raise ValueError("Cron expression never fires")
+
+        result = self.tz.localize(local).astimezone(pytz.utc)
+        self._last = (after, result)
+        return result
+
+    def occurrences(self, start: datetime, end: datetime) -> Iterator[datetime]:
+        """Fire times in [start, end), in UTC"""
+        when = self.next_after(start - timedelta(microseconds=1))
+        while when < end:
+            yield when
+            when = self.next_after(when)
+
+
+class BusinessHours:
+    """Weekly opening windows ("mon-fri 09:00-18:00") evaluated in a timezone"""
+
+    def __init__(self, expression: str, tz_name: str):
+        try:
+            days, window = expression.split()
+            opens, closes = (time.fromisoformat(t) for t in window.split("-"))
+        except ValueError:
+            raise ValueError("Business hours must look like 'mon-fri 09:00-18:00'")
+        if opens >= closes:
+            raise ValueError("Business hours must open before they close")
+
+        self.tz = pytz.timezone(tz_name)
+        self.weekdays = _parse_days(days)
+        self.opens = opens
+        self.closes = closes
+
+    def next_open(self, when: datetime) -> datetime:
+        """`when` itself if inside the window, else the next opening (UTC)"""
+        local = when.astimezone(self.tz)
+        for offset in range(8):
+            day = local.date() + timedelta(days=offset)
+            if day.weekday() not in self.weekdays:
+                continue
+            start = self.tz.localize(datetime.combine(day, self.opens))
+            end = self.tz.localize(datetime.combine(day, self.closes))
+            if local < end:
+                return max(start, local).astimezone(pytz.utc)
+        raise ValueError("Business hours have no open days")
+
+    def windows(self, start: datetime, end: datetime) -> Iterator[Tuple[datetime, datetime]]:
+        """(opens, closes) windows overlapping [start, end), in UTC"""
+        day = start.astimezone(self.tz).date() - timedelta(days=1)
+        last = end.astimezone(self.tz).date()
+        while day <= last:
+            if day.weekday() in self.weekdays:
+                opens = self.tz.localize(datetime.combine(day, self.opens)).astimezone(pytz.utc)
+                closes = self.tz.localize(datetime.combine(day, self.closes)).astimezone(pytz.utc)
+                if closes > start and opens < end:
+                    yield opens, closes
+            day += timedelta(days=1)
+
+
+@lru_cache(maxsize=1024)
+def compile_schedule(schedule_type: str, expression: Optional[str], tz_name: Optional[str]):
+    """
+    Compiled CronSchedule or BusinessHours for a calendar schedule type.
+
+    Raises:
+        ValueError: Invalid expression or unknown timezone
+    """
+    tz_name = tz_name or DEFAULT_TIMEZONE
+    if tz_name not in pytz.all_timezones_set:
+        raise ValueError(f"Unknown timezone {tz_name!r}")
+
+    if schedule_type == "cron":
+        if not expression:
+            raise ValueError("Cron schedules need a schedule_expression")
+        return CronSchedule(expression, tz_name)
+    if schedule_type == "business_hours":
+        return BusinessHours(expression or DEFAULT_BUSINESS_HOURS, tz_name)
+    raise ValueError(f"{schedule_type!r} is not a calendar schedule type")
@@ -0,0 +1,299 @@
+"""
+Send-load forecast: sends per channel per time bucket over a horizon, for sizing
+SMTP quotas and worker counts.
+
+Active reminders are streamed from Postgres as fixed-width binary COPY rows and
+parsed straight into NumPy column arrays (no per-row Python objects). Runs are
+projected per minute, then summed into buckets:
+
+    one-time:        one send at next_run_at
+    recurring:       next_run_at + k * interval (a strided cumulative sum per interval)
+    business_hours:  as recurring, but the runs a closed stretch would have held
+                     become one send per reminder at the next opening. Rescheduled
+                     from the send (anchor "now"), the stride restarts there;
+                     grid-anchored reminders go back to their original grid
+    cron:            next_run_at, then every fire time of the expression after it
+
+Overdue reminders count as due now. Jitter, catch-up spreading, retries and
+rate limits are not modelled. Results are cached for FORECAST_CACHE_SECONDS.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.database import read_db
+from app.scheduler.cron import compile_schedule
+from app.scheduler.schedule import DEFAULT_ANCHOR
+
+logger = logging.getLogger(__name__)
+
+FORECAST_CACHE_SECONDS = float(os.getenv("FORECAST_CACHE_SECONDS", "60"))
+MAX_HORIZON_HOURS = 24 * 31
+
+# Schedule kinds as encoded by the COPY query (mirrors schedule.is_recurring and
+# schedule.next_run_after)
+ONE_TIME, RECURRING, BUSINESS_HOURS, CRON, BUSINESS_HOURS_GRID = 0, 1, 2, 3, 4
+
+# Channels and calendar schedules (type|expression|timezone) of the rows to stream
+GROUPS_SQL = """
+SELECT channel, schedule_type, schedule_expression, timezone
+FROM reminder_jobs
+WHERE status = 'ACTIVE' AND deleted_at IS NULL AND next_run_at < $1
+GROUP BY 1, 2, 3, 4
+"""
+
+# Every column is non-null and fixed width, so each binary COPY row has the same size
+COLUMNS_SQL = """
+SELECT extract(epoch FROM next_run_at)::float8,
+       COALESCE(interval_minutes, 0)::int4,
+       (CASE
+            WHEN schedule_type = 'recurring' AND interval_minutes > 0 THEN 1
+            WHEN schedule_type = 'business_hours' AND interval_minutes > 0
+                 AND COALESCE(schedule_anchor, $4) = 'grid' THEN 4
+            WHEN schedule_type = 'business_hours' AND interval_minutes > 0 THEN 2
+            WHEN schedule_type = 'cron' AND schedule_expression IS NOT NULL THEN 3
+            ELSE 0
+        END)::int2,
+       COALESCE(array_position($2::text[], channel), 0)::int2,
+       COALESCE(array_position(
+           $3::text[],
+           schedule_type || '|' || COALESCE(schedule_expression, '') || '|' || COALESCE(timezone, '')
+       ), 0)::int4
+FROM reminder_jobs
+WHERE status = 'ACTIVE' AND deleted_at IS NULL AND next_run_at < $1
+"""
+
+# One binary COPY tuple: field count, then (length, value) per column, big-endian
+ROW_DTYPE = np.dtype([
+    ("fields", ">i2"),
+    ("run_at_len", ">i4"), ("run_at", ">f8"),
+    ("interval_len", ">i4"), ("interval", ">i4"),
+    ("kind_len", ">i4"), ("kind", ">i2"),
+    ("channel_len", ">i4"), ("channel", ">i2"),
+    ("group_len", ">i4"), ("group", ">i4"),
+])
+COPY_HEADER_SIZE = 19
+
+_cache: Dict[tuple, Tuple[float, asyncio.Task]] = {}
+
+
+def parse_copy(data: bytes) -> np.ndarray:
+    """Rows of a binary COPY of COLUMNS_SQL as a structured array"""
+    if not data:
+        return np.empty(0, dtype=ROW_DTYPE)
+    extension = int.from_bytes(data[COPY_HEADER_SIZE - 4:COPY_HEADER_SIZE], "big")
+    # Drop the header and the -1 trailer
+    return np.frombuffer(data, dtype=ROW_DTYPE, offset=COPY_HEADER_SIZE + extension,
+                         count=(len(data) - COPY_HEADER_SIZE - extension - 2) // ROW_DTYPE.itemsize)
+
+
+async def load_columns(end: datetime) -> Tuple[np.ndarray, List[str], List[str]]:
+    """(rows, channels, calendar groups) of active reminders due before `end`"""
+    conn = read_db()
+    _, groups = await conn.execute_query(GROUPS_SQL, [end])
+    channels = sorted({row["channel"] for row in groups})
+    calendar = sorted({
+        f"{row['schedule_type']}|{row['schedule_expression'] or ''}|{row['timezone'] or ''}"
+        for row in groups if row["schedule_type"] in ("cron", "business_hours")
+    })
+
+    chunks = []
+
+    async def collect(chunk: bytes):
+        chunks.append(chunk)
+
+    async with conn.acquire_connection() as raw:
+        await raw.copy_from_query(COLUMNS_SQL, end, channels, calendar, DEFAULT_ANCHOR,
+                                  output=collect, format="binary")
+    return parse_copy(b"".join(chunks)), channels, calendar
+
+
+def _strided_cumsum(starts: np.ndarray, period: int) -> np.ndarray:
+    """sends[m] = starts[m] + sends[m - period]: every start repeating each `period` minutes"""
+    minutes = len(starts)
+    padded = np.zeros(-(-minutes // period) * period, dtype=np.int64)
+    padded[:minutes] = starts
+    return padded.reshape(-1, period).cumsum(axis=0).ravel()[:minutes]
+
+
+def _open_minutes(group: str, start: datetime, minutes: int) -> np.ndarray:
+    """Mask of the horizon's minutes inside a business-hours group's windows"""
+    schedule_type, expression, tz_name = group.split("|")
+    hours = compile_schedule(schedule_type, expression or None, tz_name or None)
+    mask = np.zeros(minutes, dtype=bool)
+    for opens, closes in hours.windows(start, start + timedelta(minutes=minutes)):
+        first = max(0, int((opens - start).total_seconds() // 60))
+        last = min(minutes, int(-(-(closes - start).total_seconds() // 60)))
+        mask[first:last] = True
+    return mask
+
+
+def _stretches(open_mask: np.ndarray) -> List[Tuple[int, int]]:
+    """[a, b) runs of equal values in the mask, in order"""
+    edges = np.concatenate(([0], np.flatnonzero(np.diff(open_mask.astype(np.int8))) + 1, [len(open_mask)]))
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+def _restart_at_openings(starts: np.ndarray, period: int, open_mask: np.ndarray) -> np.ndarray:
+    """
+    Business hours rescheduled from the send: runs falling outside business hours
+    become one send per reminder at the next opening, and each stride restarts there.
+    """
+    sends = np.zeros(len(starts), dtype=np.int64)
+    # Reminders running through the current stretch, by minute % period
+    phase = np.zeros(period, dtype=np.int64)
+    carried = 0
+    for a, b in _stretches(open_mask):
+        residues = np.arange(a, b) % period
+        if open_mask[a]:
+            phase[a % period] += carried
+            carried = 0
+            sends[a:b] = np.resize(np.roll(phase, -(a % period)), b - a) + _strided_cumsum(starts[a:b], period)
+            np.add.at(phase, residues, starts[a:b])
+        else:
+            # Every reminder with a run in [a, b) waits for the opening
+            landing = slice(None) if b - a >= period else residues
+            carried += int(starts[a:b].sum()) + int(phase[landing].sum())
+            phase[landing] = 0
+    return sends
+
+
+def _collapse_closed(sends: np.ndarray, period: int, open_mask: np.ndarray) -> np.ndarray:
+    """Move runs falling outside business hours to the next opening, one per reminder"""
+    result = np.where(open_mask, sends, 0)
+    for a, b in _stretches(open_mask):
+        if not open_mask[a] and b < len(sends):
+            # A reminder's last run before b is within one period of it; those on
+            # b's own grid minute (b - period) already send at the opening
+            result[b] += int(sends[max(a, b - period + 1):b].sum())
+    return result
+
+
+def _cron_sends(group: str, starts: np.ndarray, start: datetime) -> np.ndarray:
+    """Each reminder at next_run_at, plus every later fire time of the group's expression"""
+    minutes = len(starts)
+    schedule_type, expression, tz_name = group.split("|")
+    cron = compile_schedule(schedule_type, expression or None, tz_name or None)
+    fire = np.fromiter(
+        (int((when - start).total_seconds() // 60)
+         for when in cron.occurrences(start, start + timedelta(minutes=minutes))),
+        dtype=np.int64,
+    )
+    sends = starts.astype(np.int64)
+    if len(fire):
+        # Reminders already started before each fire minute (excludes those due in it)
+        started_before = np.concatenate(([0], starts.cumsum()))[fire]
+        np.add.at(sends, fire, started_before)
+    return sends
+
+
+def project(rows: np.ndarray, channels: List[str], calendar: List[str],
+            start: datetime, minutes: int) -> np.ndarray:
+    """Sends per channel per minute, shape (len(channels), minutes)"""
+    result = np.zeros((len(channels), minutes), dtype=np.int64)
+    # Rows of channels seen after GROUPS_SQL ran are left out (code 0)
+    minute = np.clip((rows["run_at"] - start.timestamp()) // 60, 0, None).astype(np.int64)
+    keep = (rows["channel"] > 0) & (minute < minutes)
+    rows, minute = rows[keep], minute[keep]
+    if not len(rows):
+        return result
+
+    kind = rows["kind"].astype(np.int64)
+    channel = rows["channel"].astype(np.int64) - 1
+    business_hours = (kind == BUSINESS_HOURS) | (kind == BUSINESS_HOURS_GRID)
+    period = np.where((kind == RECURRING) | business_hours, rows["interval"], 0).astype(np.int64)
+    group = np.where(business_hours | (kind == CRON), rows["group"], 0).astype(np.int64)
+
+    # One segment per (channel, kind, group, period); each is projected with array operations
+    order = np.lexsort((period, group, kind, channel))
+    keys = np.stack((channel, kind, group, period))[:, order]
+    minute = minute[order]
+    boundaries = np.flatnonzero(np.any(np.diff(keys, axis=1) != 0, axis=0)) + 1
+    open_masks: Dict[int, np.ndarray] = {}
+
+    for first, last in zip(np.concatenate(([0], boundaries)), np.concatenate((boundaries, [len(minute)]))):
+        seg_channel, seg_kind, seg_group, seg_period = (int(v) for v in keys[:, first])
+        starts = np.bincount(minute[first:last], minlength=minutes)
+        try:
+            if seg_kind == RECURRING:
+                sends = _strided_cumsum(starts, seg_period)
+            elif seg_kind in (BUSINESS_HOURS, BUSINESS_HOURS_GRID) and seg_group > 0:
+                if seg_group not in open_masks:
+                    open_masks[seg_group] = _open_minutes(calendar[seg_group - 1], start, minutes)
+                if seg_kind == BUSINESS_HOURS:
+                    sends = _restart_at_openings(starts, seg_period, open_masks[seg_group])
+                else:
+                    sends = _collapse_closed(_strided_cumsum(starts, seg_period), seg_period,
+                                             open_masks[seg_group])
+            elif seg_kind == CRON and seg_group > 0:
+                sends = _cron_sends(calendar[seg_group - 1], starts, start)
+            else:
+                sends = starts
+        except ValueError as e:
+            # Invalid expression or timezone: the worker cannot run these either
+            logger.warning("Forecast skipped a schedule", extra={"error": str(e)})
+            continue
+        result[seg_channel] += sends
+    return result
+
+
+async def _compute(horizon_hours: int, bucket_minutes: int) -> dict:
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    start = now.replace(second=0, microsecond=0)
+    minutes = -(-horizon_hours * 60 // bucket_minutes) * bucket_minutes
+    end = start + timedelta(minutes=minutes)
+
+    rows, channels, calendar = await load_columns(end)
+    per_minute = project(rows, channels, calendar, start, minutes)
+    buckets = per_minute.reshape(len(channels), minutes // bucket_minutes, bucket_minutes).sum(axis=2)
+
+    forecast = {}
+    for index, channel in enumerate(channels):
+        sends = buckets[index]
+        peak = int(sends.argmax())
+        forecast[channel] = {
+            "total": int(sends.sum()),
+            "peak": int(sends[peak]),
+            "peak_at": start + timedelta(minutes=peak * bucket_minutes),
+            "sends": sends.tolist(),
+        }
+
+    logger.info("Send forecast computed", extra={
+        "reminders": len(rows),
+        "horizon_hours": horizon_hours,
+        "bucket_minutes": bucket_minutes,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+    return {
+        "generated_at": now,
+        "start": start,
+        "horizon_hours": horizon_hours,
+        "bucket_minutes": bucket_minutes,
+        "reminders": len(rows),
+        "channels": forecast,
+    }
+
+
+async def send_forecast(horizon_hours: int = 24, bucket_minutes: int = 1) -> dict:
+    """
+    Forecast for the next `horizon_hours`, cached for FORECAST_CACHE_SECONDS.
+
+    Concurrent callers share one computation per (horizon_hours, bucket_minutes).
+    """
+    key = (horizon_hours, bucket_minutes)
+    cached = _cache.get(key)
+    if cached is None or cached[0] < time.monotonic() or _failed(cached[1]):
+        task = asyncio.ensure_future(_compute(horizon_hours, bucket_minutes))
+        cached = _cache[key] = (time.monotonic() + FORECAST_CACHE_SECONDS, task)
+    # A disconnecting client must not cancel the computation other callers wait on
+    return await asyncio.shield(cached[1])
+
+
+def _failed(task: asyncio.Task) -> bool:
+    return task.done() and (task.cancelled() or task.exception() is not None)
@@ -0,0 +1,217 @@
+"""
+Worker registry, heartbeats and failover.
+
+Every scheduler worker has a row in scheduler_workers and refreshes its
+heartbeat_at every WORKER_HEARTBEAT_SECONDS (database clock, so host clock skew
+does not matter). Each beat also looks for peers silent for longer than
+WORKER_HEARTBEAT_TIMEOUT_SECONDS: they are marked DEAD, their reminder and retry
+leases are released and the workers are woken, so a standby takes over within
+seconds instead of waiting for SCHEDULER_LEASE_SECONDS to run out.
+
+A worker that cannot write its own heartbeat, or finds it was marked DEAD, is
+fenced: it stops dispatching batches it claimed earlier, because a peer may
+already have taken them over.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+from tortoise import Tortoise
+
+from app import metrics
+from app.models import SchedulerWorker, WorkerStatus
+from app.scheduler.lease import WORKER_ID
+from app.scheduler.wakeup import notify_wakeup
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = float(os.getenv("WORKER_HEARTBEAT_SECONDS", "5"))
+HEARTBEAT_TIMEOUT_SECONDS = float(os.getenv("WORKER_HEARTBEAT_TIMEOUT_SECONDS", "15"))
+# STOPPED and DEAD registrations are deleted after this long
+REGISTRY_RETENTION_HOURS = float(os.getenv("WORKER_REGISTRY_RETENTION_HOURS", "24"))
+
+if HEARTBEAT_TIMEOUT_SECONDS < 2 * HEARTBEAT_SECONDS:
+    raise ValueError("WORKER_HEARTBEAT_TIMEOUT_SECONDS must be at least twice WORKER_HEARTBEAT_SECONDS")
+
+REGISTER_SQL = """
+INSERT INTO scheduler_workers (worker_id, hostname, pid, status, started_at, heartbeat_at)
+VALUES ($1, $2, $3, 'RUNNING', now(), now())
+ON CONFLICT (worker_id) DO UPDATE
+SET hostname = EXCLUDED.hostname,
+    pid = EXCLUDED.pid,
+    status = 'RUNNING',
+    started_at = EXCLUDED.started_at,
+    heartbeat_at = EXCLUDED.heartbeat_at,
+    stopped_at = NULL
+"""
+
+# Returns nothing once a peer has marked this worker DEAD
+HEARTBEAT_SQL = """
+WITH beat AS (
+    UPDATE scheduler_workers
+    SET heartbeat_at = now()
+    WHERE worker_id = $1 AND status IN ('RUNNING', 'DRAINING')
+    RETURNING worker_id
+)
+SELECT count(*) AS alive FROM beat
+"""
+
+# SKIP LOCKED: when several workers notice the same silent peer, one reaps it
+REAP_SQL = """
+WITH dead AS (
+    SELECT worker_id FROM scheduler_workers
+    WHERE status IN ('RUNNING', 'DRAINING')
+      AND heartbeat_at < now() - make_interval(secs => $1)
+    FOR UPDATE SKIP LOCKED
+),
+marked AS (
+    UPDATE scheduler_workers w
+    SET status = 'DEAD', stopped_at = now()
+    FROM dead
+    WHERE w.worker_id = dead.worker_id
+    RETURNING w.worker_id
+),
+reminders AS (
+    UPDATE reminder_jobs
+    SET lease_owner = NULL, lease_expires_at = NULL
+    WHERE lease_owner IN (SELECT worker_id FROM marked)
+    RETURNING 1
+),
+retries AS (
+    UPDATE delivery_retries
+    SET lease_owner = NULL, lease_expires_at = NULL
+    WHERE lease_owner IN (SELECT worker_id FROM marked)
+    RETURNING 1
+)
+SELECT array(SELECT worker_id FROM marked) AS workers,
+       (SELECT count(*) FROM reminders) AS reminders,
+       (SELECT count(*) FROM retries) AS retries
+"""
+
+ALIVE_SQL = "SELECT count(*) AS alive FROM scheduler_workers WHERE status IN ('RUNNING', 'DRAINING')"
+
+PRUNE_SQL = """
+DELETE FROM scheduler_workers
+WHERE status IN ('STOPPED', 'DEAD') AND heartbeat_at < now() - make_interval(hours => $1)
+"""
+
+# Leases still held by this worker, made claimable now: all reminder and retry
+# leases, or only the reminders in $2. Reminders in $3 keep their lease (their
+# sends may have gone out), and retry leases are kept unless $4.
+RELEASE_OWNED_SQL = """
+WITH released AS (
+    UPDATE reminder_jobs
+    SET lease_owner = NULL, lease_expires_at = NULL
+    WHERE lease_owner = $1 AND ($2::int[] IS NULL OR id = ANY($2::int[]))
+      AND NOT (id = ANY($3::int[]))
+    RETURNING 1
+),
+retries AS (
+    UPDATE delivery_retries
+    SET lease_owner = NULL, lease_expires_at = NULL
+    WHERE lease_owner = $1 AND $2::int[] IS NULL AND $4
+    RETURNING 1
+)
+SELECT (SELECT count(*) FROM released) AS released, (SELECT count(*) FROM retries) AS retries
+"""
+
+
+class WorkerHeartbeat:
+    """This worker's registration, heartbeat loop and fencing state"""
+
+    def __init__(self, worker_id: str = WORKER_ID):
+        self.worker_id = worker_id
+        # Bumped whenever this worker learns it was reaped: leases claimed under
+        # an older generation may belong to another worker now
+        self.generation = 0
+        self._last_beat: Optional[float] = None
+
+    async def register(self):
+        conn = Tortoise.get_connection("default")
+        await conn.execute_query(REGISTER_SQL, [self.worker_id, socket.gethostname(), os.getpid()])
+        self._last_beat = time.monotonic()
+        logger.info("Worker registered", extra={"worker_id": self.worker_id})
+
+    async def beat(self):
+        """Refresh the heartbeat, then reap silent peers"""
+        conn = Tortoise.get_connection("default")
+        _, rows = await conn.execute_query(HEARTBEAT_SQL, [self.worker_id])
+        if not rows[0]["alive"]:
+            self.generation += 1
+            logger.warning("Worker was marked dead by a peer, re-registering", extra={
+                "worker_id": self.worker_id,
+            })
+            await self.register()
+        else:
+            self._last_beat = time.monotonic()
+
+        _, rows = await conn.execute_query(REAP_SQL, [HEARTBEAT_TIMEOUT_SECONDS])
+        reaped = rows[0]
+        if reaped["workers"]:
+            logger.warning("Reaped dead workers", extra={
+                "workers": list(reaped["workers"]),
+                "released_reminders": reaped["reminders"],
+                "released_retries": reaped["retries"],
+            })
+            if reaped["reminders"]:
+                await notify_wakeup(datetime.now(timezone.utc))
+        _, rows = await conn.execute_query(ALIVE_SQL)
+        metrics.WORKERS_ALIVE.set(rows[0]["alive"])
+        await conn.execute_query(PRUNE_SQL, [REGISTRY_RETENTION_HOURS])
+
+    def fenced(self, generation: int) -> bool:
+        """
+        True when batches claimed under `generation` must not be dispatched: this
+        worker was reaped since, or its heartbeat is about to be considered missed.
+        """
+        if generation != self.generation:
+            return True
+        if self._last_beat is None:
+            # Not registered (e.g. benchmarks drive ticks directly)
+            return False
+        return time.monotonic() - self._last_beat > HEARTBEAT_TIMEOUT_SECONDS - HEARTBEAT_SECONDS
+
+    async def run(self):
+        """Beat every HEARTBEAT_SECONDS until cancelled"""
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            try:
+                await self.beat()
+            except Exception:
+                logger.exception("Heartbeat failed", extra={"worker_id": self.worker_id})
+
+    async def set_status(self, status: WorkerStatus):
+        """Record DRAINING on shutdown, then STOPPED once leases are handed back"""
+        await SchedulerWorker.filter(worker_id=self.worker_id).update(
+            status=status,
+            stopped_at=datetime.now(timezone.utc) if status == WorkerStatus.STOPPED else None,
+        )
+
+
+async def release_owned_leases(
+    worker_id: str = WORKER_ID,
+    ids: Optional[List[int]] = None,
+    keep: Iterable[int] = (),
+    retries: bool = True,
+) -> int:
+    """
+    Release leases this worker still holds (all of them, or only the reminders in `ids`).
+
+    Args:
+        keep: Reminders whose outcome is unknown (a cancelled dispatch): their
+            leases are left to expire instead of being handed to a peer
+        retries: Also release retry leases (only when no retry batch was cut short)
+    """
+    conn = Tortoise.get_connection("default")
+    _, rows = await conn.execute_query(RELEASE_OWNED_SQL, [worker_id, ids, list(keep), retries])
+    released = rows[0]["released"]
+    if released:
+        await notify_wakeup(datetime.now(timezone.utc))
+    return released
+
+
+heartbeat = WorkerHeartbeat()
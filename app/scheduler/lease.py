@@ -0,0 +1,63 @@
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from tortoise import Tortoise
+
+from app.models import LIVE_PREDICATE, ReminderJob
+
+LEASE_SECONDS = int(os.getenv("SCHEDULER_LEASE_SECONDS", "300"))
+CLAIM_BATCH_SIZE = int(os.getenv("SCHEDULER_CLAIM_BATCH_SIZE", "1000"))
+
+# Unique per worker process
+WORKER_ID = os.getenv("SCHEDULER_WORKER_ID", f"{socket.gethostname()}:{os.getpid()}")
+
+# Lease a bounded batch of due rows. SKIP LOCKED lets concurrent workers pick
+# disjoint batches, and rows whose lease expired (crashed worker) are eligible again.
+# The live-row predicate is inlined so the planner can match the partial index.
+# $1 is the tick time (due cutoff and lease check, see RELEASE_SQL); the new expiry
+# ($4) runs from the claim itself, so batches claimed late in a long tick are not
+# leased with an expiry that has already passed.
+CLAIM_SQL = f"""
+WITH due AS (
+    SELECT id FROM reminder_jobs
+    WHERE {LIVE_PREDICATE}
+      AND next_run_at <= $1
+      AND (lease_expires_at IS NULL OR lease_expires_at < $1)
+    ORDER BY next_run_at
+    LIMIT $2
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE reminder_jobs r
+SET lease_owner = $3, lease_expires_at = $4
+FROM due
+WHERE r.id = due.id
+RETURNING r.id
+"""
+
+
+async def claim_due_reminders(
+    now: datetime,
+    limit: int = CLAIM_BATCH_SIZE,
+    worker_id: str = WORKER_ID,
+) -> List[ReminderJob]:
+    """
+    Atomically lease up to `limit` reminders due at `now` for this worker.
+
+    The lease runs LEASE_SECONDS from the moment of the claim, not from `now`.
+
+    Returns:
+        list: Leased reminders, most overdue first
+    """
+    conn = Tortoise.get_connection("default")
+    lease_expires_at = datetime.now(timezone.utc) + timedelta(seconds=LEASE_SECONDS)
+    _, rows = await conn.execute_query(
+        CLAIM_SQL,
+        [now, limit, worker_id, lease_expires_at],
+    )
+    if not rows:
+        return []
+
+    ids = [row["id"] for row in rows]
+    return await ReminderJob.filter(id__in=ids).order_by("next_run_at")
@@ -1,10 +1,24 @@
-import smtplib
+import asyncio
+import functools
+import html
+import logging
 import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, NamedTuple, Optional
+from email.message import Message
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
+from app import metrics
+from app.notifications import templates
+from app.notifications.templates import Rendered
+from app.scheduler.smtp_pool import SMTPConnectionPool
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
 # SMTP Configuration - Replace with your actual credentials
 SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
@@ -14,6 +28,48 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "your-app-password")
 SMTP_FROM_EMAIL = os.getenv("SMTP_FROM_EMAIL", "noreply@yourcompany.com")
 SMTP_FROM_NAME = os.getenv("SMTP_FROM_NAME", "Reminder System")
 
+# Set SMTP_ENABLED=true to actually send emails (otherwise demo mode prints them)
+SMTP_ENABLED = os.getenv("SMTP_ENABLED", "false").lower() == "true"
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", os.getenv("EMAIL_CONCURRENCY", "10")))
+# How long a send waits for a free pooled connection before failing
+SMTP_POOL_WAIT_SECONDS = float(os.getenv("SMTP_POOL_WAIT_SECONDS", "30"))
+
+# Set NOTIFICATION_DIGEST=true to merge a batch's notifications for the same
+# recipient and channel into one message
+DIGEST_ENABLED = os.getenv("NOTIFICATION_DIGEST", "false").lower() == "true"
+# Recipient rate-limit buckets kept in memory before idle (full) ones are dropped
+MAX_RECIPIENT_BUCKETS = int(os.getenv("NOTIFIER_MAX_RECIPIENT_BUCKETS", "100000"))
+
+_smtp_pool = None
+_smtp_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Shared SMTP connection pool, created on first use"""
+    global _smtp_pool
+    with _smtp_pool_lock:
+        if _smtp_pool is None:
+            _smtp_pool = SMTPConnectionPool(
+                SMTP_HOST,
+                SMTP_PORT,
+                username=SMTP_USERNAME,
+                password=SMTP_PASSWORD,
+                use_tls=SMTP_USE_TLS,
+                max_size=SMTP_POOL_SIZE,
+                acquire_timeout=SMTP_POOL_WAIT_SECONDS,
+            )
+        return _smtp_pool
+
+
+def close_smtp_pool():
+    """Close pooled SMTP connections (call on worker shutdown)"""
+    global _smtp_pool
+    with _smtp_pool_lock:
+        if _smtp_pool is not None:
+            _smtp_pool.close()
+            _smtp_pool = None
+
 
 def send_reminder_notification(reminder_data: dict) -> bool:
     """
@@ -26,82 +82,97 @@ def send_reminder_notification(reminder_data: dict) -> bool:
             - event_type: Type of event (e.g., 'feedback_form')
             - channel: Notification channel (should be 'email')
             - recipient_email: Email address to send to
+            - items: (digest only) the notification dicts merged into this email
     
     Returns:
         bool: True if email sent successfully, False otherwise
     """
     
-    # For demo purposes, just log the action
-    # In production, replace this with actual SMTP sending
-    
     try:
         recipient = reminder_data.get('recipient_email', 'recipient@example.com')
-        entity_type = reminder_data.get('entity_type', 'Unknown')
-        entity_id = reminder_data.get('entity_id', 'Unknown')
-        event_type = reminder_data.get('event_type', 'Unknown')
+        rendered = render_notification(reminder_data)
+        message = build_email(recipient, rendered)
         
-        # Create email message
-        message = MIMEMultipart('alternative')
-        message['Subject'] = f"Reminder: {event_type.replace('_', ' ').title()}"
-        message['From'] = f"{SMTP_FROM_NAME} <{SMTP_FROM_EMAIL}>"
-        message['To'] = recipient
+        if SMTP_ENABLED:
+            get_smtp_pool().send_message(message)
+            logger.debug("Email sent", extra={"recipient": recipient})
+        else:
+            # For demo/testing: Just log the email
+            logger.debug("[DEMO MODE] Email notification", extra={
+                "recipient": recipient,
+                "subject": rendered.subject,
+                "body_preview": rendered.text[:100],
+            })
         
-        # Email body
-        text_body = f"""
-Hello,
+        return True
+        
+    except Exception:
+        logger.exception("Failed to send email notification")
+        return False
 
-This is a reminder regarding: {event_type.replace('_', ' ').title()}
 
-Entity Type: {entity_type}
-Entity ID: {entity_id}
+def render_notification(reminder_data: dict) -> Rendered:
+    """Render a notification (or digest) with its event_type/channel template"""
+    channel = reminder_data.get('channel', 'email')
+    fields = {
+        'entity_type': reminder_data.get('entity_type', 'Unknown'),
+        'entity_id': reminder_data.get('entity_id', 'Unknown'),
+        'recipient': recipient_of(reminder_data),
+    }
+    if 'items' not in reminder_data:
+        return templates.render(reminder_data.get('event_type', 'Unknown'), channel, fields)
+    
+    items = reminder_data['items']
+    lines = [
+        (item.get('event_type', 'Unknown').replace('_', ' ').title(),
+         item.get('entity_type', 'Unknown'), item.get('entity_id', 'Unknown'))
+        for item in items
+    ]
+    fields['count'] = len(items)
+    fields['items_text'] = "\n".join(f"- {event} ({entity_type} {entity_id})" for event, entity_type, entity_id in lines)
+    fields['items_html'] = "\n".join(
+        f"      <li><strong>{html.escape(event)}</strong> ({html.escape(str(entity_type))} {html.escape(str(entity_id))})</li>"
+        for event, entity_type, entity_id in lines
+    )
+    return templates.render(templates.DIGEST, channel, fields)
 
-Please take the necessary action.
 
-Best regards,
-Reminder System
-"""
-        
-        html_body = f"""
-<html>
-  <body>
-    <p>Hello,</p>
-    <p>This is a reminder regarding: <strong>{event_type.replace('_', ' ').title()}</strong></p>
-    <ul>
-      <li><strong>Entity Type:</strong> {entity_type}</li>
-      <li><strong>Entity ID:</strong> {entity_id}</li>
-    </ul>
-    <p>Please take the necessary action.</p>
-    <p>Best regards,<br>Reminder System</p>
-  </body>
-</html>
-"""
-        
-        # Attach both plain text and HTML versions
-        part1 = MIMEText(text_body, 'plain')
-        part2 = MIMEText(html_body, 'html')
-        message.attach(part1)
-        message.attach(part2)
-        
-        # For demo/testing: Just print the email
-        print(f"📧 [DEMO MODE] Email notification:")
-        print(f"   To: {recipient}")
-        print(f"   Subject: {message['Subject']}")
-        print(f"   Body: {text_body[:100]}...")
-        
-        # Uncomment below to actually send emails
-        # Make sure to set proper SMTP credentials in .env file
-        
-        # with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-        #     server.starttls()
-        #     server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        #     server.send_message(message)
-        #     print(f"✅ Email sent successfully to {recipient}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Failed to send email notification: {e}")
-        return False
+# Headers shared by every message; set verbatim instead of being parsed per message
+FROM_HEADER = f"{SMTP_FROM_NAME} <{SMTP_FROM_EMAIL}>"
+_MULTIPART_HEADERS = (("Content-Type", "multipart/alternative"), ("MIME-Version", "1.0"))
+_PART_HEADERS = {
+    subtype: (
+        ("Content-Type", f'text/{subtype}; charset="us-ascii"'),
+        ("MIME-Version", "1.0"),
+        ("Content-Transfer-Encoding", "7bit"),
+    )
+    for subtype in ("plain", "html")
+}
+
+
+def _text_part(body: str, subtype: str) -> Message:
+    """text/<subtype> part; same output as MIMEText, without the charset machinery for ASCII"""
+    if not body.isascii():
+        return MIMEText(body, subtype, 'utf-8')
+    part = Message()
+    for name, value in _PART_HEADERS[subtype]:
+        part.set_raw(name, value)
+    part.set_payload(body)
+    return part
+
+
+def build_email(recipient: str, rendered: Rendered) -> Message:
+    """multipart/alternative email (plain text, plus HTML when the template has one)"""
+    message = Message()
+    for name, value in _MULTIPART_HEADERS:
+        message.set_raw(name, value)
+    message['Subject'] = rendered.subject
+    message.set_raw('From', FROM_HEADER)
+    message['To'] = recipient
+    message.attach(_text_part(rendered.text, 'plain'))
+    if rendered.html is not None:
+        message.attach(_text_part(rendered.html, 'html'))
+    return message
 
 
 def send_slack_notification(reminder_data: dict) -> bool:
@@ -109,7 +180,9 @@ def send_slack_notification(reminder_data: dict) -> bool:
     Placeholder for Slack notifications.
     Implement using slack_sdk or webhook URLs.
     """
-    print(f"📱 [DEMO MODE] Slack notification: {reminder_data}")
+    logger.debug("[DEMO MODE] Slack notification", extra={
+        "notification": reminder_data, "text": render_notification(reminder_data).text,
+    })
     return True
 
 
@@ -118,10 +191,112 @@ def send_sms_notification(reminder_data: dict) -> bool:
     Placeholder for SMS notifications.
     Implement using Twilio or similar service.
     """
-    print(f"📲 [DEMO MODE] SMS notification: {reminder_data}")
+    logger.debug("[DEMO MODE] SMS notification", extra={
+        "notification": reminder_data, "text": render_notification(reminder_data).text,
+    })
     return True
 
 
+CHANNEL_SENDERS = {
+    'email': send_reminder_notification,
+    'slack': send_slack_notification,
+    'sms': send_sms_notification,
+}
+
+
+def _channel_limits(channel: str) -> dict:
+    """
+    Concurrency cap, timeout and rate limits for a channel, e.g. EMAIL_CONCURRENCY,
+    EMAIL_TIMEOUT_SECONDS, EMAIL_RATE_PER_SECOND, EMAIL_RECIPIENT_RATE_PER_HOUR
+    (rates of 0 mean unlimited)
+    """
+    prefix = channel.upper()
+    rate = float(os.getenv(f"{prefix}_RATE_PER_SECOND", "0"))
+    recipient_rate = float(os.getenv(f"{prefix}_RECIPIENT_RATE_PER_HOUR", "0"))
+    return {
+        'concurrency': int(os.getenv(f"{prefix}_CONCURRENCY", "10")),
+        'timeout': float(os.getenv(f"{prefix}_TIMEOUT_SECONDS", "30")),
+        'rate': rate,
+        'burst': float(os.getenv(f"{prefix}_RATE_BURST", str(max(rate, 1)))),
+        'recipient_rate': recipient_rate / 3600,
+        'recipient_burst': float(os.getenv(f"{prefix}_RECIPIENT_RATE_BURST", str(max(recipient_rate, 1)))),
+    }
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens/second up to `capacity`"""
+    
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    def wait_time(self, needed: float = 1) -> float:
+        """Seconds until `needed` tokens are available (0 = available now)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return max(0.0, (needed - self.tokens) / self.rate)
+    
+    def consume(self, amount: float = 1):
+        self.tokens -= amount
+    
+    @property
+    def idle(self) -> bool:
+        """Refilled to capacity (holds no state worth keeping)"""
+        return self.wait_time(self.capacity) == 0
+
+
+CHANNEL_LIMITS = {channel: _channel_limits(channel) for channel in CHANNEL_SENDERS}
+
+# Blocking adapters run in their channel's own pool, sized to the channel's cap:
+# senders stuck on a slow channel can never take threads from the others
+_executors: Dict[str, ThreadPoolExecutor] = {
+    channel: ThreadPoolExecutor(max_workers=limits['concurrency'], thread_name_prefix=f"notifier-{channel}")
+    for channel, limits in CHANNEL_LIMITS.items()
+}
+_channel_semaphores: Dict[str, asyncio.Semaphore] = {}
+_channel_buckets: Dict[str, TokenBucket] = {
+    channel: TokenBucket(limits['rate'], limits['burst'])
+    for channel, limits in CHANNEL_LIMITS.items() if limits['rate'] > 0
+}
+_recipient_buckets: Dict[tuple, TokenBucket] = {}
+
+
+class DeliveryResult(NamedTuple):
+    success: bool
+    error: Optional[str] = None
+    # Set when a rate limit deferred the send: try again at this time
+    retry_at: Optional[datetime] = None
+    # Set when the send timed out but its thread is still running (it may still
+    # deliver): resolves to the sender's real outcome
+    pending: Optional[asyncio.Future] = None
+
+
+def recipient_of(reminder_data: dict) -> str:
+    """Who receives a notification (rate limits and digests are per recipient)"""
+    return reminder_data.get('recipient_email') or (
+        f"{reminder_data.get('entity_type')}:{reminder_data.get('entity_id')}"
+    )
+
+
+def _recipient_bucket(channel: str, recipient: str) -> Optional[TokenBucket]:
+    limits = CHANNEL_LIMITS[channel]
+    if limits['recipient_rate'] <= 0:
+        return None
+    key = (channel, recipient)
+    bucket = _recipient_buckets.get(key)
+    if bucket is None:
+        if len(_recipient_buckets) >= MAX_RECIPIENT_BUCKETS:
+            for stale in [k for k, b in _recipient_buckets.items() if b.idle]:
+                del _recipient_buckets[stale]
+        bucket = _recipient_buckets[key] = TokenBucket(limits['recipient_rate'], limits['recipient_burst'])
+    return bucket
+
+
 def trigger_notification(reminder_data: dict) -> bool:
     """
     Route notification to appropriate channel.
@@ -133,13 +308,148 @@ def trigger_notification(reminder_data: dict) -> bool:
         bool: Success status
     """
     channel = reminder_data.get('channel', 'email')
+    sender = CHANNEL_SENDERS.get(channel)
+    
+    if sender is None:
+        logger.warning("Unknown notification channel", extra={"channel": channel})
+        return False
+    
+    return sender(reminder_data)
+
+
+def _release_permit(semaphore: asyncio.Semaphore, send: asyncio.Future):
+    """Done-callback of a send: free its channel slot once the thread has really finished"""
+    semaphore.release()
+    if not send.cancelled():
+        send.exception()  # Retrieved here so a late failure is not reported as unhandled
+
+
+async def _send_async(reminder_data: dict) -> DeliveryResult:
+    """Run one blocking send in its channel's thread pool under the channel's cap and timeout"""
+    channel = reminder_data.get('channel', 'email')
+    if channel not in CHANNEL_SENDERS:
+        logger.warning("Unknown notification channel", extra={"channel": channel})
+        return DeliveryResult(False, f"unknown channel {channel!r}")
+    
+    limits = CHANNEL_LIMITS[channel]
+    semaphore = _channel_semaphores.get(channel)
+    if semaphore is None:
+        semaphore = _channel_semaphores[channel] = asyncio.Semaphore(limits['concurrency'])
+    
+    started = time.perf_counter()
+    try:
+        # Every slot held by a stuck sender: fail (and retry later) rather than stall the batch
+        await asyncio.wait_for(semaphore.acquire(), timeout=limits['timeout'])
+    except asyncio.TimeoutError:
+        logger.warning("Notification channel saturated", extra={"channel": channel, "timeout_seconds": limits['timeout']})
+        metrics.NOTIFICATIONS_TOTAL.labels(channel, "failure").inc()
+        return DeliveryResult(False, f"no {channel} sender free after {limits['timeout']}s")
+    
+    try:
+        send = asyncio.wrap_future(_executors[channel].submit(trigger_notification, reminder_data))
+    except Exception:
+        semaphore.release()
+        raise
+    # The slot stays taken until the thread finishes, even past the timeout
+    send.add_done_callback(functools.partial(_release_permit, semaphore))
+    
+    error = pending = None
+    try:
+        # shield: a timeout must not detach us from a send that is still running
+        success = await asyncio.wait_for(asyncio.shield(send), timeout=limits['timeout'])
+        if not success:
+            error = "sender reported failure"
+    except asyncio.TimeoutError:
+        logger.warning("Notification timed out", extra={"channel": channel, "timeout_seconds": limits['timeout']})
+        success, error, pending = False, f"timed out after {limits['timeout']}s", send
+    except Exception as e:
+        logger.exception("Notification raised", extra={"channel": channel})
+        success, error = False, f"{type(e).__name__}: {e}"
+    
+    metrics.NOTIFICATION_SECONDS.labels(channel).observe(time.perf_counter() - started)
+    metrics.NOTIFICATIONS_TOTAL.labels(channel, "success" if success else "failure").inc()
+    return DeliveryResult(success, error, pending=pending)
+
+
+def _group_digests(notifications: dict) -> list:
+    """(ids, message) pairs: one per notification, or one per recipient and channel in digest mode"""
+    if not DIGEST_ENABLED:
+        return [([i], data) for i, data in notifications.items()]
+    
+    groups = defaultdict(list)
+    for i, data in notifications.items():
+        groups[(data.get('channel', 'email'), recipient_of(data))].append(i)
+    
+    messages = []
+    for ids in groups.values():
+        first = notifications[ids[0]]
+        if len(ids) == 1:
+            messages.append((ids, first))
+        else:
+            messages.append((ids, {**first, 'items': [notifications[i] for i in ids]}))
+    return messages
+
+
+def _rate_limit(messages: list) -> tuple:
+    """
+    Split messages into those allowed now and those deferred by a rate limit.
+    
+    Tokens are taken for allowed messages. Deferred messages get the time their
+    tokens should be available, counting the ones queued before them, so a
+    backlog is spread over the following windows instead of retried at once.
+    """
+    allowed, deferred = [], []
+    queued = defaultdict(int)
+    now = datetime.now(timezone.utc)
+    
+    for ids, data in messages:
+        channel = data.get('channel', 'email')
+        if channel not in CHANNEL_LIMITS:
+            allowed.append((ids, data))
+            continue
+        buckets = [
+            bucket for bucket in (
+                _channel_buckets.get(channel), _recipient_bucket(channel, recipient_of(data))
+            ) if bucket is not None
+        ]
+        waits = {id(bucket): bucket.wait_time(1 + queued[id(bucket)]) for bucket in buckets}
+        wait = max(waits.values(), default=0)
+        if wait == 0:
+            for bucket in buckets:
+                bucket.consume()
+            allowed.append((ids, data))
+            continue
+        for bucket in buckets:
+            if waits[id(bucket)] > 0:
+                queued[id(bucket)] += 1
+        metrics.NOTIFICATIONS_TOTAL.labels(channel, "rate_limited").inc()
+        deferred.append((ids, now + timedelta(seconds=wait)))
+    return allowed, deferred
+
+
+async def dispatch_notifications(notifications: dict) -> dict:
+    """
+    Send a batch of notifications concurrently.
+    
+    In digest mode, notifications for the same recipient and channel are merged
+    into one message. Sends over a channel or recipient rate limit are not
+    attempted; they come back with `retry_at` set.
+    
+    Args:
+        notifications: id -> notification data
+        
+    Returns:
+        dict: id -> DeliveryResult
+    """
+    allowed, deferred = _rate_limit(_group_digests(notifications))
+    
+    results = {}
+    for ids, retry_at in deferred:
+        for i in ids:
+            results[i] = DeliveryResult(False, "rate limited", retry_at)
     
-    if channel == 'email':
-        return send_reminder_notification(reminder_data)
-    elif channel == 'slack':
-        return send_slack_notification(reminder_data)
-    elif channel == 'sms':
-        return send_sms_notification(reminder_data)
-    else:
-        print(f"⚠️ Unknown notification channel: {channel}")
-        return False
\ No newline at end of file
+    sent = await asyncio.gather(*(_send_async(data) for _, data in allowed))
+    for (ids, _), result in zip(allowed, sent):
+        for i in ids:
+            results[i] = result
+    return results
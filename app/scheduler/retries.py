@@ -0,0 +1,358 @@
+"""
+Delivery log and retry queue.
+
+Every send attempt is recorded in delivery_attempts. A failed send is queued in
+delivery_retries with exponential backoff and retried by run_retry_loop(), a
+loop separate from the scheduler tick, so a failing channel never holds up
+due reminders. After DELIVERY_MAX_ATTEMPTS the delivery is abandoned: a
+one-time reminder becomes FAILED, a recurring one simply continues.
+"""
+import asyncio
+import logging
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
+from app import metrics
+from app.models import DeliveryAttempt, DeliveryRetry, ReminderJob, ReminderStatus
+from app.scheduler import schedule
+from app.scheduler.condition_checker import evaluate_stop_conditions
+from app.scheduler.lease import WORKER_ID
+from app.scheduler.notifier import DeliveryResult, dispatch_notifications
+from app.scheduler.transitions import TickOutcomes, apply_outcomes
+
+logger = logging.getLogger(__name__)
+
+# Total attempts per delivery, including the scheduled send (1 disables retries)
+MAX_ATTEMPTS = int(os.getenv("DELIVERY_MAX_ATTEMPTS", "5"))
+RETRY_BASE_SECONDS = float(os.getenv("DELIVERY_RETRY_BASE_SECONDS", "30"))
+RETRY_MAX_SECONDS = float(os.getenv("DELIVERY_RETRY_MAX_SECONDS", "3600"))
+RETRY_BATCH_SIZE = int(os.getenv("DELIVERY_RETRY_BATCH_SIZE", "500"))
+RETRY_POLL_SECONDS = float(os.getenv("DELIVERY_RETRY_POLL_SECONDS", "5"))
+RETRY_LEASE_SECONDS = int(os.getenv("DELIVERY_RETRY_LEASE_SECONDS", "300"))
+
+# Lease due retries; SKIP LOCKED keeps concurrent workers on disjoint rows
+CLAIM_RETRIES_SQL = """
+WITH due AS (
+    SELECT id FROM delivery_retries
+    WHERE next_attempt_at <= $1
+      AND (lease_expires_at IS NULL OR lease_expires_at < $1)
+    ORDER BY next_attempt_at
+    LIMIT $2
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE delivery_retries r
+SET lease_owner = $4, lease_expires_at = $3
+FROM due
+WHERE r.id = due.id
+RETURNING r.id
+"""
+
+# Failed again with attempts left (pushed back by the backoff), or rate limited
+# (pushed back without using up an attempt)
+BACKOFF_SQL = """
+UPDATE delivery_retries
+SET attempts = attempts + u.attempted,
+    next_attempt_at = u.next_attempt_at,
+    last_error = COALESCE(u.error, delivery_retries.last_error),
+    lease_owner = NULL,
+    lease_expires_at = NULL
+FROM unnest($1::int[], $2::timestamptz[], $3::text[], $4::int[]) AS u(id, next_attempt_at, error, attempted)
+WHERE delivery_retries.id = u.id
+"""
+
+# Settled (delivered, abandoned or no longer needed)
+DELETE_RETRIES_SQL = "DELETE FROM delivery_retries WHERE id = ANY($1::int[])"
+
+# A retry whose send timed out: the attempt counts, but the row stays leased under
+# the hold until the still-running send reports back (see settle_late_send)
+HOLD_RETRY_SQL = """
+UPDATE delivery_retries
+SET attempts = $2,
+    next_attempt_at = $3,
+    last_error = $4,
+    lease_owner = $5,
+    lease_expires_at = $6
+WHERE id = $1
+"""
+
+RELEASE_HELD_SQL = """
+UPDATE delivery_retries
+SET lease_owner = NULL, lease_expires_at = NULL
+WHERE id = ANY($1::int[])
+"""
+
+# Settlement tasks of timed-out sends (referenced so they are not garbage collected)
+_late_sends: set = set()
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """Delay before the next try after `attempts` failed attempts (exponential, 10% jitter)"""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.9, 1.1))
+
+
+def delivery_attempt(
+    reminder_id: int, channel: str, attempt: int, result: DeliveryResult, at: datetime
+) -> DeliveryAttempt:
+    """Unsaved delivery_attempts row"""
+    return DeliveryAttempt(
+        reminder_id=reminder_id,
+        channel=channel,
+        attempt=attempt,
+        success=result.success,
+        error=result.error,
+        attempted_at=at,
+    )
+
+
+def hold_token() -> str:
+    """Lease owner for retries held back behind a timed-out send"""
+    return f"{WORKER_ID}:late:{uuid.uuid4().hex[:12]}"
+
+
+def new_retry(
+    reminder_id: int, payload: dict, result: DeliveryResult, at: datetime, hold: Optional[str] = None
+) -> DeliveryRetry:
+    """
+    Unsaved delivery_retries row for a failed scheduled send.
+
+    With `hold` (the send timed out and may still deliver), the row is leased to
+    the hold until settle_late_send() learns the real outcome.
+    """
+    return DeliveryRetry(
+        reminder_id=reminder_id,
+        channel=payload.get("channel", "email"),
+        payload=payload,
+        attempts=1,
+        next_attempt_at=at + backoff_delay(1),
+        last_error=result.error,
+        lease_owner=hold,
+        lease_expires_at=at + timedelta(seconds=RETRY_LEASE_SECONDS) if hold else None,
+        created_at=at,
+    )
+
+
+async def write_delivery_log(
+    attempts: List[DeliveryAttempt], retries: List[DeliveryRetry], connection=None
+):
+    """Insert a batch's attempt rows and newly queued retries"""
+    if attempts:
+        await DeliveryAttempt.bulk_create(attempts, using_db=connection)
+    if retries:
+        await DeliveryRetry.bulk_create(retries, using_db=connection)
+
+
+async def claim_due_retries(
+    now: datetime, limit: int = RETRY_BATCH_SIZE, worker_id: str = WORKER_ID
+) -> List[DeliveryRetry]:
+    """Lease up to `limit` retries whose next attempt is due"""
+    conn = Tortoise.get_connection("default")
+    _, rows = await conn.execute_query(
+        CLAIM_RETRIES_SQL, [now, limit, now + timedelta(seconds=RETRY_LEASE_SECONDS), worker_id]
+    )
+    if not rows:
+        return []
+    return await DeliveryRetry.filter(id__in=[row["id"] for row in rows])
+
+
+async def process_due_retries(now: datetime) -> int:
+    """
+    Retry one batch of due deliveries and write the results back.
+
+    Returns:
+        int: Number of retries claimed
+    """
+    retries = await claim_due_retries(now)
+    if not retries:
+        return 0
+
+    reminders: Dict[int, ReminderJob] = {
+        r.id: r for r in await ReminderJob.filter(
+            id__in={retry.reminder_id for retry in retries},
+            status=ReminderStatus.ACTIVE,
+            deleted_at__isnull=True,
+        )
+    }
+    stop_verdicts = await evaluate_stop_conditions(list(reminders.values()))
+
+    outcomes = TickOutcomes()
+    settled: List[int] = []
+    to_send = {}
+    for retry in retries:
+        reminder = reminders.get(retry.reminder_id)
+        if reminder is None:
+            # Paused, deleted or completed meanwhile: nothing left to deliver
+            settled.append(retry.id)
+        elif stop_verdicts[reminder.id]:
+            settled.append(retry.id)
+            if not schedule.is_recurring(reminder):
+                outcomes.complete(reminder)
+        else:
+            to_send[retry.id] = retry.payload
+
+    results = await dispatch_notifications(to_send)
+    attempted_at = datetime.now(timezone.utc)
+
+    attempts = []
+    backoff_ids, backoff_at, backoff_errors, backoff_attempted = [], [], [], []
+    held, late_sends = [], []
+    for retry in retries:
+        result: Optional[DeliveryResult] = results.get(retry.id)
+        if result is None:
+            continue
+        if result.retry_at is not None:
+            backoff_ids.append(retry.id)
+            backoff_at.append(result.retry_at)
+            backoff_errors.append(None)
+            backoff_attempted.append(0)
+            continue
+        attempt = retry.attempts + 1
+        attempts.append(delivery_attempt(retry.reminder_id, retry.channel, attempt, result, attempted_at))
+        reminder = reminders[retry.reminder_id]
+        one_time = not schedule.is_recurring(reminder)
+
+        if result.pending is not None:
+            # Timed out but may still deliver: hold the row until the send returns
+            hold = hold_token()
+            held.append((
+                retry.id, attempt, attempted_at + backoff_delay(attempt), result.error,
+                hold, attempted_at + timedelta(seconds=RETRY_LEASE_SECONDS),
+            ))
+            late_sends.append((hold, result.pending))
+        elif result.success:
+            metrics.DELIVERY_RETRIES_TOTAL.labels(retry.channel, "success").inc()
+            settled.append(retry.id)
+            if one_time:
+                outcomes.complete(reminder, sent=True)
+        elif attempt >= MAX_ATTEMPTS:
+            metrics.DELIVERY_RETRIES_TOTAL.labels(retry.channel, "failure").inc()
+            metrics.DELIVERY_FINAL_FAILURES_TOTAL.labels(retry.channel).inc()
+            logger.warning("Delivery abandoned", extra={
+                "reminder_id": retry.reminder_id, "channel": retry.channel,
+                "attempts": attempt, "error": result.error,
+            })
+            settled.append(retry.id)
+            if one_time:
+                outcomes.fail(reminder)
+        else:
+            metrics.DELIVERY_RETRIES_TOTAL.labels(retry.channel, "failure").inc()
+            backoff_ids.append(retry.id)
+            backoff_at.append(attempted_at + backoff_delay(attempt))
+            backoff_errors.append(result.error)
+            backoff_attempted.append(1)
+
+    async with in_transaction() as conn:
+        await write_delivery_log(attempts, [], conn)
+        if settled:
+            await conn.execute_query(DELETE_RETRIES_SQL, [settled])
+        if backoff_ids:
+            await conn.execute_query(
+                BACKOFF_SQL, [backoff_ids, backoff_at, backoff_errors, backoff_attempted]
+            )
+        for params in held:
+            await conn.execute_query(HOLD_RETRY_SQL, list(params))
+        if outcomes:
+            await apply_outcomes(outcomes, attempted_at, conn)
+
+    for hold, pending in late_sends:
+        watch_late_send(hold, pending)
+    return len(retries)
+
+
+async def settle_late_send(hold: str, pending: asyncio.Future):
+    """
+    Resolve the retries held behind a timed-out send once that send returns.
+
+    Delivered after all: they are settled like a successful attempt. Failed:
+    the hold is dropped and each follows its backoff, or is abandoned when no
+    attempts are left. If the process dies first, the hold's lease expires.
+    """
+    try:
+        delivered = bool(await pending)
+    except Exception:
+        delivered = False
+    finished_at = datetime.now(timezone.utc)
+
+    retries = await DeliveryRetry.filter(lease_owner=hold)
+    if not retries:
+        return
+    reminders: Dict[int, ReminderJob] = {
+        r.id: r for r in await ReminderJob.filter(
+            id__in={retry.reminder_id for retry in retries},
+            status=ReminderStatus.ACTIVE,
+            deleted_at__isnull=True,
+        )
+    }
+
+    outcomes = TickOutcomes()
+    attempts, settled, released = [], [], []
+    for retry in retries:
+        reminder = reminders.get(retry.reminder_id)
+        one_time = reminder is not None and not schedule.is_recurring(reminder)
+        if delivered:
+            attempts.append(delivery_attempt(
+                retry.reminder_id, retry.channel, retry.attempts, DeliveryResult(True), finished_at
+            ))
+            settled.append(retry.id)
+            if one_time:
+                outcomes.complete(reminder, sent=True)
+        elif retry.attempts >= MAX_ATTEMPTS:
+            metrics.DELIVERY_FINAL_FAILURES_TOTAL.labels(retry.channel).inc()
+            settled.append(retry.id)
+            if one_time:
+                outcomes.fail(reminder)
+        else:
+            released.append(retry.id)
+
+    async with in_transaction() as conn:
+        await write_delivery_log(attempts, [], conn)
+        if settled:
+            await conn.execute_query(DELETE_RETRIES_SQL, [settled])
+        if released:
+            await conn.execute_query(RELEASE_HELD_SQL, [released])
+        if outcomes:
+            await apply_outcomes(outcomes, finished_at, conn)
+    logger.info("Timed-out send settled", extra={"delivered": delivered, "retries": len(retries)})
+
+
+def watch_late_send(hold: str, pending: asyncio.Future):
+    """Run settle_late_send() in the background"""
+    task = asyncio.ensure_future(settle_late_send(hold, pending))
+    _late_sends.add(task)
+    task.add_done_callback(_late_send_done)
+
+
+def _late_send_done(task: asyncio.Task):
+    _late_sends.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        # The held rows are retried once their lease expires
+        logger.error("Failed to settle timed-out send", exc_info=task.exception())
+
+
+async def run_retry_loop(stopping: Optional[asyncio.Event] = None):
+    """
+    Work through due retries, polling when the queue is idle.
+
+    Runs until cancelled or until `stopping` is set; a batch in progress is
+    finished first, so no retry is left leased.
+    """
+    stopping = stopping or asyncio.Event()
+    while not stopping.is_set():
+        try:
+            claimed = await process_due_retries(datetime.now(timezone.utc))
+            if claimed < RETRY_BATCH_SIZE:
+                metrics.RETRY_QUEUE_DEPTH.set(await DeliveryRetry.all().count())
+        except Exception:
+            logger.exception("Retry loop error")
+            claimed = 0
+        if claimed < RETRY_BATCH_SIZE:
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=RETRY_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
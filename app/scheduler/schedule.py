@@ -0,0 +1,101 @@
+"""
+When a reminder fires next, and what to do with reminders that are late.
+
+Catch-up policies (per reminder, or SCHEDULER_CATCH_UP_POLICY):
+    coalesce: fire once for all missed runs, then continue the schedule
+    skip:     recurring reminders drop the missed runs and wait for the next slot
+    spread:   late reminders are deferred to a random point within
+              SCHEDULER_CATCH_UP_WINDOW_SECONDS instead of firing in one burst
+
+Anchors (per reminder, or SCHEDULER_RESCHEDULE_ANCHOR):
+    now:  next run = tick time + interval (drifts by the processing delay)
+    grid: next run = next slot of start_time + k * interval (drift-free)
+
+Jitter (per reminder, or SCHEDULER_JITTER_SECONDS) adds a random 0..N second
+offset to every rescheduled run so reminders sharing a slot do not fire together.
+
+Schedule types: "recurring" (every interval_minutes), "business_hours" (every
+interval_minutes, moved into the reminder's opening hours), "cron" (its
+schedule_expression); anything else runs once. See app.scheduler.cron.
+"""
+import os
+import random
+from datetime import datetime, timedelta
+
+from app.models import ReminderJob
+from app.scheduler.cron import compile_schedule
+
+CATCH_UP_POLICIES = ("coalesce", "skip", "spread")
+ANCHORS = ("now", "grid")
+INTERVAL_SCHEDULE_TYPES = ("recurring", "business_hours")
+
+DEFAULT_CATCH_UP_POLICY = os.getenv("SCHEDULER_CATCH_UP_POLICY", "coalesce")
+DEFAULT_ANCHOR = os.getenv("SCHEDULER_RESCHEDULE_ANCHOR", "now")
+DEFAULT_JITTER_SECONDS = int(os.getenv("SCHEDULER_JITTER_SECONDS", "0"))
+# A reminder is late (and its catch-up policy applies) when overdue by more than this
+CATCH_UP_GRACE_SECONDS = float(os.getenv("SCHEDULER_CATCH_UP_GRACE_SECONDS", "60"))
+CATCH_UP_WINDOW_SECONDS = float(os.getenv("SCHEDULER_CATCH_UP_WINDOW_SECONDS", "900"))
+
+if DEFAULT_CATCH_UP_POLICY not in CATCH_UP_POLICIES:
+    raise ValueError(f"SCHEDULER_CATCH_UP_POLICY must be one of {CATCH_UP_POLICIES}")
+if DEFAULT_ANCHOR not in ANCHORS:
+    raise ValueError(f"SCHEDULER_RESCHEDULE_ANCHOR must be one of {ANCHORS}")
+
+# catch_up_action() results
+FIRE = "fire"
+SKIP = "skip"
+DEFER = "defer"
+
+
+def is_recurring(reminder: ReminderJob) -> bool:
+    if reminder.schedule_type == "cron":
+        return bool(reminder.schedule_expression)
+    return reminder.schedule_type in INTERVAL_SCHEDULE_TYPES and bool(reminder.interval_minutes)
+
+
+def _compiled(reminder: ReminderJob):
+    return compile_schedule(reminder.schedule_type, reminder.schedule_expression, reminder.timezone)
+
+
+def catch_up_action(reminder: ReminderJob, now: datetime) -> str:
+    """FIRE, SKIP or DEFER for a due reminder, according to its catch-up policy"""
+    if (now - reminder.next_run_at).total_seconds() <= CATCH_UP_GRACE_SECONDS:
+        return FIRE
+
+    policy = reminder.catch_up_policy or DEFAULT_CATCH_UP_POLICY
+    if policy == "skip" and is_recurring(reminder):
+        return SKIP
+    if policy == "spread":
+        return DEFER
+    # coalesce, and one-time reminders under skip (they have a single run)
+    return FIRE
+
+
+def deferred_run(now: datetime) -> datetime:
+    """Random point within the catch-up window, for DEFER"""
+    return now + timedelta(seconds=random.uniform(0, CATCH_UP_WINDOW_SECONDS))
+
+
+def next_run_after(reminder: ReminderJob, now: datetime) -> datetime:
+    """Next run of a recurring reminder after `now`, including jitter"""
+    jitter = reminder.jitter_seconds if reminder.jitter_seconds is not None else DEFAULT_JITTER_SECONDS
+
+    if reminder.schedule_type == "cron":
+        # Cron fire times are already on their own grid
+        next_run = _compiled(reminder).next_after(now)
+    else:
+        interval = timedelta(minutes=reminder.interval_minutes)
+        if (reminder.schedule_anchor or DEFAULT_ANCHOR) == "grid":
+            origin = reminder.start_time or reminder.created_at
+            slots = (now - origin) // interval + 1 if now >= origin else 0
+            next_run = origin + slots * interval
+        else:
+            next_run = now + interval
+        if reminder.schedule_type == "business_hours":
+            next_run = _compiled(reminder).next_open(next_run)
+        # Never jitter past the following slot
+        jitter = min(jitter, interval.total_seconds())
+
+    if jitter > 0:
+        next_run += timedelta(seconds=random.uniform(0, jitter))
+    return next_run
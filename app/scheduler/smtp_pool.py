@@ -0,0 +1,159 @@
+import queue
+import smtplib
+import threading
+import time
+from email.message import Message
+from typing import Optional
+
+# Errors that mean the connection itself is gone (as opposed to a rejected message)
+BROKEN_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class SMTPPoolTimeout(smtplib.SMTPException):
+    """No pooled connection became free within the pool's acquire timeout"""
+
+
+class PooledSMTP(smtplib.SMTP):
+    """SMTP connection that records whether the current message reached DATA"""
+
+    data_started = False
+
+    def data(self, msg):
+        self.data_started = True
+        return super().data(msg)
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of authenticated SMTP connections.
+
+    Connections are kept open across sends and ticks. An idle connection is
+    health-checked with NOOP before reuse. A send that fails on a broken
+    connection before DATA is retried once on a fresh one; after DATA the server
+    may already have accepted the message, so the error is raised instead.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        max_size: int = 10,
+        timeout: float = 30,
+        idle_check_seconds: float = 30,
+        max_messages_per_connection: int = 1000,
+        acquire_timeout: float = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_check_seconds = idle_check_seconds
+        self.max_messages_per_connection = max_messages_per_connection
+        self.acquire_timeout = acquire_timeout
+
+        # Idle connections as (smtp, last_used_at, messages_sent)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open, secure and authenticate a new connection"""
+        server = PooledSMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.use_tls:
+                server.starttls()
+                server.ehlo()
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            self._discard(server)
+            raise
+        return server
+
+    @staticmethod
+    def _discard(server: smtplib.SMTP):
+        """Close a connection, ignoring errors from an already dead socket"""
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_alive(server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _acquire(self):
+        """Take a healthy idle connection, or open a new one"""
+        while True:
+            try:
+                server, last_used_at, sent = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect(), 0
+
+            if time.monotonic() - last_used_at < self.idle_check_seconds or self._is_alive(server):
+                return server, sent
+            self._discard(server)
+
+    def _release(self, server: smtplib.SMTP, sent: int):
+        if self._closed or sent >= self.max_messages_per_connection:
+            self._discard(server)
+        else:
+            self._idle.put((server, time.monotonic(), sent))
+
+    def send_message(self, message: Message):
+        """
+        Send a message on a pooled connection.
+
+        Waits up to `acquire_timeout` for a free connection, then raises SMTPPoolTimeout.
+        """
+        if self._closed:
+            raise RuntimeError("SMTP pool is closed")
+
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise SMTPPoolTimeout(f"no SMTP connection free after {self.acquire_timeout}s")
+        try:
+            server, sent = self._acquire()
+            server.data_started = False
+            try:
+                server.send_message(message)
+            except BROKEN_CONNECTION_ERRORS:
+                self._discard(server)
+                if server.data_started:
+                    # The message may have been accepted before the failure
+                    raise
+                # Broken before DATA (e.g. a stale connection): nothing was sent, reconnect once
+                server, sent = self._connect(), 0
+                try:
+                    server.send_message(message)
+                except Exception:
+                    self._discard(server)
+                    raise
+            except Exception:
+                self._release(server, sent)
+                raise
+            self._release(server, sent + 1)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close every idle connection; in-flight ones close on release"""
+        self._closed = True
+        while True:
+            try:
+                server, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(server)
@@ -0,0 +1,146 @@
+from datetime import datetime
+from typing import List
+
+from tortoise import Tortoise
+
+from app.models import ReminderJob, ReminderStatus
+
+
+# Every processed reminder that becomes COMPLETED (or FAILED). Reminders that
+# were sent before completing (one-time) also get last_run_at stamped.
+COMPLETE_SQL = """
+UPDATE reminder_jobs
+SET status = $1,
+    updated_at = $2,
+    last_run_at = CASE WHEN id = ANY($4::int[]) THEN $2 ELSE last_run_at END,
+    lease_owner = NULL,
+    lease_expires_at = NULL
+WHERE id = ANY($3::int[])
+"""
+
+# Recurring reminders moved to a new next_run_at (computed per row by
+# app.scheduler.schedule); only the ones that were sent get last_run_at stamped
+RESCHEDULE_SQL = """
+UPDATE reminder_jobs
+SET last_run_at = CASE WHEN u.sent THEN $1 ELSE reminder_jobs.last_run_at END,
+    next_run_at = u.next_run_at,
+    updated_at = $1,
+    lease_owner = NULL,
+    lease_expires_at = NULL
+FROM unnest($2::int[], $3::timestamptz[], $4::bool[]) AS u(id, next_run_at, sent)
+WHERE reminder_jobs.id = u.id
+"""
+
+# One-time reminders whose send failed and now wait in the retry queue: they
+# stay ACTIVE but leave the due set until the retry loop settles them
+AWAIT_RETRY_SQL = """
+UPDATE reminder_jobs
+SET next_run_at = NULL,
+    updated_at = $2,
+    lease_owner = NULL,
+    lease_expires_at = NULL
+WHERE id = ANY($1::int[])
+"""
+
+# Reminders left untouched but handed back so the next tick can retry them.
+# Expiring the lease at the tick time keeps later batches of the same tick
+# from claiming them again.
+RELEASE_SQL = """
+UPDATE reminder_jobs
+SET lease_owner = NULL,
+    lease_expires_at = $2
+WHERE id = ANY($1::int[])
+"""
+
+
+class TickOutcomes:
+    """
+    State transitions collected while processing one scheduler tick.
+
+    Nothing is written while reminders are processed; apply_outcomes()
+    flushes everything with a fixed number of set-based statements.
+    """
+
+    def __init__(self):
+        self.completed_ids: List[int] = []
+        self.sent_ids: List[int] = []
+        self.rescheduled_ids: List[int] = []
+        self.rescheduled_runs: List[datetime] = []
+        self.rescheduled_sent: List[bool] = []
+        self.released_ids: List[int] = []
+        self.failed_ids: List[int] = []
+        self.awaiting_retry_ids: List[int] = []
+
+    def complete(self, reminder: ReminderJob, sent: bool = False):
+        """Mark a reminder COMPLETED (sent=True also stamps last_run_at)"""
+        self.completed_ids.append(reminder.id)
+        if sent:
+            self.sent_ids.append(reminder.id)
+
+    def reschedule(self, reminder: ReminderJob, next_run_at: datetime, sent: bool = True):
+        """Move a reminder to next_run_at (sent=True also stamps last_run_at)"""
+        self.rescheduled_ids.append(reminder.id)
+        self.rescheduled_runs.append(next_run_at)
+        self.rescheduled_sent.append(sent)
+
+    def fail(self, reminder: ReminderJob):
+        """Mark a reminder FAILED (its delivery ran out of attempts)"""
+        self.failed_ids.append(reminder.id)
+
+    def await_retry(self, reminder: ReminderJob):
+        """Take a one-time reminder out of the due set while its send is retried"""
+        self.awaiting_retry_ids.append(reminder.id)
+
+    def release(self, reminder: ReminderJob):
+        """Drop the lease without changing the schedule"""
+        self.released_ids.append(reminder.id)
+
+    def __len__(self):
+        return (
+            len(self.completed_ids) + len(self.rescheduled_ids) + len(self.released_ids)
+            + len(self.failed_ids) + len(self.awaiting_retry_ids)
+        )
+
+
+async def apply_outcomes(outcomes: TickOutcomes, now: datetime, connection=None) -> int:
+    """
+    Write a tick's outcomes back with at most one statement per kind.
+
+    Args:
+        connection: Run on this connection (e.g. a transaction) instead of the default
+
+    Returns:
+        int: Number of statements executed
+    """
+    conn = connection or Tortoise.get_connection("default")
+    statements = 0
+
+    if outcomes.completed_ids:
+        await conn.execute_query(
+            COMPLETE_SQL,
+            [ReminderStatus.COMPLETED.value, now, outcomes.completed_ids, outcomes.sent_ids],
+        )
+        statements += 1
+
+    if outcomes.rescheduled_ids:
+        await conn.execute_query(
+            RESCHEDULE_SQL,
+            [now, outcomes.rescheduled_ids, outcomes.rescheduled_runs, outcomes.rescheduled_sent],
+        )
+        statements += 1
+
+    if outcomes.failed_ids:
+        await conn.execute_query(
+            COMPLETE_SQL, [ReminderStatus.FAILED.value, now, outcomes.failed_ids, []]
+        )
+        statements += 1
+
+    if outcomes.awaiting_retry_ids:
+        await conn.execute_query(AWAIT_RETRY_SQL, [outcomes.awaiting_retry_ids, now])
+        statements += 1
+
+    if outcomes.released_ids:
+        await conn.execute_query(RELEASE_SQL, [outcomes.released_ids, now])
+        statements += 1
+
+    return statements
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+import asyncpg
+from tortoise import Tortoise
+
+from app.database import db_config
+from app.scheduler.condition_checker import flag_cache
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel the API notifies when a reminder becomes due earlier
+WAKEUP_CHANNEL = "reminder_wakeup"
+# Postgres channel the API notifies when StatusFlag values change
+FLAGS_CHANNEL = "status_flags_changed"
+# NOTIFY payloads must stay under 8000 bytes; larger key sets invalidate everything
+MAX_NOTIFY_PAYLOAD = 7000
+
+
+async def notify_wakeup(next_run_at: Optional[datetime]):
+    """
+    Tell sleeping workers that a reminder is due at next_run_at.
+
+    Called by the API after creating or moving a reminder. Failures are only
+    logged: the worker's safety-net poll still picks the reminder up.
+    """
+    if next_run_at is None:
+        return
+    try:
+        conn = Tortoise.get_connection("default")
+        await conn.execute_query(
+            "SELECT pg_notify($1, $2)", [WAKEUP_CHANNEL, next_run_at.isoformat()]
+        )
+    except Exception as e:
+        logger.warning("Failed to notify workers", extra={"error": str(e)})
+
+
+async def notify_flags_changed(keys: List[str]):
+    """Tell workers to drop cached values for the given StatusFlag keys"""
+    payload = json.dumps(keys)
+    if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+        payload = "*"
+    try:
+        conn = Tortoise.get_connection("default")
+        await conn.execute_query("SELECT pg_notify($1, $2)", [FLAGS_CHANNEL, payload])
+    except Exception as e:
+        logger.warning("Failed to notify workers of flag changes", extra={"error": str(e)})
+
+
+class WakeupListener:
+    """
+    Sleeps until the next deadline, waking early on LISTEN/NOTIFY.
+
+    Uses a dedicated asyncpg connection (LISTEN needs a connection that is
+    not returned to the pool). If it drops, the worker falls back to
+    deadline/poll sleeps and reconnects on the next wait.
+
+    The same connection receives StatusFlag change notifications and
+    invalidates the worker's flag cache.
+    """
+
+    def __init__(self):
+        self._conn: Optional[asyncpg.Connection] = None
+        self._event = asyncio.Event()
+        self._deadline: Optional[datetime] = None
+
+    async def _ensure_listening(self):
+        if self._conn is not None and not self._conn.is_closed():
+            return
+        try:
+            self._conn = await asyncpg.connect(**db_config)
+            await self._conn.add_listener(WAKEUP_CHANNEL, self._on_notify)
+            await self._conn.add_listener(FLAGS_CHANNEL, self._on_flags_changed)
+            # Invalidations may have been missed while not listening
+            flag_cache.invalidate()
+        except Exception as e:
+            self._conn = None
+            logger.warning("LISTEN unavailable, polling only", extra={"error": str(e)})
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            due_at = datetime.fromisoformat(payload)
+        except ValueError:
+            self._event.set()
+            return
+        if self._deadline is None or due_at < self._deadline:
+            self._event.set()
+
+    def _on_flags_changed(self, connection, pid, channel, payload):
+        if payload == "*":
+            flag_cache.invalidate()
+            return
+        try:
+            flag_cache.invalidate(json.loads(payload))
+        except ValueError:
+            flag_cache.invalidate()
+
+    async def wait(self, seconds: float, deadline: Optional[datetime] = None):
+        """Sleep up to `seconds`, or until a reminder due before `deadline` is announced"""
+        await self._ensure_listening()
+        self._deadline = deadline
+        try:
+            # A notification that arrived during the tick wakes us immediately
+            await asyncio.wait_for(self._event.wait(), timeout=max(seconds, 0))
+        except asyncio.TimeoutError:
+            pass
+        self._event.clear()
+        self._deadline = None
+
+    def interrupt(self):
+        """End the current (or next) wait now, e.g. on shutdown"""
+        self._event.set()
+
+    async def close(self):
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
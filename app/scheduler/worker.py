@@ -1,13 +1,49 @@
-from app.scheduler.condition_checker import is_stop_condition_met
-from app.scheduler.notifier import trigger_notification
-from app.models import ReminderJob, ReminderStatus
-from datetime import datetime, timezone, timedelta
+from app.scheduler.condition_checker import evaluate_stop_conditions
+from app.scheduler.notifier import close_smtp_pool, dispatch_notifications
+from app.scheduler.transitions import TickOutcomes, apply_outcomes
+from app.scheduler.lease import CLAIM_BATCH_SIZE, WORKER_ID, claim_due_reminders
+from app.scheduler.wakeup import WakeupListener
+from app.scheduler.heartbeat import heartbeat, release_owned_leases
+from app.scheduler import schedule
+from app.scheduler.archiver import ARCHIVE_INTERVAL_SECONDS, run_archiver
+from app.scheduler.retries import (
+    MAX_ATTEMPTS, delivery_attempt, hold_token, new_retry, run_retry_loop, watch_late_send,
+    write_delivery_log,
+)
+from app.models import ReminderJob, ReminderStatus, WorkerStatus
+from datetime import datetime, timezone
 from app.database import init_db, close_db
+from app import metrics
+from app.logging_config import setup_logging
+from collections import Counter
+from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
 import asyncio
+import logging
+import os
+import signal
+import time
 import pytz
 
-POLL_INTERVAL_SECONDS = 30
+# Safety-net poll: the worker normally sleeps until the next deadline or a wakeup
+POLL_INTERVAL_SECONDS = int(os.getenv("SCHEDULER_POLL_INTERVAL_SECONDS", "300"))
+# Delay before the next tick after a failed one (e.g. the database was unreachable)
+ERROR_RETRY_SECONDS = float(os.getenv("SCHEDULER_ERROR_RETRY_SECONDS", "5"))
+# On SIGTERM/SIGINT the in-flight batch gets this long to finish before it is cancelled
+DRAIN_TIMEOUT_SECONDS = float(os.getenv("WORKER_DRAIN_TIMEOUT_SECONDS", "30"))
 IST = pytz.timezone('Asia/Kolkata')
+logger = logging.getLogger(__name__)
+
+# Reminders of batches that were dispatched but not written back (cancelled by
+# the drain timeout, or failed): their sends may have gone out, so shutdown
+# leaves their leases to expire instead of handing them to a peer
+_unsettled = set()
+
+# Pre-bound metric series (cheap to record in the loop)
+FETCH_PHASE = metrics.TICK_PHASE_SECONDS.labels("fetch")
+CONDITION_PHASE = metrics.TICK_PHASE_SECONDS.labels("condition_check")
+DISPATCH_PHASE = metrics.TICK_PHASE_SECONDS.labels("dispatch")
+WRITE_BACK_PHASE = metrics.TICK_PHASE_SECONDS.labels("write_back")
 
 
 def utc_to_ist(utc_dt):
@@ -17,93 +53,388 @@ def utc_to_ist(utc_dt):
     return utc_dt.astimezone(IST)
 
 
+def build_notification_data(reminder) -> dict:
+    """Notification payload for a reminder"""
+    return {
+        'entity_type': reminder.entity_type,
+        'entity_id': reminder.entity_id,
+        'event_type': reminder.event_type,
+        'channel': reminder.channel,
+        'recipient_email': f"{reminder.entity_id}@example.com",
+    }
+
+
+def _reminder_fields(reminder) -> dict:
+    """Structured log fields identifying a reminder"""
+    return {
+        "reminder_id": reminder.id,
+        "entity": f"{reminder.entity_type}/{reminder.entity_id}",
+        "event_type": reminder.event_type,
+        "channel": reminder.channel,
+    }
+
+
+def _next_run(reminder, now):
+    """schedule.next_run_after, or None when the stored schedule cannot fire again"""
+    try:
+        return schedule.next_run_after(reminder, now)
+    except ValueError as e:
+        logger.error("Invalid schedule, completing reminder", extra={
+            **_reminder_fields(reminder), "error": str(e),
+        })
+        return None
+
+
+async def process_batch(reminders, now):
+    """
+    Evaluate, dispatch and write back one batch of leased reminders.
+    
+    Returns:
+        Counter: Per-batch totals (processed, sent, failed, rescheduled, ...)
+    """
+    # Evaluate every stop condition of this batch in one pass
+    started = time.perf_counter()
+    stop_verdicts = await evaluate_stop_conditions(reminders)
+    CONDITION_PHASE.observe(time.perf_counter() - started)
+    outcomes = TickOutcomes()
+    notifications = {}
+    
+    debug = logger.isEnabledFor(logging.DEBUG)
+    summary = Counter(processed=len(reminders))
+    
+    for reminder in reminders:
+        if debug:
+            logger.debug("Processing reminder", extra=_reminder_fields(reminder))
+        
+        # Check stop condition BEFORE sending notification
+        if stop_verdicts[reminder.id]:
+            outcomes.complete(reminder)
+            summary["stop_condition_met"] += 1
+            if debug:
+                logger.debug("Stop condition met, completing", extra={"reminder_id": reminder.id})
+            continue
+        
+        # Late reminders (e.g. after downtime) follow their catch-up policy
+        action = schedule.catch_up_action(reminder, now)
+        if action == schedule.SKIP:
+            next_run = _next_run(reminder, now)
+            if next_run is None:
+                outcomes.complete(reminder)
+            else:
+                outcomes.reschedule(reminder, next_run, sent=False)
+            summary["skipped"] += 1
+            continue
+        if action == schedule.DEFER:
+            outcomes.reschedule(reminder, schedule.deferred_run(now), sent=False)
+            summary["deferred"] += 1
+            continue
+        
+        notifications[reminder.id] = build_notification_data(reminder)
+    
+    # Send all notifications of the batch concurrently
+    started = time.perf_counter()
+    results = await dispatch_notifications(notifications)
+    DISPATCH_PHASE.observe(time.perf_counter() - started)
+    sent_at = datetime.now(timezone.utc)
+    attempts = []
+    retries = []
+    late_sends = []
+    
+    for reminder in reminders:
+        result = results.get(reminder.id)
+        if result is None:
+            continue
+        if result.retry_at is not None:
+            # Rate limited: not attempted, due again when the limit allows
+            outcomes.reschedule(reminder, result.retry_at, sent=False)
+            summary["rate_limited"] += 1
+            continue
+        attempts.append(delivery_attempt(reminder.id, reminder.channel, 1, result, sent_at))
+        
+        if result.success:
+            summary["sent"] += 1
+            metrics.LAG_SECONDS.observe((sent_at - reminder.next_run_at).total_seconds())
+        else:
+            summary["failed"] += 1
+            logger.warning("Notification failed", extra={**_reminder_fields(reminder), "error": result.error})
+            # Retried by the retry loop, off the tick's critical path
+            if MAX_ATTEMPTS > 1:
+                # A timed-out send may still deliver: its retry waits for the real outcome
+                hold = hold_token() if result.pending is not None else None
+                retries.append(new_retry(reminder.id, notifications[reminder.id], result, sent_at, hold))
+                if hold is not None:
+                    late_sends.append((hold, result.pending))
+                summary["retries_queued"] += 1
+            else:
+                metrics.DELIVERY_FINAL_FAILURES_TOTAL.labels(reminder.channel).inc()
+        
+        # Schedule next run based on schedule type
+        next_run = _next_run(reminder, now) if schedule.is_recurring(reminder) else None
+        if next_run is not None:
+            outcomes.reschedule(reminder, next_run)
+            summary["rescheduled"] += 1
+            if debug:
+                next_run_ist = utc_to_ist(next_run)
+                logger.debug("Rescheduled", extra={
+                    "reminder_id": reminder.id,
+                    "next_run_ist": next_run_ist.strftime('%Y-%m-%d %H:%M:%S IST'),
+                })
+        elif result.success or schedule.is_recurring(reminder):
+            outcomes.complete(reminder, sent=result.success)
+            summary["completed"] += 1
+            if debug:
+                logger.debug("Reminder completed", extra={"reminder_id": reminder.id})
+        elif MAX_ATTEMPTS > 1:
+            # Nothing was delivered: the retry queue settles it (COMPLETED or FAILED)
+            outcomes.await_retry(reminder)
+            if debug:
+                logger.debug("One-time reminder waiting for retry", extra={"reminder_id": reminder.id})
+        else:
+            outcomes.fail(reminder)
+            summary["failed_final"] += 1
+    
+    # Write back the whole batch (state, delivery log, retries) in one transaction
+    if outcomes or attempts:
+        started = time.perf_counter()
+        async with in_transaction() as conn:
+            await write_delivery_log(attempts, retries, conn)
+            summary["statements"] += await apply_outcomes(outcomes, now, conn)
+        WRITE_BACK_PHASE.observe(time.perf_counter() - started)
+    
+    for hold, pending in late_sends:
+        watch_late_send(hold, pending)
+    
+    return summary
+
+
+async def release_reminders(reminders, now):
+    """Hand leased but unprocessed reminders back for the next tick"""
+    outcomes = TickOutcomes()
+    for reminder in reminders:
+        outcomes.release(reminder)
+    await apply_outcomes(outcomes, now)
+
+
+async def timed_claim(now):
+    """claim_due_reminders, recorded as the tick's fetch phase"""
+    started = time.perf_counter()
+    reminders = await claim_due_reminders(now)
+    FETCH_PHASE.observe(time.perf_counter() - started)
+    return reminders
+
+
+async def due_backlog(now):
+    """Number of reminders due right now (served by the status/next_run_at index)"""
+    return await ReminderJob.filter(
+        status=ReminderStatus.ACTIVE,
+        deleted_at__isnull=True,
+        next_run_at__lte=now
+    ).count()
+
+
+async def run_tick(now, stopping=None):
+    """
+    Process every due reminder in bounded batches, most overdue first.
+    
+    The next batch is claimed while the current one is evaluated and
+    dispatched, so at most two batches are held in memory at once.
+    
+    Once `stopping` is set the batch in progress is finished, nothing more is
+    claimed and a prefetched batch is handed back. A batch is never dispatched
+    while the worker is fenced (heartbeat missed or reaped by a peer).
+    
+    Returns:
+        Counter: Totals for the tick (processed, sent, failed, rescheduled, ...)
+    """
+    summary = Counter()
+    generation = heartbeat.generation
+    next_claim = asyncio.create_task(timed_claim(now))
+    
+    while next_claim is not None:
+        reminders = await next_claim
+        next_claim = None
+        if not reminders:
+            break
+        
+        if heartbeat.fenced(generation):
+            # A peer may already own these rows: hand back only leases still ours
+            summary["fenced"] += await release_owned_leases(ids=[r.id for r in reminders])
+            logger.warning("Worker fenced, batch handed back", extra={"batch_size": len(reminders)})
+            break
+        
+        # A full batch means more rows are probably due: prefetch the next one
+        if len(reminders) >= CLAIM_BATCH_SIZE and not (stopping and stopping.is_set()):
+            next_claim = asyncio.create_task(timed_claim(now))
+        
+        logger.debug("Processing batch", extra={"batch_size": len(reminders)})
+        batch_ids = [r.id for r in reminders]
+        _unsettled.update(batch_ids)
+        try:
+            summary.update(await process_batch(reminders, now))
+        except asyncio.CancelledError:
+            # Drain timeout: the scheduler hands back every other lease on the way out
+            if next_claim is not None:
+                next_claim.cancel()
+            raise
+        except Exception:
+            if next_claim is not None:
+                await release_reminders(await next_claim, now)
+            raise
+        _unsettled.difference_update(batch_ids)
+        
+        if stopping is not None and stopping.is_set() and next_claim is not None:
+            await release_reminders(await next_claim, now)
+            next_claim = None
+    
+    return summary
+
+
+async def next_deadline(now):
+    """
+    When the next tick has work: the earliest next_run_at of a reminder that is
+    already due and claimable (unleased or lease expired, e.g. handed back by a
+    failed batch), else of the next upcoming one (None if nothing is scheduled).
+    """
+    live = ReminderJob.filter(status=ReminderStatus.ACTIVE, deleted_at__isnull=True)
+    due = await live.filter(
+        Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now),
+        next_run_at__lte=now,
+    ).order_by("next_run_at").first().values_list("next_run_at", flat=True)
+    if due is not None:
+        return due
+    return await live.filter(
+        next_run_at__gt=now
+    ).order_by("next_run_at").first().values_list("next_run_at", flat=True)
+
+
 async def run_scheduler():
-    """Main scheduler loop"""
-    print("🟢 Scheduler started")
-    print(f"⏱️  Poll interval: {POLL_INTERVAL_SECONDS} seconds")
-    print(f"🌏 Display timezone: IST (Asia/Kolkata)")
+    """
+    Main scheduler loop.
+    
+    SIGTERM/SIGINT start a graceful drain: the in-flight batch is finished
+    (or cancelled after WORKER_DRAIN_TIMEOUT_SECONDS), every lease this worker
+    still holds is released and peers are woken to pick the rows up.
+    """
+    logger.info("Scheduler started", extra={
+        "worker_id": WORKER_ID,
+        "poll_interval_seconds": POLL_INTERVAL_SECONDS,
+        "display_timezone": "Asia/Kolkata",
+    })
+    
+    await init_db(role="worker")
+    await heartbeat.register()
+    await metrics.start_metrics_server()
+    wakeup = WakeupListener()
+    stopping = asyncio.Event()
+    main_task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    drain_timer = None
+    drain_deadline = None
+    
+    def request_stop():
+        nonlocal drain_timer, drain_deadline
+        if stopping.is_set():
+            # Second signal: stop waiting for the batch
+            main_task.cancel()
+            return
+        logger.info("Shutdown requested, draining", extra={"drain_timeout_seconds": DRAIN_TIMEOUT_SECONDS})
+        stopping.set()
+        wakeup.interrupt()
+        drain_deadline = loop.time() + DRAIN_TIMEOUT_SECONDS
+        drain_timer = loop.call_later(DRAIN_TIMEOUT_SECONDS, main_task.cancel)
+    
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, request_stop)
     
-    await init_db()
+    beats = asyncio.create_task(heartbeat.run())
+    # Keep reminder_jobs down to live rows in the background
+    archiver = asyncio.create_task(run_archiver()) if ARCHIVE_INTERVAL_SECONDS > 0 else None
+    # Failed sends are retried by their own loop so they never slow the tick
+    retry_loop = asyncio.create_task(run_retry_loop(stopping))
     
     try:
-        while True:
+        while not stopping.is_set():
+            deadline = None
+            sleep_seconds = POLL_INTERVAL_SECONDS
             try:
                 now = datetime.now(timezone.utc)
-                now_ist = utc_to_ist(now)
-                print(f"\n🔍 Scheduler tick at {now_ist.strftime('%Y-%m-%d %H:%M:%S IST')}")
+                tick_started = time.perf_counter()
+                backlog = await due_backlog(now)
+                metrics.DUE_BACKLOG.set(backlog)
                 
-                # Query for active reminders that are due
-                reminders = await ReminderJob.filter(
-                    status=ReminderStatus.ACTIVE,
-                    deleted_at__isnull=True,
-                    next_run_at__lte=now
-                ).all()
+                # Lease and process due reminders batch by batch (safe across worker processes)
+                summary = await run_tick(now, stopping)
                 
-                if not reminders:
-                    print("😴 No reminders due")
-                else:
-                    print(f"📋 Found {len(reminders)} reminder(s) to process")
+                # Sleep exactly until the next reminder is due
+                deadline = await next_deadline(datetime.now(timezone.utc))
+                if deadline is not None:
+                    remaining = (deadline - datetime.now(timezone.utc)).total_seconds()
+                    sleep_seconds = min(max(remaining, 0), POLL_INTERVAL_SECONDS)
                 
-                for reminder in reminders:
-                    try:
-                        print(f"\n⏰ Processing reminder ID: {reminder.id}")
-                        print(f"   Entity: {reminder.entity_type}/{reminder.entity_id}")
-                        print(f"   Event: {reminder.event_type}")
-                        print(f"   Channel: {reminder.channel}")
-                        
-                        # Check stop condition BEFORE sending notification
-                        if await is_stop_condition_met(reminder):
-                            print(f"✅ Stop condition met for reminder {reminder.id}")
-                            reminder.status = ReminderStatus.COMPLETED
-                            await reminder.save()
-                            print(f"🏁 Reminder {reminder.id} marked as COMPLETED")
-                            continue
-                        
-                        # Trigger notification
-                        print(f"📨 Triggering notification for reminder {reminder.id}")
-                        
-                        notification_data = {
-                            'entity_type': reminder.entity_type,
-                            'entity_id': reminder.entity_id,
-                            'event_type': reminder.event_type,
-                            'channel': reminder.channel,
-                            'recipient_email': f"{reminder.entity_id}@example.com",
-                        }
-                        
-                        notification_success = trigger_notification(notification_data)
-                        
-                        if notification_success:
-                            print(f"✅ Notification sent successfully for reminder {reminder.id}")
-                        else:
-                            print(f"⚠️ Notification failed for reminder {reminder.id}")
-                        
-                        # Update last run time
-                        reminder.last_run_at = now
-                        
-                        # Schedule next run based on schedule type
-                        if reminder.schedule_type == "recurring" and reminder.interval_minutes:
-                            reminder.next_run_at = now + timedelta(minutes=reminder.interval_minutes)
-                            next_run_ist = utc_to_ist(reminder.next_run_at)
-                            print(f"🔄 Rescheduled for {next_run_ist.strftime('%Y-%m-%d %H:%M:%S IST')}")
-                        else:
-                            reminder.status = ReminderStatus.COMPLETED
-                            print(f"🏁 One-time reminder {reminder.id} completed")
-                        
-                        await reminder.save()
-                        
-                    except Exception as e:
-                        print(f"❌ Error processing reminder {reminder.id}: {e}")
-                        continue
+                logger.info("Scheduler tick", extra={
+                    "tick_at_ist": utc_to_ist(now).strftime('%Y-%m-%d %H:%M:%S IST'),
+                    "due_backlog": backlog,
+                    **summary,
+                    "duration_ms": round((time.perf_counter() - tick_started) * 1000, 1),
+                    "sleep_seconds": round(sleep_seconds, 1),
+                })
                 
-            except Exception as e:
-                print(f"❌ Scheduler error: {e}")
+            except Exception:
+                logger.exception("Scheduler error")
+                # Retry soon: due rows (e.g. a prefetched batch handed back) must not wait for the poll
+                sleep_seconds = ERROR_RETRY_SECONDS
             
-            print(f"\n💤 Sleeping for {POLL_INTERVAL_SECONDS} seconds...")
-            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+            if not stopping.is_set():
+                await wakeup.wait(sleep_seconds, deadline)
             
+    except asyncio.CancelledError:
+        if not stopping.is_set():
+            raise
+        logger.warning("Drain timed out, abandoning the in-flight batch")
     finally:
+        if drain_timer is not None:
+            drain_timer.cancel()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.remove_signal_handler(sig)
+        # The retry batch shares the drain budget with the tick
+        drain_seconds = DRAIN_TIMEOUT_SECONDS if drain_deadline is None else max(drain_deadline - loop.time(), 0)
+        await _shutdown(retry_loop, beats, archiver, drain_seconds)
+        await wakeup.close()
+        close_smtp_pool()
         await close_db()
 
 
+async def _shutdown(retry_loop, beats, archiver, drain_seconds):
+    """
+    Let the retry batch finish, then hand back the leases this worker still holds.
+    
+    Leases of a batch cut short mid-dispatch (reminders or retries) are kept
+    until they expire: peers would otherwise send them again.
+    """
+    try:
+        await heartbeat.set_status(WorkerStatus.DRAINING)
+        if drain_seconds > 0:
+            await asyncio.wait({retry_loop}, timeout=drain_seconds)
+    except Exception:
+        logger.exception("Drain failed")
+    retries_settled = retry_loop.done()
+    for task in (retry_loop, beats, archiver):
+        if task is not None:
+            task.cancel()
+    try:
+        released = await release_owned_leases(keep=_unsettled, retries=retries_settled)
+        await heartbeat.set_status(WorkerStatus.STOPPED)
+        logger.info("Scheduler stopped", extra={
+            "worker_id": WORKER_ID,
+            "released_leases": released,
+            "kept_leases": len(_unsettled),
+            "retry_leases_kept": not retries_settled,
+        })
+    except Exception:
+        # Peers reap this worker once its heartbeat goes stale
+        logger.exception("Failed to deregister worker", extra={"worker_id": WORKER_ID})
+
+
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(run_scheduler())
\ No newline at end of file
@@ -1,8 +1,8 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Literal, Optional
 from datetime import datetime
 from tortoise.contrib.pydantic import pydantic_model_creator
-from app.models import ReminderJob
+from app.models import ReminderJob, ReminderStatus
 
 
 class ReminderCreate(BaseModel):
@@ -12,17 +12,98 @@ class ReminderCreate(BaseModel):
     channel: str
     schedule_type: str
     interval_minutes: Optional[int] = None
+    schedule_expression: Optional[str] = Field(
+        None, max_length=255,
+        description="cron: 5-field expression (e.g. '0 9 * * mon-fri'); business_hours: opening hours (e.g. 'mon-fri 09:00-18:00', the default)"
+    )
+    timezone: Optional[str] = Field(
+        None, max_length=64,
+        description="Timezone the schedule_expression is evaluated in (default Asia/Kolkata)"
+    )
     stop_condition_type: str
     stop_condition_value: str
     start_time: Optional[datetime] = Field(
         None, 
         description="When to start sending reminders (ISO format in IST, e.g., '2025-12-20T10:00:00'). If not provided, recurring reminders start after first interval, one-time reminders send immediately."
     )
+    catch_up_policy: Optional[Literal["coalesce", "skip", "spread"]] = Field(
+        None,
+        description="What to do when the reminder is late (e.g. after worker downtime). Defaults to SCHEDULER_CATCH_UP_POLICY."
+    )
+    schedule_anchor: Optional[Literal["now", "grid"]] = Field(
+        None,
+        description="'grid' keeps recurring runs on the start_time + k * interval grid; 'now' reschedules from the send time. Defaults to SCHEDULER_RESCHEDULE_ANCHOR."
+    )
+    jitter_seconds: Optional[int] = Field(
+        None, ge=0,
+        description="Random 0..N second offset added to each rescheduled run. Defaults to SCHEDULER_JITTER_SECONDS."
+    )
 
 
 # Generate Pydantic model from Tortoise model
 ReminderResponse = pydantic_model_creator(
     ReminderJob,
     name="ReminderResponse",
-    exclude=("deleted_at",)
-)
\ No newline at end of file
+    exclude=("deleted_at", "lease_owner", "lease_expires_at")
+)
+
+
+class ReminderBulkResult(BaseModel):
+    status: str = Field(..., description="'created' or 'existing'")
+    reminder: ReminderResponse
+
+
+class ReminderSelector(BaseModel):
+    """Reminders a bulk action applies to: an id list and/or filters (all must match)"""
+    ids: Optional[list[int]] = Field(None, max_length=5000)
+    entity_type: Optional[str] = None
+    entity_id: Optional[str] = None
+    event_type: Optional[str] = None
+    channel: Optional[str] = None
+    status: Optional[ReminderStatus] = None
+
+    @model_validator(mode="after")
+    def require_criteria(self):
+        # An empty selector would match every reminder
+        if not any(value is not None for value in self.model_dump().values()):
+            raise ValueError("Give ids or at least one filter")
+        return self
+
+
+class ReminderBulkActionResult(BaseModel):
+    affected: int = Field(..., description="Reminders paused, resumed or deleted")
+    skipped: int = Field(
+        0, description="resume: matched reminders left paused (an active reminder exists for the same entity and event, a delivery retry is in progress, or the schedule is invalid)"
+    )
+
+
+class ChannelForecast(BaseModel):
+    total: int
+    peak: int = Field(..., description="Most sends in one bucket")
+    peak_at: datetime
+    sends: list[int] = Field(..., description="Sends per bucket, starting at `start`")
+
+
+class SendForecast(BaseModel):
+    generated_at: datetime
+    start: datetime
+    horizon_hours: int
+    bucket_minutes: int
+    reminders: int = Field(..., description="Active reminders due within the horizon")
+    channels: dict[str, ChannelForecast]
+
+
+class StatusFlagSet(BaseModel):
+    value: bool
+
+
+class StatusFlagItem(BaseModel):
+    key: str = Field(..., max_length=255)
+    value: bool
+
+
+class StatusFlagWriteResult(BaseModel):
+    flags: list[StatusFlagItem]
+    completed_reminders: int = Field(
+        ..., description="ACTIVE db_check reminders completed because a flag became true"
+    )
@@ -0,0 +1,239 @@
+"""
+Scheduler and API benchmark harness.
+
+Usage:
+    python -m benchmarks.run --reminders 100000 --output results.json
+    python -m benchmarks.run --skip-seed --api-url http://127.0.0.1:8000 --api-requests 5000
+
+Runs against the database in DATABASE_URL (PostgreSQL: the worker's claim and
+write-back statements are Postgres-specific). Prints a JSON report so runs can
+be diffed and compared.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import resource
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks import seed as seeding
+
+
+def percentile(samples, pct: float):
+    """Nearest-rank percentile (None for no samples)"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": _ms(percentile(samples, 50)),
+        "p90_ms": _ms(percentile(samples, 90)),
+        "p99_ms": _ms(percentile(samples, 99)),
+        "max_ms": _ms(max(samples) if samples else None),
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(rss / divisor, 1)
+
+
+def _noop_sender(reminder_data: dict) -> bool:
+    return True
+
+
+async def bench_scheduler(max_ticks: int) -> dict:
+    """Run scheduler ticks (one claimed batch each) with a no-op notifier until nothing is due"""
+    from app import metrics
+    from app.scheduler import notifier, worker
+    from app.scheduler.lease import CLAIM_BATCH_SIZE
+
+    for channel in notifier.CHANNEL_SENDERS:
+        notifier.CHANNEL_SENDERS[channel] = _noop_sender
+
+    tick_seconds = []
+    processed = 0
+    started = time.perf_counter()
+
+    for _ in range(max_ticks):
+        now = datetime.now(timezone.utc)
+        tick_started = time.perf_counter()
+        reminders = await worker.timed_claim(now)
+        if not reminders:
+            break
+        await worker.process_batch(reminders, now)
+        tick_seconds.append(time.perf_counter() - tick_started)
+        processed += len(reminders)
+
+    elapsed = time.perf_counter() - started
+    phases = {
+        key[0]: {
+            "total_s": round(series.sum, 3),
+            "mean_ms": _ms(series.sum / series.count) if series.count else None,
+        }
+        for key, series in metrics.TICK_PHASE_SECONDS._series.items()
+    }
+    return {
+        "batch_size": CLAIM_BATCH_SIZE,
+        "reminders_processed": processed,
+        "elapsed_s": round(elapsed, 3),
+        "reminders_per_sec": round(processed / elapsed, 1) if elapsed else None,
+        "tick": summarize(tick_seconds),
+        "phases": phases,
+    }
+
+
+async def bench_api(api_url: str, total_requests: int, concurrency: int) -> dict:
+    """Drive the REST endpoints concurrently and report latency per endpoint"""
+    import httpx
+
+    latencies = {}
+    errors = {}
+    run_id = int(time.time())
+    counter = iter(range(total_requests))
+
+    def request_for(i):
+        kind = ("create", "list", "list_active", "get")[i % 4]
+        if kind == "create":
+            return kind, "POST", "/reminders/", {
+                "entity_type": seeding.BENCH_ENTITY_TYPE,
+                "entity_id": f"API{run_id}_{i}",
+                "event_type": "feedback_form",
+                "channel": "email",
+                "schedule_type": "recurring",
+                "interval_minutes": 60,
+                "stop_condition_type": "db_check",
+                "stop_condition_value": f"{seeding.FLAG_PREFIX}0",
+            }
+        if kind == "list":
+            return kind, "GET", "/reminders/?limit=100", None
+        if kind == "list_active":
+            return kind, "GET", "/reminders/active?limit=100&sort=next_run_at", None
+        return kind, "GET", f"/reminders/{i % 1000 + 1}", None
+
+    async def client_loop(client):
+        for i in counter:
+            kind, method, path, body = request_for(i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                ok = response.status_code < 500
+            except httpx.HTTPError:
+                ok = False
+            latencies.setdefault(kind, []).append(time.perf_counter() - started)
+            if not ok:
+                errors[kind] = errors.get(kind, 0) + 1
+
+    started = time.perf_counter()
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=api_url, limits=limits, timeout=60) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "api_url": api_url,
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_sec": round(total_requests / elapsed, 1) if elapsed else None,
+        "endpoints": {
+            kind: {**summarize(samples), "errors": errors.get(kind, 0)}
+            for kind, samples in latencies.items()
+        },
+    }
+
+
+async def main(args) -> dict:
+    from app.database import close_db, init_db
+
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+    if not args.skip_seed:
+        started = time.perf_counter()
+        report["seed"] = await seeding.seed(
+            args.reminders,
+            flags=args.flags,
+            stop_hit_rate=args.stop_hit_rate,
+            due_fraction=args.due_fraction,
+            one_time_fraction=args.one_time_fraction,
+            random_seed=args.random_seed,
+        )
+        report["seed"]["elapsed_s"] = round(time.perf_counter() - started, 3)
+
+    if not args.skip_scheduler:
+        await init_db(role="worker")
+        try:
+            report["scheduler"] = await bench_scheduler(args.max_ticks)
+        finally:
+            await close_db()
+
+    if args.api_url:
+        report["api"] = await bench_api(args.api_url, args.api_requests, args.api_concurrency)
+
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scheduler benchmark harness")
+    parser.add_argument("--reminders", type=int, default=10_000, help="ReminderJob rows to seed")
+    parser.add_argument("--flags", type=int, default=1_000, help="StatusFlag rows to seed")
+    parser.add_argument("--stop-hit-rate", type=float, default=0.2, help="Fraction of flags set true")
+    parser.add_argument("--due-fraction", type=float, default=1.0, help="Fraction of rows already due")
+    parser.add_argument("--one-time-fraction", type=float, default=0.1)
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--max-ticks", type=int, default=10_000)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse previously seeded rows")
+    parser.add_argument("--skip-scheduler", action="store_true")
+    parser.add_argument("--api-url", help="Base URL of a running API to load (e.g. http://127.0.0.1:8000)")
+    parser.add_argument("--api-requests", type=int, default=2_000)
+    parser.add_argument("--api-concurrency", type=int, default=32)
+    parser.add_argument("--reset", action="store_true", help="Delete benchmark rows and exit")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--verbose", action="store_true", help="Log worker activity to stderr")
+    return parser.parse_args(argv)
+
+
+async def _reset():
+    import asyncpg
+    from app.database import db_config
+
+    conn = await asyncpg.connect(**db_config)
+    try:
+        await seeding.reset(conn)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # Logs go to stderr so stdout stays pure JSON
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    if args.reset:
+        asyncio.run(_reset())
+        sys.exit(0)
+
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    print(report)
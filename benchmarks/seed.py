@@ -0,0 +1,121 @@
+"""
+Seed the database with a synthetic reminder workload.
+
+All benchmark rows use entity_type='bench' and status flag keys starting with
+'bench_', so they can be removed without touching real data.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+
+from app.database import db_config
+
+BENCH_ENTITY_TYPE = "bench"
+FLAG_PREFIX = "bench_flag_"
+COPY_CHUNK_SIZE = 50_000
+
+REMINDER_COLUMNS = (
+    "entity_type", "entity_id", "event_type", "channel", "schedule_type", "interval_minutes",
+    "next_run_at", "stop_condition_type", "stop_condition_value", "status",
+    "created_at", "updated_at",
+)
+
+DEFAULT_CHANNEL_MIX = {"email": 0.7, "slack": 0.2, "sms": 0.1}
+DEFAULT_INTERVALS = (1, 5, 15, 60, 1440)
+EVENT_TYPES = ("feedback_form", "interview_invitation", "payment_due", "document_upload")
+
+
+async def reset(conn: asyncpg.Connection):
+    """Remove every benchmark row"""
+    for table in ("delivery_attempts", "delivery_retries"):
+        await conn.execute(
+            f"DELETE FROM {table} WHERE reminder_id IN "
+            "(SELECT id FROM reminder_jobs WHERE entity_type = $1)",
+            BENCH_ENTITY_TYPE,
+        )
+    await conn.execute("DELETE FROM reminder_jobs WHERE entity_type = $1", BENCH_ENTITY_TYPE)
+    await conn.execute("DELETE FROM reminder_jobs_archive WHERE entity_type = $1", BENCH_ENTITY_TYPE)
+    await conn.execute("DELETE FROM status_flags WHERE key LIKE $1", FLAG_PREFIX + "%")
+
+
+async def seed(
+    reminders: int,
+    flags: int = 1000,
+    stop_hit_rate: float = 0.2,
+    due_fraction: float = 1.0,
+    one_time_fraction: float = 0.1,
+    channel_mix: dict = None,
+    intervals: tuple = DEFAULT_INTERVALS,
+    random_seed: int = 42,
+) -> dict:
+    """
+    Insert `reminders` ReminderJob rows and `flags` StatusFlag rows with COPY.
+
+    Args:
+        stop_hit_rate: Fraction of flags set to true (reminders using them complete)
+        due_fraction: Fraction of reminders already due; the rest are due within an hour
+        one_time_fraction: Fraction of one-time (non-recurring) reminders
+
+    Returns:
+        dict: The effective seed parameters (included in the report)
+    """
+    rng = random.Random(random_seed)
+    channel_mix = channel_mix or DEFAULT_CHANNEL_MIX
+    channels, weights = zip(*channel_mix.items())
+    now = datetime.now(timezone.utc)
+
+    conn = await asyncpg.connect(**db_config)
+    try:
+        await reset(conn)
+
+        await conn.copy_records_to_table(
+            "status_flags",
+            records=[
+                (f"{FLAG_PREFIX}{i}", rng.random() < stop_hit_rate, now, now)
+                for i in range(flags)
+            ],
+            columns=("key", "value", "created_at", "updated_at"),
+        )
+
+        for start in range(0, reminders, COPY_CHUNK_SIZE):
+            records = []
+            for i in range(start, min(start + COPY_CHUNK_SIZE, reminders)):
+                one_time = rng.random() < one_time_fraction
+                if rng.random() < due_fraction:
+                    next_run_at = now - timedelta(seconds=rng.uniform(0, 3600))
+                else:
+                    next_run_at = now + timedelta(seconds=rng.uniform(1, 3600))
+                records.append((
+                    BENCH_ENTITY_TYPE,
+                    f"B{i}",
+                    rng.choice(EVENT_TYPES),
+                    rng.choices(channels, weights)[0],
+                    "one_time" if one_time else "recurring",
+                    None if one_time else rng.choice(intervals),
+                    next_run_at,
+                    "db_check",
+                    f"{FLAG_PREFIX}{rng.randrange(flags)}",
+                    "ACTIVE",
+                    now,
+                    now,
+                ))
+            await conn.copy_records_to_table(
+                "reminder_jobs", records=records, columns=REMINDER_COLUMNS
+            )
+
+        await conn.execute("ANALYZE reminder_jobs")
+        await conn.execute("ANALYZE status_flags")
+    finally:
+        await conn.close()
+
+    return {
+        "reminders": reminders,
+        "flags": flags,
+        "stop_hit_rate": stop_hit_rate,
+        "due_fraction": due_fraction,
+        "one_time_fraction": one_time_fraction,
+        "channel_mix": channel_mix,
+        "intervals": list(intervals),
+        "random_seed": random_seed,
+    }
@@ -0,0 +1,135 @@
+"""
+Per-message notification render cost: the previous f-string + MIMEMultipart
+path against compiled templates with shared prebuilt headers.
+
+Usage:
+    python -m benchmarks.templates --messages 20000 --output templates.json
+
+No database needed. Messages are timed when built, and when built and
+serialized (as smtplib does before sending), for single reminders and for
+10-item digests. Prints a JSON report.
+"""
+import argparse
+import json
+import platform
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from app.scheduler import notifier
+
+EVENT_TYPES = ("feedback_form", "payment_due", "document_upload", "interview_slot")
+
+
+def legacy_email(reminder_data: dict):
+    """The email as built before templates (copied from the old notifier)"""
+    recipient = reminder_data.get('recipient_email', 'recipient@example.com')
+    entity_type = reminder_data.get('entity_type', 'Unknown')
+    entity_id = reminder_data.get('entity_id', 'Unknown')
+    event_type = reminder_data.get('event_type', 'Unknown')
+
+    message = MIMEMultipart('alternative')
+    message['Subject'] = f"Reminder: {event_type.replace('_', ' ').title()}"
+    message['From'] = f"{notifier.SMTP_FROM_NAME} <{notifier.SMTP_FROM_EMAIL}>"
+    message['To'] = recipient
+
+    if 'items' in reminder_data:
+        items = reminder_data['items']
+        message['Subject'] = f"You have {len(items)} pending reminders"
+        lines = [
+            (item.get('event_type', 'Unknown').replace('_', ' ').title(),
+             item.get('entity_type', 'Unknown'), item.get('entity_id', 'Unknown'))
+            for item in items
+        ]
+        text_items = "\n".join(f"- {event} ({et} {eid})" for event, et, eid in lines)
+        html_items = "".join(f"<li><strong>{event}</strong> ({et} {eid})</li>" for event, et, eid in lines)
+        text_body = f"\nHello,\n\nYou have {len(items)} pending reminders:\n\n{text_items}\n\n" \
+                    f"Please take the necessary action.\n\nBest regards,\nReminder System\n"
+        html_body = f"\n<html>\n  <body>\n    <p>Hello,</p>\n    <p>You have {len(items)} pending reminders:</p>\n" \
+                    f"    <ul>{html_items}</ul>\n    <p>Please take the necessary action.</p>\n" \
+                    f"    <p>Best regards,<br>Reminder System</p>\n  </body>\n</html>\n"
+    else:
+        title = event_type.replace('_', ' ').title()
+        text_body = f"\nHello,\n\nThis is a reminder regarding: {title}\n\nEntity Type: {entity_type}\n" \
+                    f"Entity ID: {entity_id}\n\nPlease take the necessary action.\n\nBest regards,\nReminder System\n"
+        html_body = f"\n<html>\n  <body>\n    <p>Hello,</p>\n" \
+                    f"    <p>This is a reminder regarding: <strong>{title}</strong></p>\n    <ul>\n" \
+                    f"      <li><strong>Entity Type:</strong> {entity_type}</li>\n" \
+                    f"      <li><strong>Entity ID:</strong> {entity_id}</li>\n    </ul>\n" \
+                    f"    <p>Please take the necessary action.</p>\n" \
+                    f"    <p>Best regards,<br>Reminder System</p>\n  </body>\n</html>\n"
+
+    message.attach(MIMEText(text_body, 'plain'))
+    message.attach(MIMEText(html_body, 'html'))
+    return message
+
+
+def template_email(reminder_data: dict):
+    recipient = reminder_data.get('recipient_email', 'recipient@example.com')
+    return notifier.build_email(recipient, notifier.render_notification(reminder_data))
+
+
+def notifications(count: int, digest_size: int) -> list:
+    result = []
+    for i in range(count):
+        data = {
+            'entity_type': 'interviewer',
+            'entity_id': f"INT_{i}",
+            'event_type': EVENT_TYPES[i % len(EVENT_TYPES)],
+            'channel': 'email',
+            'recipient_email': f"user{i}@example.com",
+        }
+        if digest_size > 1:
+            data['items'] = [
+                {**data, 'event_type': EVENT_TYPES[j % len(EVENT_TYPES)], 'entity_id': f"INT_{i}_{j}"}
+                for j in range(digest_size)
+            ]
+        result.append(data)
+    return result
+
+
+def per_message_us(build, messages: list, serialize: bool) -> float:
+    started = time.perf_counter()
+    for data in messages:
+        message = build(data)
+        if serialize:
+            message.as_string()
+    return round((time.perf_counter() - started) / len(messages) * 1e6, 2)
+
+
+def bench(messages: list) -> dict:
+    # Warm up (template compilation, imports) outside the timed runs
+    for build in (legacy_email, template_email):
+        build(messages[0]).as_string()
+    report = {}
+    for name, serialize in (("build", False), ("build_and_serialize", True)):
+        before = per_message_us(legacy_email, messages, serialize)
+        after = per_message_us(template_email, messages, serialize)
+        report[name] = {"before_us": before, "after_us": after, "speedup": round(before / after, 2)}
+    return report
+
+
+def main(args) -> dict:
+    return {
+        "python": platform.python_version(),
+        "messages": args.messages,
+        "single": bench(notifications(args.messages, 1)),
+        "digest": bench(notifications(args.messages, args.digest_size)),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Notification template benchmark")
+    parser.add_argument("--messages", type=int, default=20_000, help="Messages rendered per variant")
+    parser.add_argument("--digest-size", type=int, default=10, help="Reminders per digest message")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = json.dumps(main(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    print(report)
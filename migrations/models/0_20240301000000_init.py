@@ -0,0 +1,42 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "reminder_jobs" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "entity_type" VARCHAR(100) NOT NULL,
+    "entity_id" VARCHAR(100) NOT NULL,
+    "event_type" VARCHAR(100) NOT NULL,
+    "channel" VARCHAR(50) NOT NULL,
+    "schedule_type" VARCHAR(50) NOT NULL,
+    "interval_minutes" INT,
+    "start_time" TIMESTAMPTZ,
+    "next_run_at" TIMESTAMPTZ,
+    "last_run_at" TIMESTAMPTZ,
+    "stop_condition_type" VARCHAR(100) NOT NULL,
+    "stop_condition_value" VARCHAR(255) NOT NULL,
+    "status" VARCHAR(9) NOT NULL  DEFAULT 'ACTIVE',
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "deleted_at" TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS "idx_reminder_jo_status_63fd4f" ON "reminder_jobs" ("status", "next_run_at");
+COMMENT ON COLUMN "reminder_jobs"."status" IS 'ACTIVE: ACTIVE\nPAUSED: PAUSED\nCOMPLETED: COMPLETED';
+CREATE TABLE IF NOT EXISTS "status_flags" (
+    "key" VARCHAR(255) NOT NULL  PRIMARY KEY,
+    "value" BOOL NOT NULL  DEFAULT False,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS "aerich" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "version" VARCHAR(255) NOT NULL,
+    "app" VARCHAR(100) NOT NULL,
+    "content" JSONB NOT NULL
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        """
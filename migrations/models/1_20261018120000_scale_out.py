@@ -0,0 +1,115 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "reminder_jobs" ADD COLUMN IF NOT EXISTS "schedule_expression" VARCHAR(255);
+        ALTER TABLE "reminder_jobs" ADD COLUMN IF NOT EXISTS "timezone" VARCHAR(64);
+        ALTER TABLE "reminder_jobs" ADD COLUMN IF NOT EXISTS "catch_up_policy" VARCHAR(20);
+        ALTER TABLE "reminder_jobs" ADD COLUMN IF NOT EXISTS "schedule_anchor" VARCHAR(20);
+        ALTER TABLE "reminder_jobs" ADD COLUMN IF NOT EXISTS "jitter_seconds" INT;
+        ALTER TABLE "reminder_jobs" ADD COLUMN IF NOT EXISTS "lease_owner" VARCHAR(255);
+        ALTER TABLE "reminder_jobs" ADD COLUMN IF NOT EXISTS "lease_expires_at" TIMESTAMPTZ;
+        COMMENT ON COLUMN "reminder_jobs"."status" IS 'ACTIVE: ACTIVE\nPAUSED: PAUSED\nCOMPLETED: COMPLETED\nFAILED: FAILED';
+        DROP INDEX IF EXISTS "idx_reminder_jo_status_63fd4f";
+        CREATE INDEX IF NOT EXISTS "idx_reminder_jobs_due" ON "reminder_jobs" ("next_run_at") WHERE status = 'ACTIVE' AND deleted_at IS NULL;
+        UPDATE "reminder_jobs" r
+        SET "status" = 'COMPLETED', "deleted_at" = now(), "updated_at" = now()
+        WHERE r."status" = 'ACTIVE' AND r."deleted_at" IS NULL
+          AND EXISTS (
+              SELECT 1 FROM "reminder_jobs" k
+              WHERE k."entity_type" = r."entity_type"
+                AND k."entity_id" = r."entity_id"
+                AND k."event_type" = r."event_type"
+                AND k."status" = 'ACTIVE' AND k."deleted_at" IS NULL
+                AND k."id" < r."id"
+          );
+        CREATE UNIQUE INDEX IF NOT EXISTS "uniq_reminder_jobs_active_event" ON "reminder_jobs" ("entity_type", "entity_id", "event_type") WHERE status = 'ACTIVE' AND deleted_at IS NULL;
+        CREATE INDEX IF NOT EXISTS "idx_reminder_jobs_active_db_check" ON "reminder_jobs" ("stop_condition_value") WHERE status = 'ACTIVE' AND stop_condition_type = 'db_check';
+        CREATE TABLE IF NOT EXISTS "reminder_jobs_archive" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "entity_type" VARCHAR(100) NOT NULL,
+    "entity_id" VARCHAR(100) NOT NULL,
+    "event_type" VARCHAR(100) NOT NULL,
+    "channel" VARCHAR(50) NOT NULL,
+    "schedule_type" VARCHAR(50) NOT NULL,
+    "interval_minutes" INT,
+    "schedule_expression" VARCHAR(255),
+    "timezone" VARCHAR(64),
+    "start_time" TIMESTAMPTZ,
+    "next_run_at" TIMESTAMPTZ,
+    "last_run_at" TIMESTAMPTZ,
+    "catch_up_policy" VARCHAR(20),
+    "schedule_anchor" VARCHAR(20),
+    "jitter_seconds" INT,
+    "stop_condition_type" VARCHAR(100) NOT NULL,
+    "stop_condition_value" VARCHAR(255) NOT NULL,
+    "status" VARCHAR(9) NOT NULL  DEFAULT 'ACTIVE',
+    "lease_owner" VARCHAR(255),
+    "lease_expires_at" TIMESTAMPTZ,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "deleted_at" TIMESTAMPTZ,
+    "archived_at" TIMESTAMPTZ NOT NULL
+);
+        CREATE INDEX IF NOT EXISTS "idx_reminder_jo_archive_06a7bc" ON "reminder_jobs_archive" ("archived_at");
+        COMMENT ON COLUMN "reminder_jobs_archive"."status" IS 'ACTIVE: ACTIVE\nPAUSED: PAUSED\nCOMPLETED: COMPLETED\nFAILED: FAILED';
+        COMMENT ON TABLE "reminder_jobs_archive" IS 'COMPLETED and soft-deleted reminders moved out of reminder_jobs (see app.scheduler.archiver)';
+        CREATE TABLE IF NOT EXISTS "delivery_attempts" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "reminder_id" INT NOT NULL,
+    "channel" VARCHAR(50) NOT NULL,
+    "attempt" INT NOT NULL,
+    "success" BOOL NOT NULL,
+    "error" TEXT,
+    "attempted_at" TIMESTAMPTZ NOT NULL
+);
+        CREATE INDEX IF NOT EXISTS "idx_delivery_at_reminde_7c6e88" ON "delivery_attempts" ("reminder_id");
+        COMMENT ON TABLE "delivery_attempts" IS 'One send attempt (first send or retry), written in batches';
+        CREATE TABLE IF NOT EXISTS "delivery_retries" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "reminder_id" INT NOT NULL,
+    "channel" VARCHAR(50) NOT NULL,
+    "payload" JSONB NOT NULL,
+    "attempts" INT NOT NULL,
+    "next_attempt_at" TIMESTAMPTZ NOT NULL,
+    "last_error" TEXT,
+    "lease_owner" VARCHAR(255),
+    "lease_expires_at" TIMESTAMPTZ,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+        CREATE INDEX IF NOT EXISTS "idx_delivery_re_reminde_f4c9ea" ON "delivery_retries" ("reminder_id");
+        CREATE INDEX IF NOT EXISTS "idx_delivery_re_next_at_32a48f" ON "delivery_retries" ("next_attempt_at");
+        COMMENT ON TABLE "delivery_retries" IS 'A failed send waiting for its next attempt (see app.scheduler.retries)';
+        CREATE TABLE IF NOT EXISTS "scheduler_workers" (
+    "worker_id" VARCHAR(255) NOT NULL  PRIMARY KEY,
+    "hostname" VARCHAR(255) NOT NULL,
+    "pid" INT NOT NULL,
+    "status" VARCHAR(8) NOT NULL  DEFAULT 'RUNNING',
+    "started_at" TIMESTAMPTZ NOT NULL,
+    "heartbeat_at" TIMESTAMPTZ NOT NULL,
+    "stopped_at" TIMESTAMPTZ
+);
+        CREATE INDEX IF NOT EXISTS "idx_scheduler_w_heartbe_803a11" ON "scheduler_workers" ("heartbeat_at");
+        COMMENT ON COLUMN "scheduler_workers"."status" IS 'RUNNING: RUNNING\nDRAINING: DRAINING\nSTOPPED: STOPPED\nDEAD: DEAD';
+        COMMENT ON TABLE "scheduler_workers" IS 'A scheduler worker process and its last heartbeat (see app.scheduler.heartbeat)';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "scheduler_workers";
+        DROP TABLE IF EXISTS "delivery_retries";
+        DROP TABLE IF EXISTS "delivery_attempts";
+        DROP TABLE IF EXISTS "reminder_jobs_archive";
+        DROP INDEX IF EXISTS "idx_reminder_jobs_active_db_check";
+        DROP INDEX IF EXISTS "uniq_reminder_jobs_active_event";
+        DROP INDEX IF EXISTS "idx_reminder_jobs_due";
+        CREATE INDEX IF NOT EXISTS "idx_reminder_jo_status_63fd4f" ON "reminder_jobs" ("status", "next_run_at");
+        COMMENT ON COLUMN "reminder_jobs"."status" IS 'ACTIVE: ACTIVE\nPAUSED: PAUSED\nCOMPLETED: COMPLETED';
+        ALTER TABLE "reminder_jobs" DROP COLUMN IF EXISTS "lease_expires_at";
+        ALTER TABLE "reminder_jobs" DROP COLUMN IF EXISTS "lease_owner";
+        ALTER TABLE "reminder_jobs" DROP COLUMN IF EXISTS "jitter_seconds";
+        ALTER TABLE "reminder_jobs" DROP COLUMN IF EXISTS "schedule_anchor";
+        ALTER TABLE "reminder_jobs" DROP COLUMN IF EXISTS "catch_up_policy";
+        ALTER TABLE "reminder_jobs" DROP COLUMN IF EXISTS "timezone";
+        ALTER TABLE "reminder_jobs" DROP COLUMN IF EXISTS "schedule_expression";"""
@@ -0,0 +1,70 @@
+"""Filter-based bulk pause and resume"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app import models, schemas
+from app.models import ReminderStatus
+from app.routes import reminders
+from tests.test_idempotency import payload
+
+pytestmark = [pytest.mark.postgres, pytest.mark.anyio]
+
+
+async def test_resume_walks_a_large_selection_in_chunks(db, monkeypatch):
+    monkeypatch.setattr(reminders, "RESUME_CHUNK_SIZE", 3)
+    await reminders.create_reminders_bulk([payload(entity_id=str(i)) for i in range(10)])
+    await reminders.pause_reminders_bulk(schemas.ReminderSelector(channel="email"))
+    # A second paused reminder for entity 0, in a later chunk than the first
+    await reminders.create_reminder(payload(entity_id="0"))
+    await reminders.pause_reminders_bulk(schemas.ReminderSelector(entity_id="0"))
+
+    result = await reminders.resume_reminders_bulk(schemas.ReminderSelector(channel="email"))
+
+    assert result == {"affected": 10, "skipped": 1}
+    assert await models.ReminderJob.filter(status=ReminderStatus.ACTIVE).count() == 10
+    left_paused = await models.ReminderJob.filter(status=ReminderStatus.PAUSED).values_list("entity_id", flat=True)
+    assert left_paused == ["0"]
+
+
+async def _awaiting_retry(entity_id, lease_expires_at=None):
+    """A reminder whose send failed and now waits on a delivery retry"""
+    reminder = await reminders.create_reminder(payload(entity_id=entity_id))
+    await models.ReminderJob.filter(id=reminder.id).update(next_run_at=None)
+    await models.DeliveryRetry.create(
+        reminder_id=reminder.id, channel="email", payload={}, attempts=1,
+        next_attempt_at=datetime.now(timezone.utc) + timedelta(minutes=5),
+        lease_owner="other-worker" if lease_expires_at else None, lease_expires_at=lease_expires_at,
+    )
+    await reminders.pause_reminder(reminder.id)
+    return reminder.id
+
+
+async def test_resume_drops_a_pending_retry(db):
+    single = await _awaiting_retry("single")
+    bulk = await _awaiting_retry("bulk")
+
+    await reminders.resume_reminder(single)
+    result = await reminders.resume_reminders_bulk(schemas.ReminderSelector(entity_id="bulk"))
+
+    assert result == {"affected": 1, "skipped": 0}
+    assert not await models.DeliveryRetry.exists()
+    for reminder_id in (single, bulk):
+        reminder = await models.ReminderJob.get(id=reminder_id)
+        assert reminder.status == ReminderStatus.ACTIVE and reminder.next_run_at is not None
+
+
+async def test_resume_leaves_a_reminder_with_a_retry_in_flight_paused(db):
+    leased_until = datetime.now(timezone.utc) + timedelta(minutes=1)
+    single = await _awaiting_retry("single", lease_expires_at=leased_until)
+    bulk = await _awaiting_retry("bulk", lease_expires_at=leased_until)
+
+    with pytest.raises(HTTPException) as exc:
+        await reminders.resume_reminder(single)
+    result = await reminders.resume_reminders_bulk(schemas.ReminderSelector(entity_id="bulk"))
+
+    assert exc.value.status_code == 409
+    assert result == {"affected": 0, "skipped": 1}
+    assert await models.DeliveryRetry.all().count() == 2
+    assert await models.ReminderJob.filter(status=ReminderStatus.PAUSED).count() == 2
@@ -0,0 +1,130 @@
+"""Cron expressions and business-hours windows (app.scheduler.cron)"""
+from datetime import datetime, timezone
+
+import pytest
+
+from app.scheduler.cron import BusinessHours, CronSchedule, _parse_field, compile_schedule
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("field, low, high, expected", [
+    ("*", 0, 5, [0, 1, 2, 3, 4, 5]),
+    ("*/15", 0, 59, [0, 15, 30, 45]),
+    ("5/20", 0, 59, [5, 25, 45]),
+    ("1-3,10", 0, 59, [1, 2, 3, 10]),
+    ("10-20/5", 0, 59, [10, 15, 20]),
+    ("7", 0, 59, [7]),
+])
+def test_parse_field(field, low, high, expected):
+    assert _parse_field(field, low, high) == expected
+
+
+@pytest.mark.parametrize("expression", [
+    "0 9 * *",          # 4 fields
+    "60 9 * * *",       # minute out of range
+    "0 9 * * mon-sun-x",
+    "0 9 * */0 *",      # zero step
+    "0 18-9 * * *",     # backwards range
+    "0 9 * * funday",
+])
+def test_invalid_expressions_are_rejected(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression, "UTC")
+
+
+def test_next_after_is_strictly_after():
+    cron = CronSchedule("0 9 * * *", "UTC")
+    assert cron.next_after(utc(2026, 10, 18, 8, 59)) == utc(2026, 10, 18, 9, 0)
+    assert cron.next_after(utc(2026, 10, 18, 9, 0)) == utc(2026, 10, 19, 9, 0)
+
+
+def test_weekday_names_and_sunday_as_0_or_7():
+    weekdays = CronSchedule("0 9 * * mon-fri", "UTC")
+    # Sunday 2026-10-18 -> Monday
+    assert weekdays.next_after(utc(2026, 10, 18, 12, 0)) == utc(2026, 10, 19, 9, 0)
+    # Friday evening -> Monday
+    assert weekdays.next_after(utc(2026, 10, 23, 10, 0)) == utc(2026, 10, 26, 9, 0)
+
+    for sunday in ("0", "7", "sun"):
+        cron = CronSchedule(f"0 9 * * {sunday}", "UTC")
+        assert cron.next_after(utc(2026, 10, 19, 0, 0)) == utc(2026, 10, 25, 9, 0)
+
+
+def test_day_of_month_or_weekday_when_both_are_restricted():
+    # The 1st of the month OR any Monday
+    cron = CronSchedule("0 9 1 * mon", "UTC")
+    assert cron.next_after(utc(2026, 10, 19, 10, 0)) == utc(2026, 10, 26, 9, 0)
+    assert cron.next_after(utc(2026, 10, 26, 10, 0)) == utc(2026, 11, 1, 9, 0)
+
+
+def test_month_names_and_steps():
+    cron = CronSchedule("*/30 9-10 15 jan,jul *", "UTC")
+    occurrences = list(cron.occurrences(utc(2026, 1, 1), utc(2026, 8, 1)))
+    assert occurrences == [
+        utc(2026, 1, 15, 9, 0), utc(2026, 1, 15, 9, 30), utc(2026, 1, 15, 10, 0), utc(2026, 1, 15, 10, 30),
+        utc(2026, 7, 15, 9, 0), utc(2026, 7, 15, 9, 30), utc(2026, 7, 15, 10, 0), utc(2026, 7, 15, 10, 30),
+    ]
+
+
+def test_expression_that_never_fires():
+    with pytest.raises(ValueError, match="never fires"):
+        CronSchedule("0 0 30 2 *", "UTC").next_after(utc(2026, 1, 1))
+
+
+def test_evaluated_in_the_schedule_timezone():
+    # 09:00 IST is 03:30 UTC
+    cron = CronSchedule("0 9 * * *", "Asia/Kolkata")
+    assert cron.next_after(utc(2026, 10, 18, 0, 0)) == utc(2026, 10, 18, 3, 30)
+
+
+def test_wall_clock_time_is_kept_across_dst():
+    cron = CronSchedule("0 9 * * *", "America/New_York")
+    # EDT (UTC-4) until 2026-11-01, EST (UTC-5) after
+    assert cron.next_after(utc(2026, 10, 31, 14, 0)) == utc(2026, 11, 1, 14, 0)
+    assert cron.next_after(utc(2026, 10, 30, 14, 0)) == utc(2026, 10, 31, 13, 0)
+
+
+def test_occurrences_include_start_and_exclude_end():
+    cron = CronSchedule("0 * * * *", "UTC")
+    assert list(cron.occurrences(utc(2026, 10, 18, 9, 0), utc(2026, 10, 18, 11, 0))) == [
+        utc(2026, 10, 18, 9, 0), utc(2026, 10, 18, 10, 0),
+    ]
+
+
+def test_business_hours_next_open():
+    hours = BusinessHours("mon-fri 09:00-18:00", "UTC")
+    # Inside the window: unchanged
+    assert hours.next_open(utc(2026, 10, 19, 10, 15)) == utc(2026, 10, 19, 10, 15)
+    # Before opening, after closing, and on the weekend
+    assert hours.next_open(utc(2026, 10, 19, 7, 0)) == utc(2026, 10, 19, 9, 0)
+    assert hours.next_open(utc(2026, 10, 19, 18, 0)) == utc(2026, 10, 20, 9, 0)
+    assert hours.next_open(utc(2026, 10, 17, 12, 0)) == utc(2026, 10, 19, 9, 0)
+
+
+def test_business_hours_windows():
+    hours = BusinessHours("sat,sun 10:00-12:00", "UTC")
+    assert list(hours.windows(utc(2026, 10, 17, 11, 0), utc(2026, 10, 24, 11, 0))) == [
+        (utc(2026, 10, 17, 10, 0), utc(2026, 10, 17, 12, 0)),
+        (utc(2026, 10, 18, 10, 0), utc(2026, 10, 18, 12, 0)),
+        (utc(2026, 10, 24, 10, 0), utc(2026, 10, 24, 12, 0)),
+    ]
+
+
+@pytest.mark.parametrize("expression", ["mon-fri", "mon-fri 18:00-09:00", "mon-fri 9am-6pm"])
+def test_invalid_business_hours_are_rejected(expression):
+    with pytest.raises(ValueError):
+        BusinessHours(expression, "UTC")
+
+
+def test_compile_schedule():
+    assert compile_schedule("cron", "0 9 * * *", "UTC") is compile_schedule("cron", "0 9 * * *", "UTC")
+    assert isinstance(compile_schedule("business_hours", None, None), BusinessHours)
+    with pytest.raises(ValueError, match="Unknown timezone"):
+        compile_schedule("cron", "0 9 * * *", "Mars/Olympus")
+    with pytest.raises(ValueError, match="need a schedule_expression"):
+        compile_schedule("cron", None, "UTC")
+    with pytest.raises(ValueError):
+        compile_schedule("recurring", None, "UTC")
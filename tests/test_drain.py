@@ -0,0 +1,53 @@
+"""Graceful drain: a batch cut short mid-dispatch is never handed to a peer"""
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models import ReminderJob
+from app.scheduler import notifier, worker
+from app.scheduler.lease import CLAIM_BATCH_SIZE, WORKER_ID
+from benchmarks.seed import seed
+
+pytestmark = [pytest.mark.postgres, pytest.mark.anyio]
+
+
+@pytest.fixture
+def hung_sender(monkeypatch):
+    """Email sends block until the test ends; `started` is set by the first one"""
+    started, release = threading.Event(), threading.Event()
+
+    def send(reminder_data: dict) -> bool:
+        started.set()
+        release.wait(30)
+        return True
+
+    monkeypatch.setitem(notifier.CHANNEL_SENDERS, "email", send)
+    # The blocked sends hold channel permits bound to this test's event loop
+    monkeypatch.setattr(notifier, "_channel_semaphores", {})
+    yield started
+    release.set()
+
+
+async def test_cancelled_batch_keeps_its_leases_on_shutdown(db, hung_sender, monkeypatch):
+    monkeypatch.setattr(worker, "_unsettled", set())
+    # One full batch in flight, and a prefetched one behind it
+    await seed(CLAIM_BATCH_SIZE + 50, stop_hit_rate=0, one_time_fraction=1.0, channel_mix={"email": 1.0})
+
+    tick = asyncio.create_task(worker.run_tick(datetime.now(timezone.utc)))
+    while not hung_sender.is_set():
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)  # Let the prefetch claim land
+    # Drain timeout
+    tick.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await tick
+
+    retry_loop = asyncio.create_task(asyncio.sleep(0))
+    await retry_loop
+    await worker._shutdown(retry_loop, None, None, 0)
+
+    # The dispatched batch stays leased (peers must not resend it); the prefetched one is free
+    assert await ReminderJob.filter(lease_owner=WORKER_ID).count() == CLAIM_BATCH_SIZE
+    assert await ReminderJob.filter(lease_owner__isnull=True).count() == 50
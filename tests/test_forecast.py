@@ -0,0 +1,123 @@
+"""Send-load projection over decoded COPY rows (app.scheduler.forecast.project)"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.scheduler.forecast import (
+    BUSINESS_HOURS, BUSINESS_HOURS_GRID, CRON, ONE_TIME, RECURRING, ROW_DTYPE, _open_minutes, project,
+)
+
+# Monday
+START = datetime(2026, 10, 19, 16, 0, tzinfo=timezone.utc)
+CHANNELS = ["email", "slack"]
+
+
+def rows(*specs) -> np.ndarray:
+    """(minute offset, kind, interval, channel code, calendar group code) per reminder"""
+    data = np.zeros(len(specs), dtype=ROW_DTYPE)
+    for i, (offset, kind, interval, channel, group) in enumerate(specs):
+        data[i]["run_at"] = (START + timedelta(minutes=offset)).timestamp()
+        data[i]["kind"], data[i]["interval"] = kind, interval
+        data[i]["channel"], data[i]["group"] = channel, group
+    return data
+
+
+def send_minutes(sends: np.ndarray) -> list:
+    return [minute for minute in np.flatnonzero(sends) for _ in range(sends[minute])]
+
+
+def test_one_time_reminders_send_once_and_overdue_ones_count_now():
+    result = project(rows((5, ONE_TIME, 0, 1, 0), (-30, ONE_TIME, 0, 1, 0)), CHANNELS, [], START, 60)
+    assert send_minutes(result[0]) == [0, 5]
+    assert not result[1].any()
+
+
+def test_recurring_reminders_repeat_every_interval():
+    result = project(rows((3, RECURRING, 10, 2, 0)), CHANNELS, [], START, 60)
+    assert send_minutes(result[1]) == [3, 13, 23, 33, 43, 53]
+
+
+def test_rows_outside_the_horizon_or_of_unknown_channels_are_left_out():
+    result = project(rows((60, ONE_TIME, 0, 1, 0), (1, ONE_TIME, 0, 0, 0)), CHANNELS, [], START, 60)
+    assert not result.any()
+
+
+def test_matches_a_row_by_row_projection():
+    rng = np.random.default_rng(7)
+    specs = [
+        (int(rng.integers(-60, 300)), int(kind), int(rng.integers(1, 90)), int(rng.integers(1, 3)), 0)
+        for kind in rng.choice([ONE_TIME, RECURRING], size=500)
+    ]
+    minutes = 240
+
+    expected = np.zeros((len(CHANNELS), minutes), dtype=np.int64)
+    for offset, kind, interval, channel, _ in specs:
+        minute = max(offset, 0)
+        while minute < minutes:
+            expected[channel - 1, minute] += 1
+            if kind == ONE_TIME:
+                break
+            minute += interval
+
+    assert np.array_equal(project(rows(*specs), CHANNELS, [], START, minutes), expected)
+
+
+def test_cron_reminders_follow_their_expression():
+    calendar = ["cron|*/15 * * * *|UTC"]
+    result = project(rows((0, CRON, 0, 1, 1), (20, CRON, 0, 1, 1)), CHANNELS, calendar, START, 60)
+    # Each reminder at its next_run_at, then at every fire time after it
+    assert send_minutes(result[0]) == [0, 15, 20, 30, 30, 45, 45]
+
+
+def test_business_hours_collapse_closed_runs_into_one_send_at_the_opening():
+    calendar = ["business_hours|mon-fri 09:00-18:00|UTC"]
+    result = project(rows((0, BUSINESS_HOURS, 60, 1, 1)), CHANNELS, calendar, START, 24 * 60)
+    # 16:00 and 17:00 today, closed overnight, then hourly from 09:00 tomorrow
+    assert send_minutes(result[0]) == [0, 60] + [1020 + 60 * hour for hour in range(7)]
+
+
+def test_business_hours_restart_the_stride_at_the_opening_unless_grid_anchored():
+    calendar = ["business_hours|mon-fri 09:00-18:00|UTC"]
+    specs = rows((30, BUSINESS_HOURS, 60, 1, 1), (30, BUSINESS_HOURS_GRID, 60, 2, 1))
+    result = project(specs, CHANNELS, calendar, START, 20 * 60)
+    # 16:30 and 17:30, then 09:00 for the 18:30 run; rescheduled from that send...
+    assert send_minutes(result[0]) == [30, 90, 1020, 1080, 1140]
+    # ...or back on the :30 grid
+    assert send_minutes(result[1]) == [30, 90, 1020, 1050, 1110, 1170]
+
+
+@pytest.mark.parametrize("kind", [BUSINESS_HOURS, BUSINESS_HOURS_GRID], ids=["now", "grid"])
+def test_business_hours_match_a_row_by_row_projection(kind):
+    group = "business_hours|mon-fri 09:00-18:00|UTC"
+    rng = np.random.default_rng(11)
+    specs = [
+        (int(rng.integers(-60, 4000)), kind, int(rng.integers(1, 1500)), 1, 1)
+        for _ in range(300)
+    ]
+    minutes = 4 * 24 * 60
+    open_mask = _open_minutes(group, START, minutes)
+    openings = np.flatnonzero(open_mask)
+
+    expected = np.zeros((len(CHANNELS), minutes), dtype=np.int64)
+    for offset, _, interval, channel, _ in specs:
+        origin = minute = max(offset, 0)
+        while minute < minutes:
+            if not open_mask[minute]:
+                later = openings[openings > minute]
+                if not len(later):
+                    break
+                minute = int(later[0])
+            expected[channel - 1, minute] += 1
+            if kind == BUSINESS_HOURS:
+                minute += interval
+            else:
+                minute = origin + ((minute - origin) // interval + 1) * interval
+
+    assert np.array_equal(project(rows(*specs), CHANNELS, [group], START, minutes), expected)
+
+
+@pytest.mark.parametrize("group", ["cron|not a cron|UTC", "cron|0 9 * * *|Mars/Olympus"])
+def test_invalid_calendar_groups_are_skipped(group):
+    result = project(rows((0, CRON, 0, 1, 1), (0, ONE_TIME, 0, 1, 0)), CHANNELS, [group], START, 60)
+    assert send_minutes(result[0]) == [0]
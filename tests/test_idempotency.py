@@ -0,0 +1,63 @@
+"""Create idempotency on (entity_type, entity_id, event_type)"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import models, schemas
+from app.routes import reminders
+
+pytestmark = [pytest.mark.postgres, pytest.mark.anyio]
+
+
+def payload(entity_type: str = "task", entity_id: str = "42", event_type: str = "feedback_due"):
+    return schemas.ReminderCreate(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        event_type=event_type,
+        channel="email",
+        schedule_type="one_time",
+        stop_condition_type="db_check",
+        stop_condition_value="feedback_submitted",
+        start_time=datetime.now(timezone.utc) + timedelta(hours=1),
+    )
+
+
+async def test_active_reminders_match_the_whole_key(db):
+    # Same entity_id and event_type under other entity types: must not be read
+    for entity_type in ("task", "project", "invoice"):
+        await reminders.create_reminder(payload(entity_type=entity_type))
+
+    found = await reminders._active_reminders([("task", "42", "feedback_due"), ("task", "7", "feedback_due")])
+
+    assert list(found) == [("task", "42", "feedback_due")]
+    assert found[("task", "42", "feedback_due")].entity_type == "task"
+
+
+async def test_completed_reminders_do_not_count(db):
+    created = await reminders.create_reminder(payload())
+    await models.ReminderJob.filter(id=created.id).update(status=models.ReminderStatus.COMPLETED)
+
+    assert await reminders._active_reminders([("task", "42", "feedback_due")]) == {}
+
+
+async def test_concurrent_identical_creates_make_one_reminder(db):
+    results = await asyncio.gather(*(reminders.create_reminder(payload()) for _ in range(50)))
+
+    assert len({r.id for r in results}) == 1
+    assert await models.ReminderJob.filter(entity_type="task", entity_id="42").count() == 1
+
+
+async def test_concurrent_overlapping_bulk_creates_make_one_reminder_per_key(db):
+    keys = [str(i) for i in range(100)]
+    batches = [[payload(entity_id=key) for key in keys[start:] + keys[:start]] for start in range(0, 100, 10)]
+
+    results = await asyncio.gather(*(reminders.create_reminders_bulk(batch) for batch in batches))
+
+    created = [r for batch in results for r in batch if r["status"] == "created"]
+    assert len(created) == len(keys)
+    assert await models.ReminderJob.all().count() == len(keys)
+    by_key = {}
+    for batch in results:
+        for r in batch:
+            assert by_key.setdefault(r["reminder"].entity_id, r["reminder"].id) == r["reminder"].id
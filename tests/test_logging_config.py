@@ -0,0 +1,65 @@
+"""Queued logging: records are formatted in the writer thread (app.logging_config)"""
+import io
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+
+import pytest
+
+from app.logging_config import DeferredQueueHandler, JsonFormatter
+
+
+class RenderedIn:
+    """Log argument that remembers which threads rendered it"""
+
+    def __init__(self):
+        self.threads = set()
+
+    def __str__(self) -> str:
+        self.threads.add(threading.current_thread())
+        return "rendered"
+
+
+@pytest.fixture
+def json_logger():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    # Outside the logger tree, so pytest's capture handlers never see its records
+    logger = logging.Logger("tests.logging_config")
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    listener.start()
+
+    def entries() -> list:
+        listener.stop()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield logger, entries
+
+
+def test_exception_traceback_goes_into_exc(json_logger):
+    logger, entries = json_logger
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Tick failed for %s", "worker-1", extra={"batch_size": 3})
+
+    [entry] = entries()
+    assert entry["msg"] == "Tick failed for worker-1"
+    assert entry["batch_size"] == 3
+    assert entry["exc"].startswith("Traceback")
+    assert "ValueError: boom" in entry["exc"]
+
+
+def test_messages_are_rendered_in_the_writer_thread(json_logger):
+    logger, entries = json_logger
+    arg = RenderedIn()
+    logger.warning("value: %s", arg)
+
+    assert [entry["msg"] for entry in entries()] == ["value: rendered"]
+    assert arg.threads and threading.current_thread() not in arg.threads
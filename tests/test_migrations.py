@@ -0,0 +1,76 @@
+"""Upgrading a database created by the old startup generate_schemas()"""
+import asyncio
+import importlib.util
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+import pytest
+
+from app.create_tables import MIGRATIONS_DIR, create_tables
+from app.database import db_config
+
+pytestmark = pytest.mark.postgres
+
+INSERT_SQL = """
+INSERT INTO reminder_jobs (
+    entity_type, entity_id, event_type, channel, schedule_type, next_run_at,
+    stop_condition_type, stop_condition_value, status, deleted_at
+)
+VALUES ($1, $2, 'feedback_due', 'email', 'one_time', $3, 'db_check', 'flag', $4, $5)
+RETURNING id
+"""
+
+
+async def baseline_schema(conn: asyncpg.Connection):
+    """Empty database with the tables of the baseline migration (the pre-aerich schema)"""
+    path = next((MIGRATIONS_DIR / "models").glob("0_*.py"))
+    spec = importlib.util.spec_from_file_location("baseline_migration", path)
+    baseline = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(baseline)
+
+    await conn.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public")
+    await conn.execute(await baseline.upgrade(None))
+
+
+def test_upgrade_removes_duplicate_live_reminders(migrated):
+    async def seed_duplicates() -> dict:
+        conn = await asyncpg.connect(**db_config)
+        try:
+            await baseline_schema(conn)
+            now = datetime.now(timezone.utc)
+            ids = {}
+            for name, entity_id, status, deleted_at in [
+                ("kept", "1", "ACTIVE", None),
+                ("duplicate", "1", "ACTIVE", None),
+                ("duplicate_2", "1", "ACTIVE", None),
+                ("paused", "1", "PAUSED", None),
+                ("deleted", "2", "ACTIVE", now - timedelta(days=1)),
+                ("other", "2", "ACTIVE", None),
+            ]:
+                ids[name] = await conn.fetchval(INSERT_SQL, "task", entity_id, now, status, deleted_at)
+            return ids
+        finally:
+            await conn.close()
+
+    async def rows() -> dict:
+        conn = await asyncpg.connect(**db_config)
+        try:
+            return {
+                row["id"]: (row["status"], row["deleted_at"] is not None)
+                for row in await conn.fetch("SELECT id, status, deleted_at FROM reminder_jobs")
+            }
+        finally:
+            # Leave the (now fully migrated) database empty for the other tests
+            await conn.execute("TRUNCATE reminder_jobs")
+            await conn.close()
+
+    ids = asyncio.run(seed_duplicates())
+    asyncio.run(create_tables())
+    after = asyncio.run(rows())
+
+    assert after[ids["kept"]] == ("ACTIVE", False)
+    assert after[ids["duplicate"]] == ("COMPLETED", True)
+    assert after[ids["duplicate_2"]] == ("COMPLETED", True)
+    assert after[ids["paused"]] == ("PAUSED", False)
+    assert after[ids["deleted"]] == ("ACTIVE", True)
+    assert after[ids["other"]] == ("ACTIVE", False)
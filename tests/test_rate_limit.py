@@ -0,0 +1,110 @@
+"""Token buckets and per-channel / per-recipient rate limits (app.scheduler.notifier)"""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.scheduler import notifier
+from app.scheduler.notifier import TokenBucket, _rate_limit
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(notifier, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+@pytest.fixture
+def limits(monkeypatch, clock):
+    """Install channel rate / recipient rate limits (tokens per second) for a test"""
+    monkeypatch.setattr(notifier, "_channel_buckets", {})
+    monkeypatch.setattr(notifier, "_recipient_buckets", {})
+
+    def set_limits(channel: str, rate: float = 0, burst: float = 1,
+                   recipient_rate: float = 0, recipient_burst: float = 1):
+        monkeypatch.setitem(notifier.CHANNEL_LIMITS, channel, {
+            **notifier.CHANNEL_LIMITS[channel],
+            "rate": rate, "burst": burst,
+            "recipient_rate": recipient_rate, "recipient_burst": recipient_burst,
+        })
+        if rate > 0:
+            notifier._channel_buckets[channel] = TokenBucket(rate, burst)
+
+    for channel in notifier.CHANNEL_LIMITS:
+        set_limits(channel)
+    return set_limits
+
+
+def message(channel: str = "email", entity_id: str = "1") -> tuple:
+    data = {"channel": channel, "entity_type": "task", "entity_id": entity_id,
+            "recipient_email": f"{entity_id}@example.com"}
+    return [entity_id], data
+
+
+def test_bucket_starts_full_and_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert bucket.wait_time(3) == 0
+    bucket.consume(3)
+    assert bucket.wait_time() == 0.5
+    assert not bucket.idle
+
+    clock.now += 0.5
+    assert bucket.wait_time() == 0
+    clock.now += 60
+    assert bucket.idle
+    assert bucket.tokens == 3
+
+
+def test_unlimited_channel_allows_everything(limits):
+    messages = [message(entity_id=str(i)) for i in range(50)]
+    allowed, deferred = _rate_limit(messages)
+    assert allowed == messages
+    assert deferred == []
+
+
+def test_backlog_over_the_channel_rate_is_spread_over_later_windows(limits):
+    limits("email", rate=1, burst=2)
+    before = datetime.now(timezone.utc)
+
+    allowed, deferred = _rate_limit([message(entity_id=str(i)) for i in range(5)])
+
+    assert [ids for ids, _ in allowed] == [["0"], ["1"]]
+    # One token per second after the burst: due 1, 2 and 3 seconds from now
+    waits = [round((retry_at - before).total_seconds()) for _, retry_at in deferred]
+    assert [ids for ids, _ in deferred] == [["2"], ["3"], ["4"]]
+    assert waits == [1, 2, 3]
+
+
+def test_channels_have_separate_buckets(limits):
+    limits("email", rate=1, burst=1)
+    allowed, deferred = _rate_limit([message("email", "1"), message("email", "2"), message("slack", "3")])
+    assert [ids for ids, _ in allowed] == [["1"], ["3"]]
+    assert [ids for ids, _ in deferred] == [["2"]]
+
+
+def test_recipient_limit_only_defers_that_recipient(limits):
+    limits("email", recipient_rate=1 / 3600, recipient_burst=1)
+
+    allowed, deferred = _rate_limit([message(entity_id="a"), message(entity_id="a"), message(entity_id="b")])
+
+    assert [ids for ids, _ in allowed] == [["a"], ["b"]]
+    assert [ids for ids, _ in deferred] == [["a"]]
+    assert (deferred[0][1] - datetime.now(timezone.utc)).total_seconds() == pytest.approx(3600, abs=5)
+
+
+def test_deferred_messages_take_no_tokens(limits, clock):
+    limits("email", rate=1, burst=1)
+    _rate_limit([message(entity_id=str(i)) for i in range(10)])
+
+    clock.now += 1
+    allowed, _ = _rate_limit([message(entity_id="next")])
+    assert [ids for ids, _ in allowed] == [["next"]]
@@ -0,0 +1,99 @@
+"""
+Several worker processes draining the same backlog: every reminder is sent
+exactly once, and throughput grows with the number of workers.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter
+
+import pytest
+
+from benchmarks.seed import seed
+
+pytestmark = pytest.mark.postgres
+
+REMINDERS = 600
+WORKER_COUNTS = (1, 2, 4)
+# Each send blocks like a real provider call, so a worker is bound by its
+# EMAIL_CONCURRENCY senders rather than by the CPU
+SEND_SECONDS = 0.05
+WORKER_ENV = {
+    "SCHEDULER_CLAIM_BATCH_SIZE": "25",
+    "EMAIL_CONCURRENCY": "5",
+}
+
+
+def run_worker(result_path: str, start):
+    """Worker process: tick until nothing is left, recording every send"""
+    os.environ.update(WORKER_ENV)
+
+    from datetime import datetime, timezone
+
+    from app.database import close_db, init_db
+    from app.scheduler import notifier, worker
+
+    sent = []
+
+    def record(reminder_data: dict) -> bool:
+        time.sleep(SEND_SECONDS)
+        sent.append(reminder_data["entity_id"])
+        return True
+
+    notifier.CHANNEL_SENDERS["email"] = record
+
+    async def drain() -> dict:
+        await init_db(role="worker")
+        try:
+            start.wait()
+            started = time.time()
+            while (await worker.run_tick(datetime.now(timezone.utc)))["processed"]:
+                pass
+            return {"sent": sent, "started": started, "finished": time.time()}
+        finally:
+            await close_db()
+
+    with open(result_path, "w") as f:
+        json.dump(asyncio.run(drain()), f)
+
+
+def drain_backlog(workers: int, tmp_path) -> tuple:
+    """Seed the backlog, drain it with `workers` processes; (sends per reminder, msg/s)"""
+    asyncio.run(seed(
+        REMINDERS, stop_hit_rate=0, one_time_fraction=1.0, channel_mix={"email": 1.0},
+    ))
+    context = multiprocessing.get_context("spawn")
+    start = context.Barrier(workers)
+    paths = [str(tmp_path / f"{workers}-{i}.json") for i in range(workers)]
+    processes = [context.Process(target=run_worker, args=(path, start)) for path in paths]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    results = []
+    for path in paths:
+        with open(path) as f:
+            results.append(json.load(f))
+    sends = Counter(entity_id for result in results for entity_id in result["sent"])
+    elapsed = max(r["finished"] for r in results) - min(r["started"] for r in results)
+    return sends, REMINDERS / elapsed
+
+
+def test_workers_split_the_backlog_without_double_sends(migrated, tmp_path):
+    throughput = {}
+    for workers in WORKER_COUNTS:
+        sends, throughput[workers] = drain_backlog(workers, tmp_path)
+
+        assert len(sends) == REMINDERS
+        assert set(sends.values()) == {1}, "a reminder was sent more than once"
+
+    print("\n" + ", ".join(
+        f"{workers} worker(s): {rate:.0f} msg/s ({rate / throughput[1]:.1f}x)"
+        for workers, rate in throughput.items()
+    ))
+    assert throughput[2] > 1.5 * throughput[1]
+    assert throughput[4] > 2.5 * throughput[1]
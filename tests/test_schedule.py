@@ -0,0 +1,88 @@
+"""Next-run computation: anchors, jitter and catch-up policies (app.scheduler.schedule)"""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import ReminderJob
+from app.scheduler import schedule
+
+START = datetime(2026, 10, 18, 9, 0, tzinfo=timezone.utc)
+
+
+def reminder(**fields) -> ReminderJob:
+    defaults = dict(
+        schedule_type="recurring", interval_minutes=15, start_time=START, created_at=START,
+        next_run_at=START, schedule_anchor="grid", jitter_seconds=0, catch_up_policy=None,
+        schedule_expression=None, timezone="UTC",
+    )
+    return ReminderJob(**{**defaults, **fields})
+
+
+@pytest.fixture
+def max_jitter(monkeypatch):
+    """random.uniform(a, b) always returns b"""
+    monkeypatch.setattr(schedule, "random", SimpleNamespace(uniform=lambda low, high: high))
+
+
+@pytest.mark.parametrize("now, expected", [
+    (START - timedelta(hours=1), START),                      # before the start: first slot
+    (START, START + timedelta(minutes=15)),                   # on a slot: strictly after
+    (START + timedelta(minutes=16, seconds=40), START + timedelta(minutes=30)),
+    (START + timedelta(days=3, minutes=1), START + timedelta(days=3, minutes=15)),
+])
+def test_grid_anchor_stays_on_the_start_time_grid(now, expected):
+    assert schedule.next_run_after(reminder(), now) == expected
+
+
+def test_grid_falls_back_to_created_at():
+    created = START + timedelta(minutes=7)
+    next_run = schedule.next_run_after(reminder(start_time=None, created_at=created), created + timedelta(minutes=20))
+    assert next_run == created + timedelta(minutes=30)
+
+
+def test_now_anchor_drifts_with_the_tick_time():
+    now = START + timedelta(minutes=16, seconds=40)
+    assert schedule.next_run_after(reminder(schedule_anchor="now"), now) == now + timedelta(minutes=15)
+
+
+def test_jitter_stays_within_its_bound():
+    now = START + timedelta(minutes=1)
+    runs = [schedule.next_run_after(reminder(jitter_seconds=30), now) for _ in range(200)]
+    slot = START + timedelta(minutes=15)
+    assert all(slot <= run <= slot + timedelta(seconds=30) for run in runs)
+    assert len(set(runs)) > 1
+
+
+def test_jitter_never_passes_the_following_slot(max_jitter):
+    next_run = schedule.next_run_after(reminder(interval_minutes=1, jitter_seconds=600), START)
+    assert next_run == START + timedelta(minutes=2)
+
+
+def test_cron_jitter_is_not_capped_by_an_interval(max_jitter):
+    cron = reminder(schedule_type="cron", schedule_expression="0 * * * *", interval_minutes=None, jitter_seconds=90)
+    assert schedule.next_run_after(cron, START) == START + timedelta(hours=1, seconds=90)
+
+
+def test_business_hours_move_into_the_next_opening():
+    # Sunday 2026-10-18: the next grid slot is moved to Monday's opening
+    hours = reminder(schedule_type="business_hours", schedule_expression="mon-fri 09:00-18:00")
+    assert schedule.next_run_after(hours, START) == START + timedelta(days=1)
+
+
+@pytest.mark.parametrize("policy, schedule_type, expected", [
+    ("coalesce", "recurring", schedule.FIRE),
+    ("skip", "recurring", schedule.SKIP),
+    ("skip", "one_time", schedule.FIRE),
+    ("spread", "one_time", schedule.DEFER),
+])
+def test_catch_up_action_for_late_reminders(policy, schedule_type, expected):
+    late = reminder(catch_up_policy=policy, schedule_type=schedule_type)
+    now = START + timedelta(seconds=schedule.CATCH_UP_GRACE_SECONDS + 1)
+    assert schedule.catch_up_action(late, now) == expected
+
+
+def test_reminders_within_the_grace_period_always_fire():
+    on_time = reminder(catch_up_policy="skip")
+    now = START + timedelta(seconds=schedule.CATCH_UP_GRACE_SECONDS)
+    assert schedule.catch_up_action(on_time, now) == schedule.FIRE
@@ -0,0 +1,151 @@
+"""SMTPConnectionPool against a local aiosmtpd server"""
+import asyncio
+import smtplib
+import socket
+import threading
+import time
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.scheduler.smtp_pool import SMTPConnectionPool, SMTPPoolTimeout
+
+MESSAGES = 200
+
+
+class CountingHandler:
+    """Accepts every message; counts sessions (EHLOs) and delivered messages"""
+
+    def __init__(self, data_delay: float = 0):
+        self.sessions = 0
+        self.messages = 0
+        self.data_delay = data_delay
+        self.lock = threading.Lock()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        with self.lock:
+            self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        # Counted once the body is in: the message is as good as delivered
+        with self.lock:
+            self.messages += 1
+        if self.data_delay:
+            await asyncio.sleep(self.data_delay)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    def start(handler: CountingHandler, port: int = None) -> Controller:
+        controller = Controller(handler, hostname="127.0.0.1", port=port or free_port())
+        controller.start()
+        started.append(controller)
+        return controller
+
+    started = []
+    yield start
+    for controller in started:
+        try:
+            controller.stop()
+        except AssertionError:
+            pass  # Already stopped by the test
+
+
+def message(i: int = 0) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "noreply@example.com"
+    msg["To"] = f"user{i}@example.com"
+    msg["Subject"] = f"Reminder {i}"
+    msg.set_content("Please submit your feedback.")
+    return msg
+
+
+def make_pool(controller: Controller, **kwargs) -> SMTPConnectionPool:
+    return SMTPConnectionPool(controller.hostname, controller.port, use_tls=False, **kwargs)
+
+
+def test_pooled_sends_reuse_one_connection(smtp_server):
+    handler = CountingHandler()
+    pool = make_pool(smtp_server(handler), max_size=1)
+    for i in range(20):
+        pool.send_message(message(i))
+    pool.close()
+
+    assert handler.messages == 20
+    assert handler.sessions == 1
+
+
+def test_pooled_throughput_beats_a_connection_per_message(smtp_server):
+    handler = CountingHandler()
+    controller = smtp_server(handler)
+
+    started = time.perf_counter()
+    for i in range(MESSAGES):
+        with smtplib.SMTP(controller.hostname, controller.port, timeout=10) as server:
+            server.ehlo()
+            server.send_message(message(i))
+    unpooled = MESSAGES / (time.perf_counter() - started)
+
+    pool = make_pool(controller, max_size=1)
+    started = time.perf_counter()
+    for i in range(MESSAGES):
+        pool.send_message(message(i))
+    pooled = MESSAGES / (time.perf_counter() - started)
+    pool.close()
+
+    print(f"\nunpooled: {unpooled:.0f} msg/s, pooled: {pooled:.0f} msg/s ({pooled / unpooled:.1f}x)")
+    assert handler.messages == 2 * MESSAGES
+    assert pooled > unpooled
+
+
+def test_connection_dropped_before_data_is_retried_once(smtp_server):
+    handler = CountingHandler()
+    controller = smtp_server(handler)
+    # No NOOP health check, so the dead connection is only found by the send
+    pool = make_pool(controller, max_size=1, idle_check_seconds=3600)
+    pool.send_message(message(0))
+
+    # Restart the server: the pooled connection is gone
+    controller.stop()
+    smtp_server(handler, port=controller.port)
+    pool.send_message(message(1))
+    pool.close()
+
+    assert handler.messages == 2
+    assert handler.sessions == 2
+
+
+def test_failure_after_data_is_not_resent(smtp_server):
+    # The server accepts the message, but only after the client has given up
+    handler = CountingHandler(data_delay=1.0)
+    pool = make_pool(smtp_server(handler), max_size=1, timeout=0.3)
+
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        pool.send_message(message(0))
+    pool.close()
+
+    assert handler.messages == 1
+    assert handler.sessions == 1
+
+
+def test_exhausted_pool_times_out(smtp_server):
+    pool = make_pool(smtp_server(CountingHandler()), max_size=1, acquire_timeout=0.1)
+    assert pool._slots.acquire(timeout=1)  # Every connection busy
+    try:
+        started = time.perf_counter()
+        with pytest.raises(SMTPPoolTimeout):
+            pool.send_message(message(0))
+        assert time.perf_counter() - started < 1
+    finally:
+        pool._slots.release()
+        pool.close()
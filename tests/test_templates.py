@@ -0,0 +1,27 @@
+"""Compiled notification templates (app.notifications.templates)"""
+from app.notifications.templates import render
+
+FIELDS = {"entity_type": "task", "entity_id": "<42>", "recipient": "a@example.com"}
+
+
+def test_event_type_is_escaped_in_the_html_part_only():
+    rendered = render("<img src=x onerror=alert(1)>_&_co", "email", FIELDS)
+
+    assert "<img" not in rendered.html
+    assert "<strong>&lt;Img Src=X Onerror=Alert(1)&gt; &amp; Co</strong>" in rendered.html
+    assert rendered.subject == "Reminder: <Img Src=X Onerror=Alert(1)> & Co"
+    assert "regarding: <Img Src=X Onerror=Alert(1)> & Co" in rendered.text
+
+
+def test_per_recipient_fields_are_escaped_in_the_html_part():
+    rendered = render("payment_due", "email", FIELDS)
+
+    assert "<strong>Payment Due</strong>" in rendered.html
+    assert "&lt;42&gt;" in rendered.html
+    assert "Entity ID: <42>" in rendered.text
+
+
+def test_channels_without_html():
+    rendered = render("a&b", "slack", FIELDS)
+    assert rendered.html is None
+    assert rendered.text.startswith("Reminder: A&B for task <42>.")
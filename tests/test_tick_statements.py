@@ -0,0 +1,66 @@
+"""A tick's write-back is set-based: its statement count does not grow with the due rows"""
+import logging
+from datetime import datetime, timezone
+
+import pytest
+
+from app.scheduler import notifier, worker
+from app.scheduler.condition_checker import flag_cache
+from app.scheduler.lease import CLAIM_BATCH_SIZE
+from benchmarks.seed import seed
+
+pytestmark = [pytest.mark.postgres, pytest.mark.anyio]
+
+
+class StatementCounter(logging.Handler):
+    """Counts the statements Tortoise sends (it logs each one on tortoise.db_client)"""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+@pytest.fixture
+def statements():
+    db_logger = logging.getLogger("tortoise.db_client")
+    counter = StatementCounter()
+    level = db_logger.level
+    db_logger.addHandler(counter)
+    db_logger.setLevel(logging.DEBUG)
+    yield counter
+    db_logger.removeHandler(counter)
+    db_logger.setLevel(level)
+
+
+@pytest.fixture
+def delivered(monkeypatch):
+    for channel in notifier.CHANNEL_SENDERS:
+        monkeypatch.setitem(notifier.CHANNEL_SENDERS, channel, lambda reminder_data: True)
+
+
+async def tick_statements(due: int, statements: StatementCounter) -> tuple:
+    """Statements one tick over `due` seeded reminders takes, and its summary"""
+    await seed(due, flags=50)
+    flag_cache.invalidate()
+    statements.count = 0
+    summary = await worker.run_tick(datetime.now(timezone.utc))
+    return statements.count, summary
+
+
+async def test_statement_count_is_flat_as_due_rows_grow(db, statements, delivered):
+    # All within one claimed batch (more batches add statements per batch, not per row)
+    sizes = (50, 200, 800)
+    if CLAIM_BATCH_SIZE <= max(sizes):
+        pytest.skip("SCHEDULER_CLAIM_BATCH_SIZE is too small for one batch")
+    results = [await tick_statements(due, statements) for due in sizes]
+
+    for due, (count, summary) in zip(sizes, results):
+        print(f"\n{due} due rows: {count} statements ({summary['statements']} write-back updates)")
+        assert summary["processed"] == due
+        # Every kind of outcome shows up at each size
+        assert summary["sent"] and summary["completed"] and summary["rescheduled"]
+        assert summary["stop_condition_met"]
+    assert len({count for count, _ in results}) == 1